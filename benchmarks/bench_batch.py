@@ -0,0 +1,36 @@
+"""批处理执行吞吐量基准
+
+生成一个包含大量 echo >>、type、cd 命令的脚本，用 BatchRunner 流式执行，
+打印每秒执行的命令数。
+
+运行：python benchmarks/bench_batch.py [命令条数]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from win_cli_batch import BatchRunner
+
+def generate_script(count: int):
+    """按需生成脚本行，不在内存中构建整个脚本"""
+    yield 'mkdir C:\\Users\\Player\\Documents\\work'
+    for i in range(count - 1):
+        if i % 100 == 0:
+            yield f'type C:\\Users\\Player\\Documents\\work\\log{i % 10}.txt'
+        elif i % 2:
+            yield f'echo line {i} >> C:\\Users\\Player\\Documents\\work\\log{i % 10}.txt'
+        else:
+            yield 'cd C:\\Users\\Player\\Documents'
+
+def bench(count: int = 100000) -> None:
+    """运行基准并打印吞吐量"""
+    runner = BatchRunner()
+    start = time.perf_counter()
+    executed = sum(1 for _ in runner.run(generate_script(count)))
+    elapsed = time.perf_counter() - start
+    print(f"执行 {executed} 条命令，耗时 {elapsed:.3f} 秒，{executed / elapsed:,.0f} 条/秒")
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
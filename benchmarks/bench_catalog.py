@@ -0,0 +1,85 @@
+"""关卡目录基准
+
+生成一个包含大量关卡的关卡包（.jsonl），测量：
+- 首次建立索引（逐行解析并检查每个关卡）和之后读取索引缓存的耗时
+- 按标签和难度筛选的耗时
+- 随机取一关（读取一行并编译）的平均耗时
+- 索引占用的内存，以及依次访问全部关卡时在索引之外的内存峰值；
+  后者受已编译关卡和路径解析的 LRU 缓存容量限制，与关卡包大小无关
+
+运行：python benchmarks/bench_catalog.py [关卡数]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from levels.catalog import LevelCatalog
+
+TAGS = ('navigation', 'files', 'redirection', 'switches', 'wildcards')
+
+def write_pack(path: str, count: int) -> None:
+    """生成关卡包，每关有一个小的初始文件树和两个目标"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            level = {
+                'id': f'level{i:05d}',
+                'tags': [TAGS[i % len(TAGS)], TAGS[i // len(TAGS) % len(TAGS)]],
+                'difficulty': i % 5 + 1,
+                'title': f'练习 {i}',
+                'description': [f'第 {i} 关：把 work{i}\\a.txt 移动到 done 目录', ''],
+                'hints': [f'move work{i}\\a.txt done'],
+                'files': {f'work{i}': {'a.txt': f'content {i}', 'b.txt': 'keep'}, 'done': {}},
+                'goals': [{'missing': f'work{i}\\a.txt'}, {'file': 'done\\a.txt', 'content': f'content {i}'}],
+            }
+            f.write(json.dumps(level, ensure_ascii=False) + '\n')
+
+def timed(action):
+    """执行一次并返回 (结果, 毫秒)"""
+    start = time.perf_counter()
+    result = action()
+    return result, (time.perf_counter() - start) * 1000
+
+def bench(count: int = 10000, samples: int = 200) -> None:
+    """运行基准并打印结果"""
+    # 索引缓存与字节码缓存一样受 PYTHONDONTWRITEBYTECODE 控制，基准中始终写出
+    sys.dont_write_bytecode = False
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'pack.jsonl')
+        write_pack(path, count)
+        print(f"关卡包：{count} 关，{os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+        _, ms = timed(lambda: len(LevelCatalog([path])))
+        print(f"首次建立索引：{ms:.1f} ms")
+        catalog, ms = timed(lambda: LevelCatalog([path]))
+        _, ms = timed(lambda: len(catalog))
+        print(f"读取索引缓存：{ms:.2f} ms")
+
+        view, ms = timed(lambda: catalog.select(tags=['files'], difficulty=(2, 3)))
+        print(f"筛选（标签 files，难度 2-3）：{len(view)} 关，{ms:.2f} ms")
+
+        positions = random.Random(0).sample(range(count), samples)
+        start = time.perf_counter()
+        for position in positions:
+            catalog[position]
+        print(f"随机取一关：平均 {(time.perf_counter() - start) / samples * 1000:.3f} ms")
+
+        tracemalloc.start()
+        catalog = LevelCatalog([path])
+        len(catalog)
+        index_size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for level in catalog:
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"索引内存：{index_size / 1024 / 1024:.2f} MB（每关 {index_size / count:.0f} 字节）")
+        print(f"依次访问全部关卡的额外内存峰值：{(peak - index_size) / 1024 / 1024:.2f} MB")
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
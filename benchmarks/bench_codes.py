@@ -0,0 +1,56 @@
+"""通关码生成与验证基准
+
+把原来逐字节异或的实现与 core.passcode 的整缓冲区实现对比，
+先核对两者结果一致，再分别统计单条接口和批量接口的耗时。
+
+运行：python benchmarks/bench_codes.py [条数]
+"""
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import passcode
+
+def legacy_encode(student_info: str) -> str:
+    """原 GameManager.generate_password 的实现"""
+    input_bytes = student_info.encode('utf-8')
+    key_bytes = ('OOP' * (len(input_bytes) // 3 + 1))[:len(input_bytes)].encode('utf-8')
+    result_bytes = bytes(a ^ b for a, b in zip(input_bytes, key_bytes))
+    return base64.b64encode(result_bytes).decode('utf-8')
+
+def legacy_decode(password: str) -> str:
+    """原 GameManager.verify_password 的实现"""
+    try:
+        result_bytes = base64.b64decode(password)
+        key_bytes = ('OOP' * (len(result_bytes) // 3 + 1))[:len(result_bytes)].encode('utf-8')
+        input_bytes = bytes(a ^ b for a, b in zip(result_bytes, key_bytes))
+        return input_bytes.decode('utf-8')
+    except:
+        return ""
+
+def timed(label: str, func) -> list:
+    """执行 func 并打印耗时"""
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<24}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+def bench(count: int = 200000) -> None:
+    """运行基准"""
+    infos = [f"2024{i:06d}学生{i}" for i in range(count)]
+
+    legacy_codes = timed("legacy encode", lambda: [legacy_encode(s) for s in infos])
+    codes = timed("passcode.encode", lambda: [passcode.encode(s) for s in infos])
+    bulk_codes = timed("passcode.encode_many", lambda: list(passcode.encode_many(infos)))
+    assert legacy_codes == codes == bulk_codes
+
+    legacy_infos = timed("legacy decode", lambda: [legacy_decode(c) for c in codes])
+    decoded = timed("passcode.decode", lambda: [passcode.decode(c) for c in codes])
+    bulk_decoded = timed("passcode.decode_many", lambda: list(passcode.decode_many(codes)))
+    assert legacy_infos == decoded == bulk_decoded == infos
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,46 @@
+"""命令分发开销微基准
+
+对每条内置命令比较两种耗时：
+- 经过 execute_line（分词、解析命令行、查表、解析开关、调用处理函数、重定向）
+- 直接调用对应的 simulate_* 方法
+
+两者之差即为命令层的分发开销。
+
+运行：python benchmarks/bench_dispatch.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from win_cli_game import GameManager
+
+# (命令行, 等价的直接调用)
+CASES = [
+    ('cd', lambda s: s.simulate_cd('')),
+    ('dir /w', lambda s: s.simulate_dir(None, ['/w'])),
+    ('type notes.txt', lambda s: s.simulate_type('notes.txt')),
+    ('echo hello world', lambda s: s.simulate_echo('hello world')),
+    ('echo hello > notes.txt', lambda s: s.simulate_echo('hello', '>', 'notes.txt')),
+    ('del /Q missing.txt', lambda s: s.simulate_del('missing.txt', ['/Q'])),
+    ('dir | find "txt" | sort', None),
+    ('nosuchcommand a b', None),
+]
+
+def bench(number: int = 20000) -> None:
+    """运行基准并打印每条命令的平均耗时（微秒）"""
+    game = GameManager()
+    simulator = game.simulator
+    simulator.simulate_echo('hello', '>', 'notes.txt')
+
+    print(f"{'命令':<26}{'分发(us)':>10}{'直接(us)':>10}{'开销(us)':>10}")
+    for line, direct in CASES:
+        def dispatched() -> None:
+            game.execute_line(line)
+        t_dispatch = timeit.timeit(dispatched, number=number) / number * 1e6
+        t_direct = timeit.timeit(lambda: direct(simulator), number=number) / number * 1e6 if direct else 0.0
+        print(f"{line:<26}{t_dispatch:>10.2f}{t_direct:>10.2f}{t_dispatch - t_direct:>10.2f}")
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,68 @@
+"""findstr /S 内容搜索基准
+
+在 100000 个文件的练习目录树上比较两种实现：
+- 遍历：逐个扫描目录树中的每个文件
+- 索引：先用倒排索引筛选候选文件，再逐行确认
+
+索引在第一次搜索时建立（包括展开目录模板），之后由文件系统事件增量维护，
+因此第一次搜索之后，每轮都会先修改一个文件再搜索，两次修改之间不会重建索引。
+
+运行：python benchmarks/bench_findstr.py
+"""
+import os
+import sys
+import time
+from types import MappingProxyType
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.commands import join_output
+from core.simulator import WindowsCliSimulator
+
+DIRS = 1000
+FILES_PER_DIR = 100
+
+# (参数, 开关)
+QUERIES = [
+    (['word4242', '*.txt'], ['/S']),
+    (['ord424', '*.txt'], ['/S']),
+    (['*.txt'], ['/S', '/C:line 42 ']),
+    (['nosuchword', '*.txt'], ['/S', '/I']),
+]
+
+def build(content_index: bool) -> WindowsCliSimulator:
+    """构建练习目录树：DIRS 个目录，每个目录 FILES_PER_DIR 个文件"""
+    template = MappingProxyType({
+        f'd{i}': MappingProxyType({
+            f'f{j}.txt': f'line {i} {j}\nword{i * FILES_PER_DIR + j} common'
+            for j in range(FILES_PER_DIR)
+        })
+        for i in range(DIRS)
+    })
+    simulator = WindowsCliSimulator(content_index=content_index)
+    documents = simulator._get_directory('C:\\Users\\Player\\Documents')
+    simulator.fs.graft(documents, 'tree', template)
+    simulator.cwd = documents.path()
+    return simulator
+
+def bench(rounds: int = 5) -> None:
+    """运行基准并打印第一次搜索和之后每次搜索的平均耗时（毫秒）"""
+    print(f"{'查询':<28}{'遍历首次':>10}{'遍历之后':>10}{'索引首次':>10}{'索引之后':>10}")
+    for args, options in QUERIES:
+        row = []
+        for content_index in (False, True):
+            simulator = build(content_index)
+            start = time.perf_counter()
+            join_output(simulator.iter_findstr(args, options))
+            row.append((time.perf_counter() - start) * 1000)
+            total = 0.0
+            for i in range(rounds):
+                simulator.redirect_output(f'edit {i} word4242', '>', f'tree\\d{i}\\edit.txt')
+                start = time.perf_counter()
+                join_output(simulator.iter_findstr(args, options))
+                total += time.perf_counter() - start
+            row.append(total / rounds * 1000)
+        print(f"{' '.join(options + args):<28}" + ''.join(f"{t:>10.2f}" for t in row))
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,66 @@
+"""指标统计开销基准
+
+在同一组命令行上分别测量不开启统计、开启统计时每行命令的平均耗时，
+输出统计带来的额外开销，以及导出一次全部指标（Prometheus 文本格式）的耗时。
+不开启统计时游戏中没有任何统计代码，这一行即基线。
+
+运行：python benchmarks/bench_metrics.py [轮数]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.metrics import MetricsRegistry
+from win_cli_game import GameManager, enable_metrics
+
+# 覆盖浏览、管道、修改、撤销和失败命令的一组命令行
+LINES = (
+    'dir',
+    'cd Documents',
+    'mkdir bench',
+    'echo hello > bench\\a.txt',
+    'copy bench\\a.txt bench\\b.txt',
+    'type bench\\b.txt',
+    'dir bench | find "txt" | sort',
+    'del bench\\*.txt /Q',
+    'undo',
+    'type missing.txt',
+    'nosuchcommand',
+    'rmdir bench /S /Q',
+    'cd ..',
+)
+
+def run(rounds: int) -> float:
+    """执行 rounds 轮命令行，返回每行的平均耗时（微秒）"""
+    game = GameManager()
+    game.start()
+    # 停在第一关，避免通关后转入收集学生信息阶段
+    game.goto_level(0)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for line in LINES:
+            game.step(line)
+    return (time.perf_counter() - start) / (rounds * len(LINES)) * 1e6
+
+def bench(rounds: int = 2000) -> None:
+    """运行基准并打印结果"""
+    # 预热：编译关卡、填充路径缓存
+    run(50)
+    disabled = min(run(rounds) for _ in range(3))
+    registry = MetricsRegistry()
+    restore = enable_metrics(registry)
+    try:
+        enabled = min(run(rounds) for _ in range(3))
+        start = time.perf_counter()
+        text = registry.render()
+        render_ms = (time.perf_counter() - start) * 1000
+    finally:
+        restore()
+    print(f"未开启统计：每行 {disabled:.2f} us")
+    print(f"开启统计：  每行 {enabled:.2f} us（额外 {enabled - disabled:+.2f} us，{(enabled / disabled - 1) * 100:+.1f}%）")
+    print(f"导出全部指标：{render_ms:.2f} ms，{len(text.splitlines())} 行")
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
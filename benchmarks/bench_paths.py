@@ -0,0 +1,61 @@
+"""路径规范化微基准
+
+比较两种实现处理典型命令参数的耗时：
+- 旧实现：原 _normalize_path 的逻辑（os.path.join，这里固定使用 ntpath，
+  即它在 Windows 上的行为）
+- 新实现：core.paths.normalize（Windows 路径解析加 LRU 缓存）
+
+同时列出两者结果不同的输入，旧实现不会折叠 . 和 ..，也只识别以 C:\\ 开头的绝对路径。
+
+运行：python benchmarks/bench_paths.py
+"""
+import ntpath
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import paths
+
+CWD = 'C:\\Users\\Player\\Documents'
+
+INPUTS = [
+    'notes.txt',
+    'level6\\subdir2\\file1.txt',
+    'C:\\Users\\Player\\Documents\\append.txt',
+    '..',
+    '..\\Desktop',
+    '.\\source\\test.txt',
+    'level6\\\\subdir1\\',
+    '\\Users',
+    'c:\\users\\player',
+    'D:',
+]
+
+def legacy_normalize(path: str, cwd: str) -> str:
+    """原 _normalize_path 的实现"""
+    if not path:
+        return cwd
+    if path.endswith(':'):
+        return path + '\\'
+    if path.startswith('C:\\'):
+        return path
+    return ntpath.join(cwd, path)
+
+def bench(number: int = 200000) -> None:
+    """运行基准并打印每种输入的平均耗时（纳秒）"""
+    print(f"{'输入':<44}{'旧实现(ns)':>12}{'新实现(ns)':>12}")
+    for path in INPUTS:
+        t_old = timeit.timeit(lambda: legacy_normalize(path, CWD), number=number) / number * 1e9
+        t_new = timeit.timeit(lambda: paths.normalize(path, CWD), number=number) / number * 1e9
+        print(f"{path:<44}{t_old:>12.0f}{t_new:>12.0f}")
+
+    print("\n结果不同的输入：")
+    for path in INPUTS:
+        old, new = legacy_normalize(path, CWD), paths.normalize(path, CWD)
+        if old != new:
+            print(f"  {path!r}: {old!r} -> {new!r}")
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,105 @@
+"""启动耗时检查
+
+在新的解释器中用 python -X importtime 导入 win_cli_game，取多次运行中
+win_cli_game 累计导入耗时的中位数（先预热一次写出字节码缓存，与打包后的
+程序一样不计入编译源码的时间），并确认只在用到时才需要的模块
+（argparse、colorama、存档、通关码、指标统计以及关卡定义的编译器）没有被提前导入。
+超出预算或提前导入时以非零状态退出，便于部署前检查。
+
+运行：
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 30 --runs 9 --verbose
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入 win_cli_game 时不应出现的模块
+LAZY_MODULES = (
+    'argparse',
+    'colorama',
+    'datetime',
+    'core.metrics',
+    'core.persist',
+    'core.passcode',
+    'http.server',
+    'json',
+    'levels.declarative',
+)
+
+# 默认预算（毫秒）：慢速机房电脑上也应留有余量
+DEFAULT_BUDGET_MS = 25.0
+
+# -X importtime 的输出行：import time: 自身 | 累计 | 缩进的模块名
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def import_profile(module: str = 'win_cli_game') -> Dict[str, Tuple[int, int]]:
+    """在子进程中导入模块并解析 -X importtime 的输出
+
+    Args:
+        module: 要导入的模块
+
+    Returns:
+        {模块名: (自身耗时, 累计耗时)}，单位为微秒
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            name = match.group(4)
+            times[name] = (int(match.group(1)), int(match.group(2)))
+    return times
+
+def check(budget_ms: float, runs: int, verbose: bool) -> bool:
+    """运行检查并打印结果
+
+    Returns:
+        是否在预算之内且没有提前导入的模块
+    """
+    samples = []
+    times = import_profile()
+    for _ in range(runs):
+        times = import_profile()
+        samples.append(times['win_cli_game'][1] / 1000)
+    median = statistics.median(samples)
+    ok = median <= budget_ms
+    print(f"win_cli_game 导入耗时：中位数 {median:.2f} ms（{runs} 次，预算 {budget_ms:.2f} ms）"
+          + ("" if ok else "  超出预算"))
+
+    eager = [name for name in LAZY_MODULES if name in times]
+    if eager:
+        ok = False
+        print("以下模块应在用到时才导入：" + ', '.join(eager))
+
+    if verbose:
+        # 按自身耗时列出最慢的模块（取最后一次运行）
+        print(f"{'模块':<32}{'自身 ms':>10}{'累计 ms':>10}")
+        for name in sorted(times, key=lambda n: times[n][0], reverse=True)[:15]:
+            own, cumulative = times[name]
+            print(f"{name:<32}{own / 1000:>10.2f}{cumulative / 1000:>10.2f}")
+    return ok
+
+def main() -> None:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="检查 win_cli_game 的启动导入耗时")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help="累计导入耗时预算（毫秒）")
+    parser.add_argument('--runs', type=int, default=5, help="运行次数，取中位数")
+    parser.add_argument('-v', '--verbose', action='store_true', help="列出自身耗时最多的模块")
+    args = parser.parse_args()
+    sys.exit(0 if check(args.budget_ms, args.runs, args.verbose) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""模拟器与完整会话的基准套件
+
+覆盖三种目录形态下的每个 simulate_* 操作：
+- shallow：只有少量条目的目录
+- deep：嵌套 60 层的目录链，操作发生在最深处
+- wide：包含 10000 个条目的目录
+
+此外还测量 GameManager.execute_line 的分发耗时，以及几组同时检查结果的
+会话（结果不对时基准直接失败）：
+- 用脚本完整通关 ALL_LEVELS，另有一遍命令的大小写与关卡中的名称不同
+- 在第 7 关中尝试不用 del /F 删除只读文件的各种做法，都不应通关
+- 在新会话中执行一组覆盖 xcopy、rmdir、tree、more 和 undo/redo 的命令
+
+每项记录单次调用延迟的平均值、p50、p95，以及在 tracemalloc 下单独测得的内存峰值。
+
+结果以 JSON 输出；指定 --baseline 时与之前的结果比较，延迟或内存
+超过阈值的项会被标记为回退，并以非零状态码退出，便于部署前检查。
+
+运行：
+    python benchmarks/suite.py -o results.json
+    python benchmarks/suite.py --baseline results.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.simulator import WindowsCliSimulator
+from win_cli_game import GameManager
+
+DEPTH = 60
+WIDTH = 10000
+
+# 完整通关 ALL_LEVELS 的命令脚本
+PLAYTHROUGH = [
+    'dir', 'cd Documents',
+    'mkdir my_folder',
+    'copy source\\test.txt target\\test.txt',
+    'del delete_me.txt /Q',
+    'type append.txt', 'echo Appended content >> append.txt',
+    'cd level6', 'move file1.txt subdir2\\file1.txt', 'cd ..',
+    'cd level7', 'dir /w', 'del readonly.txt', 'del /Q /F readonly.txt',
+    '20240001张三', '20240001张三',
+]
+
+# 同样的解法，但大小写与关卡中的名称不同；文件系统不区分大小写，应同样通关
+PLAYTHROUGH_MIXED_CASE = [
+    'DIR', 'cd DOCUMENTS',
+    'MKDIR MY_FOLDER',
+    'copy SOURCE\\TEST.TXT TARGET\\Test.TXT',
+    'DEL DELETE_ME.TXT /Q',
+    'type APPEND.TXT', 'echo Appended content >> APPEND.TXT',
+    'cd LEVEL6', 'move FILE1.TXT SUBDIR2\\File1.txt', 'cd ..',
+    'cd LEVEL7', 'dir /w', 'del /Q /F READONLY.TXT',
+    '20240001张三', '20240001张三',
+]
+
+# 第 7 关要求用 del /F 删除只读文件；这些做法都不应通关
+READONLY_ATTEMPTS = [
+    'move readonly.txt subdir1',
+    'echo x > readonly.txt',
+    'copy file1.txt readonly.txt',
+    'xcopy file1.txt readonly.txt',
+    'move file1.txt readonly.txt',
+    'del readonly.txt /Q',
+    'cd .. & move level7 other',
+    'cd .. & rmdir level7 /S /Q',
+]
+
+# 覆盖 xcopy、rmdir、tree、more 和 undo/redo 的命令脚本：(命令行, 输出中应包含的文本)
+WORKLOAD = [
+    ('cd Documents', 'Documents'),
+    ('mkdir work', '已创建目录'),
+    ('echo one > work\\a.txt', ''),
+    ('mkdir work\\sub', '已创建目录'),
+    ('echo two > work\\sub\\b.txt', ''),
+    ('xcopy work backup /S', '复制了 2 个文件'),
+    ('type backup\\sub\\b.txt', 'two'),
+    ('tree backup /F', 'b.txt'),
+    ('rmdir backup /S /Q', '目录已删除'),
+    ('type backup\\sub\\b.txt', '系统找不到指定的文件'),
+    ('undo', '已撤销'),
+    ('type backup\\sub\\b.txt', 'two'),
+    ('redo', '已重做'),
+    ('type backup\\sub\\b.txt', '系统找不到指定的文件'),
+    ('type work\\a.txt | more', 'one'),
+    ('more < work\\sub\\b.txt', 'two'),
+    ('undo', '已撤销'),
+    ('dir backup', 'sub'),
+    ('rmdir work', '目录不是空的'),
+    # 撤销删除后条目回到原来的位置
+    ('del work\\a.txt /Q', '文件已删除'),
+    ('undo', '已撤销'),
+    ('dir /w work', 'a.txt [sub]'),
+    # 颜色只用于终端显示：重定向到文件和经过管道的内容不含转义序列
+    ('help > work\\hint.txt', ''),
+    ('find /C "[" work\\hint.txt', 'HINT.TXT: 0'),
+    ('help | find /C "["', '0'),
+    # 通配符没有匹配时 dir 失败
+    ('dir work\\*.zzz && echo 不应执行 || echo 没有匹配', '没有匹配'),
+    # 没有可复制的文件：空目录，以及不带 /S 时只有子目录的目录
+    ('mkdir empty', '已创建目录'),
+    ('xcopy empty work /S', '复制了 0 个文件'),
+    ('mkdir nested', '已创建目录'),
+    ('mkdir nested\\inner', '已创建目录'),
+    ('xcopy nested work', '复制了 0 个文件'),
+    # 撤销或重做不能删除或移走当前所在的目录
+    ('mkdir here', '已创建目录'),
+    ('cd here', 'here'),
+    ('undo', '正在使用'),
+    ('cd ..', 'Documents'),
+    ('rmdir here', ''),
+    ('undo', '已撤销'),
+    ('cd here', 'here'),
+    ('redo', '正在使用'),
+    ('dir', 'here'),
+    ('cd ..', 'Documents'),
+]
+
+# 一次基准操作：返回 (每次迭代前执行的准备函数, 被计时的操作)
+Case = Tuple[Optional[Callable[[int], None]], Callable[[int], object]]
+
+
+def build_fixture(kind: str) -> Tuple[WindowsCliSimulator, str]:
+    """构建指定形态的目录，返回模拟器和操作所在目录的完整路径
+
+    直接调用 FileSystem 接口建树，避免把建树时间算进基准。
+    """
+    simulator = WindowsCliSimulator()
+    fs = simulator.fs
+    node = simulator._get_directory('C:\\Users\\Player\\Documents')
+    node = fs.mkdir(node, kind)
+    if kind == 'deep':
+        for i in range(DEPTH):
+            node = fs.mkdir(node, f'd{i}')
+    count = WIDTH if kind == 'wide' else 10
+    for i in range(count):
+        fs.write(node, f'file{i}.txt', f'content of file {i}')
+    fs.mkdir(node, 'sub')
+    path = node.path()
+    simulator.cwd = path
+    return simulator, path
+
+def simulator_cases(simulator: WindowsCliSimulator, base: str) -> Dict[str, Case]:
+    """针对一个目录构造所有 simulate_* 操作的基准用例"""
+    s = simulator
+    fs = s.fs
+    parent = s._get_directory(base)
+
+    def recreate(i: int) -> None:
+        fs.write(parent, f'victim{i}.txt', 'x')
+
+    return {
+        'dir': (None, lambda i: s.simulate_dir(base)),
+        'dir_w': (None, lambda i: s.simulate_dir(base, ['/w'])),
+        'cd': (None, lambda i: s.simulate_cd(base + '\\sub')),
+        'mkdir': (None, lambda i: s.simulate_mkdir(f'{base}\\new{i}')),
+        'copy': (None, lambda i: s.simulate_copy(f'{base}\\file1.txt', f'{base}\\sub\\copy.txt')),
+        # 源和目标交替，保证每次都有文件可移动
+        'move': (None, lambda i: s.simulate_move(f'{base}\\file2.txt', f'{base}\\sub\\file2.txt') if i % 2 == 0
+                 else s.simulate_move(f'{base}\\sub\\file2.txt', f'{base}\\file2.txt')),
+        'del': (recreate, lambda i: s.simulate_del(f'{base}\\victim{i}.txt', ['/Q'])),
+        'type': (None, lambda i: s.simulate_type(f'{base}\\file3.txt')),
+        'echo_write': (None, lambda i: s.simulate_echo('overwrite', '>', f'{base}\\out.txt')),
+        'echo_append': (None, lambda i: s.simulate_echo(f'line {i}', '>>', f'{base}\\log.txt')),
+    }
+
+def dispatch_cases(game: GameManager) -> Dict[str, Case]:
+    """GameManager.execute_line 的分发用例"""
+    def run(line: str) -> Callable[[int], object]:
+        return lambda i: game.execute_line(line)
+    return {
+        'cd': (None, run('cd')),
+        'dir_w': (None, run('dir /w')),
+        'echo': (None, run('echo hello world')),
+        'pipeline': (None, run('dir | find "txt" | sort')),
+        'unknown': (None, run('nosuchcommand')),
+    }
+
+def playthrough(i: int, script: List[str] = PLAYTHROUGH) -> None:
+    """用脚本完整通关一次"""
+    game = GameManager()
+    game.start()
+    for line in script:
+        game.step(line)
+    assert game.finished, "通关脚本未能完成所有关卡"
+
+def readonly_guard(i: int) -> None:
+    """在第 7 关中逐一尝试 READONLY_ATTEMPTS，确认关卡都没有完成"""
+    for line in READONLY_ATTEMPTS:
+        game = GameManager()
+        game.goto_level(6)
+        game.start()
+        game.step('cd Documents\\level7')
+        game.step(line)
+        assert game.current_level_index == 6, f"{line!r} 不应完成第 7 关"
+
+def workload(i: int) -> None:
+    """在新会话中执行 WORKLOAD 并检查每条命令的输出"""
+    game = GameManager()
+    for line, expected in WORKLOAD:
+        output = game.execute_line(line)
+        assert expected in output, f"{line!r} 的输出不包含 {expected!r}：{output!r}"
+
+
+def measure(case: Case, iterations: int) -> Dict[str, float]:
+    """测量一个用例的延迟分布（微秒）"""
+    setup, op = case
+    samples: List[float] = []
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        if setup is not None:
+            setup(i)
+        start = clock()
+        op(i)
+        samples.append((clock() - start) / 1000)
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'mean_us': round(sum(samples) / iterations, 3),
+        'p50_us': round(samples[iterations // 2], 3),
+        'p95_us': round(samples[min(iterations - 1, int(iterations * 0.95))], 3),
+    }
+
+def measure_memory(make_case: Callable[[], Case], iterations: int) -> float:
+    """在 tracemalloc 下重新执行用例，返回内存峰值（KB）"""
+    tracemalloc.start()
+    try:
+        setup, op = make_case()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        for i in range(iterations):
+            if setup is not None:
+                setup(i)
+            op(i)
+        return round((tracemalloc.get_traced_memory()[1] - base) / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+def run_suite(iterations: int) -> Dict[str, Dict[str, float]]:
+    """运行全部基准，返回 名称 -> 指标"""
+    results: Dict[str, Dict[str, float]] = {}
+
+    def record(name: str, make_case: Callable[[], Case], n: int) -> None:
+        result = measure(make_case(), n)
+        result['peak_kb'] = measure_memory(make_case, n)
+        results[name] = result
+        print(f"{name:<28}{result['p50_us']:>10.2f}{result['p95_us']:>10.2f}{result['peak_kb']:>12.1f}", file=sys.stderr)
+
+    print(f"{'基准':<26}{'p50(us)':>10}{'p95(us)':>10}{'内存(KB)':>12}", file=sys.stderr)
+    for kind in ('shallow', 'deep', 'wide'):
+        names = list(simulator_cases(*build_fixture(kind)))
+        # 宽目录上的 dir 每次要输出上万行，减少迭代次数
+        for name in names:
+            n = max(10, iterations // 50) if kind == 'wide' and name.startswith('dir') else iterations
+            record(f'{kind}.{name}', lambda name=name, kind=kind: simulator_cases(*build_fixture(kind))[name], n)
+
+    for name in dispatch_cases(GameManager()):
+        record(f'dispatch.{name}', lambda name=name: dispatch_cases(GameManager())[name], iterations)
+
+    record('session.playthrough', lambda: (None, playthrough), max(10, iterations // 20))
+    record('session.playthrough_case',
+           lambda: (None, lambda i: playthrough(i, PLAYTHROUGH_MIXED_CASE)), max(10, iterations // 20))
+    record('session.readonly_guard', lambda: (None, readonly_guard), max(10, iterations // 50))
+    record('session.workload', lambda: (None, workload), max(10, iterations // 20))
+
+    record('fixture.wide_build', lambda: (None, lambda i: build_fixture('wide')), 5)
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """与基线比较，返回回退项的说明"""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for metric in ('p50_us', 'peak_kb'):
+            if metric not in result or metric not in old or old[metric] <= 0:
+                continue
+            ratio = result[metric] / old[metric]
+            if ratio > 1 + threshold:
+                regressions.append(f"{name} {metric}: {old[metric]} -> {result[metric]} (x{ratio:.2f})")
+    return regressions
+
+
+def main() -> None:
+    """基准套件入口函数"""
+    parser = argparse.ArgumentParser(description="模拟器与完整会话的基准套件")
+    parser.add_argument('-o', '--output', help="把结果写入 JSON 文件，默认输出到标准输出")
+    parser.add_argument('-n', '--iterations', type=int, default=2000, help="每项基准的迭代次数")
+    parser.add_argument('--baseline', help="用于比较的基线 JSON 文件")
+    parser.add_argument('--threshold', type=float, default=0.25, help="允许的相对回退幅度")
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'iterations': args.iterations,
+        },
+        'results': run_suite(args.iterations),
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(report['results'], baseline, args.threshold)
+        for line in regressions:
+            print(f"回退：{line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("未发现回退。", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from .fs import FileSystem, Node
 from .simulator import WindowsCliSimulator
 
-__all__ = ['WindowsCliSimulator'] 
\ No newline at end of file
+__all__ = ['FileSystem', 'Node', 'WindowsCliSimulator']
\ No newline at end of file
@@ -0,0 +1,144 @@
+from typing import TYPE_CHECKING, Iterable, Iterator
+from .colors import Colors
+from .commands import CommandCall, CommandRegistry, Failure, Output, join_output
+
+if TYPE_CHECKING:
+    from win_cli_game import GameManager
+
+BUILTIN_COMMANDS = CommandRegistry()
+
+def _lines(parts: Iterable[str]) -> Iterator[str]:
+    """把可能含有换行符的输出片段拆成行，供管道中的下一条命令逐行读取"""
+    for part in parts:
+        yield from part.split('\n')
+
+@BUILTIN_COMMANDS.command('help')
+def cmd_help(game: 'GameManager', call: CommandCall) -> str:
+    """显示当前关卡的提示"""
+    current_level = game.get_current_level()
+    if current_level:
+        return Colors.colorize("\n".join(current_level.hints), Colors.HINT)
+    return Colors.colorize("没有可用的提示。", Colors.ERROR)
+
+@BUILTIN_COMMANDS.command('exit')
+def cmd_exit(game: 'GameManager', call: CommandCall) -> str:
+    """退出游戏"""
+    game.exit_requested = True
+    return Colors.colorize("游戏结束。", Colors.DESCRIPTION)
+
+@BUILTIN_COMMANDS.command('dir', switches=('/w', '/p', '/o', '/on', '/o:n'))
+def cmd_dir(game: 'GameManager', call: CommandCall) -> Output:
+    """显示目录内容"""
+    path = call.args[0] if call.args else None
+    if call.piped:
+        # 输出交给管道或文件时不分页，逐行产出
+        return _lines(game.simulator.iter_dir(path, call.switches))
+    return game.simulator.simulate_dir(path, call.switches or None)
+
+@BUILTIN_COMMANDS.command('cd', aliases=('chdir',))
+def cmd_cd(game: 'GameManager', call: CommandCall) -> str:
+    """切换目录"""
+    return game.simulator.simulate_cd(call.args[0] if call.args else "")
+
+@BUILTIN_COMMANDS.command('mkdir', aliases=('md',), min_args=1)
+def cmd_mkdir(game: 'GameManager', call: CommandCall) -> str:
+    """创建目录"""
+    return game.simulator.simulate_mkdir(call.args[0])
+
+@BUILTIN_COMMANDS.command('copy', min_args=2)
+def cmd_copy(game: 'GameManager', call: CommandCall) -> str:
+    """复制文件"""
+    return game.simulator.simulate_copy(call.args[0], call.args[1])
+
+@BUILTIN_COMMANDS.command('del', aliases=('erase',), min_args=1, switches=('/Q', '/F'))
+def cmd_del(game: 'GameManager', call: CommandCall) -> str:
+    """删除文件"""
+    return game.simulator.simulate_del(call.args[0], call.switches or None)
+
+@BUILTIN_COMMANDS.command('type', min_args=1)
+def cmd_type(game: 'GameManager', call: CommandCall) -> Output:
+    """显示文件内容"""
+    if call.piped:
+        lines = game.simulator.read_lines(call.args[0])
+        if lines is not None:
+            return lines
+    return game.simulator.simulate_type(call.args[0])
+
+@BUILTIN_COMMANDS.command('echo')
+def cmd_echo(game: 'GameManager', call: CommandCall) -> str:
+    """输出文本（与 cmd 一样保留引号）；写入文件由输出重定向完成"""
+    return game.simulator.simulate_echo(' '.join(call.raw_args))
+
+@BUILTIN_COMMANDS.command('move', min_args=2)
+def cmd_move(game: 'GameManager', call: CommandCall) -> str:
+    """移动文件"""
+    return game.simulator.simulate_move(call.args[0], call.args[1])
+
+@BUILTIN_COMMANDS.command('undo')
+def cmd_undo(game: 'GameManager', call: CommandCall) -> str:
+    """撤销上一条修改文件的命令"""
+    return game.simulator.simulate_undo()
+
+@BUILTIN_COMMANDS.command('redo')
+def cmd_redo(game: 'GameManager', call: CommandCall) -> str:
+    """重做上一次撤销的命令"""
+    return game.simulator.simulate_redo()
+
+@BUILTIN_COMMANDS.command('xcopy', min_args=2, switches=('/S', '/E', '/I', '/Y'))
+def cmd_xcopy(game: 'GameManager', call: CommandCall) -> str:
+    """复制文件和目录树"""
+    return game.simulator.simulate_xcopy(call.args[0], call.args[1], call.switches or None)
+
+@BUILTIN_COMMANDS.command('rmdir', aliases=('rd',), min_args=1, switches=('/S', '/Q'))
+def cmd_rmdir(game: 'GameManager', call: CommandCall) -> str:
+    """删除目录"""
+    return game.simulator.simulate_rmdir(call.args[0], call.switches or None)
+
+@BUILTIN_COMMANDS.command('tree', switches=('/F', '/A'))
+def cmd_tree(game: 'GameManager', call: CommandCall) -> Output:
+    """以图形方式显示目录结构"""
+    if call.piped:
+        return game.simulator.iter_tree(call.args[0] if call.args else None, '/F' in call.switches, '/A' in call.switches)
+    return game.simulator.simulate_tree(call.args[0] if call.args else None, call.switches or None)
+
+@BUILTIN_COMMANDS.command('find', min_args=1, switches=('/V', '/C', '/N', '/I'))
+def cmd_find(game: 'GameManager', call: CommandCall) -> Output:
+    """在文件或管道输入中查找字符串"""
+    lines = game.simulator.iter_find(call.args[0], call.args[1:], call.switches, call.stdin)
+    return lines if call.piped else join_output(lines)
+
+@BUILTIN_COMMANDS.command('findstr', switches=('/S', '/I', '/L', '/R', '/N', '/V', '/M', '/B', '/E', '/X', '/C:'))
+def cmd_findstr(game: 'GameManager', call: CommandCall) -> Output:
+    """在文件、目录树或管道输入中查找字符串"""
+    lines = game.simulator.iter_findstr(call.args, call.switches, call.stdin)
+    if call.piped:
+        return lines
+    # 与 cmd 一样，没有找到匹配时命令失败，可用于 && 和 ||
+    return join_output(lines) or Failure("")
+
+@BUILTIN_COMMANDS.command('sort', switches=('/R',))
+def cmd_sort(game: 'GameManager', call: CommandCall) -> Output:
+    """排序文件或管道输入的各行"""
+    lines = call.stdin
+    if call.args:
+        lines = game.simulator.read_lines(call.args[0])
+        if lines is None:
+            return Failure("系统找不到指定的文件。")
+    if lines is None:
+        return Failure("命令语法不正确。")
+    result = sorted(lines, key=str.casefold, reverse='/R' in call.switches)
+    return iter(result) if call.piped else '\n'.join(result)
+
+@BUILTIN_COMMANDS.command('more')
+def cmd_more(game: 'GameManager', call: CommandCall) -> Output:
+    """分页显示文件或管道输入"""
+    lines = call.stdin
+    if call.args:
+        lines = game.simulator.read_lines(call.args[0])
+        if lines is None:
+            return Failure(f"无法访问文件 {call.args[0]}")
+    if lines is None:
+        return Failure("命令语法不正确。")
+    if call.piped:
+        return lines
+    return game.simulator.simulate_more(lines)
@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
+import re
+
+from .commands import CommandError
+
+# 按长度优先匹配的运算符
+OPERATORS = ('&&', '||', '>>', '&', '|', '>', '<')
+REDIRECT_OPERATORS = ('>', '>>', '<')
+
+# 命令行的词法单元：空白、运算符，或者单词的一段（普通字符、引号串、^ 转义）
+_LEXEME = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<operator>&&|\|\||>>|[&|><])
+  | (?P<text>"[^"]*"?|\^.|[^\s&|><"^]+|\^)
+''', re.VERBOSE | re.DOTALL)
+
+# 含有这些字符的命令行才需要逐段切分，其余按空白拆分即可
+_SPECIAL = re.compile(r'[&|<>"^]')
+
+
+@dataclass(frozen=True)
+class Token:
+    """命令行中的一个词或运算符
+
+    value 为去掉引号和转义符后的文本；raw 为原始写法，echo 需要原样输出它。
+    """
+    value: str
+    raw: str
+    operator: bool = False
+
+
+@dataclass(frozen=True)
+class Redirect:
+    """一个重定向：运算符（>、>> 或 <）和目标文件"""
+    operator: str
+    target: str
+
+
+@dataclass(frozen=True)
+class SimpleCommand:
+    """管道中的一条命令"""
+    name: str
+    args: Tuple[str, ...]
+    raw_args: Tuple[str, ...]
+    redirects: Tuple[Redirect, ...] = ()
+
+    @property
+    def output_redirect(self) -> Optional[Redirect]:
+        """最后一个输出重定向（与 cmd 一样，后出现的生效）"""
+        for redirect in reversed(self.redirects):
+            if redirect.operator != '<':
+                return redirect
+        return None
+
+    @property
+    def input_redirect(self) -> Optional[Redirect]:
+        """最后一个输入重定向"""
+        for redirect in reversed(self.redirects):
+            if redirect.operator == '<':
+                return redirect
+        return None
+
+
+# 用 | 连接的命令
+Pipeline = Tuple[SimpleCommand, ...]
+
+# 整行命令：(连接运算符, 管道) 序列，第一项的运算符为空字符串
+CommandLine = Tuple[Tuple[str, Pipeline], ...]
+
+
+def tokenize(command_line: str) -> List[Token]:
+    """按 cmd 规则切分命令行
+
+    空白分隔单词；双引号内的空白和运算符都是普通字符；引号外的 ^ 转义下一个字符；
+    引号可以出现在单词中间（例如 "C:\\My Docs"\\a.txt 是一个单词）。
+    未闭合的引号延续到行尾。
+
+    Args:
+        command_line: 原始命令行
+
+    Returns:
+        词和运算符的列表
+    """
+    if _SPECIAL.search(command_line) is None:
+        return [Token(word, word) for word in command_line.split()]
+    tokens: List[Token] = []
+    pieces: List[str] = []
+    start = -1
+    end = 0
+    for match in _LEXEME.finditer(command_line):
+        kind = match.lastgroup
+        if kind == 'text':
+            if start < 0:
+                start = match.start()
+            text = match.group()
+            if text[0] == '"':
+                text = text[1:-1] if len(text) > 1 and text[-1] == '"' else text[1:]
+            elif text[0] == '^' and len(text) == 2:
+                text = text[1]
+            pieces.append(text)
+            end = match.end()
+            continue
+        if start >= 0:
+            tokens.append(Token(''.join(pieces), command_line[start:end]))
+            pieces.clear()
+            start = -1
+        if kind == 'operator':
+            operator = match.group()
+            tokens.append(Token(operator, operator, True))
+    if start >= 0:
+        tokens.append(Token(''.join(pieces), command_line[start:end]))
+    return tokens
+
+@lru_cache(maxsize=1024)
+def parse(command_line: str) -> CommandLine:
+    """把命令行解析为由 &、&&、|| 连接的管道序列，结果会被缓存
+
+    Args:
+        command_line: 原始命令行
+
+    Returns:
+        (连接运算符, 管道) 序列；空行返回空元组
+
+    Raises:
+        CommandError: 语法错误，消息与 cmd 一致
+    """
+    tokens = tokenize(command_line)
+    if not tokens:
+        return ()
+
+    result: List[Tuple[str, Pipeline]] = []
+    pipeline: List[SimpleCommand] = []
+    words: List[Token] = []
+    redirects: List[Redirect] = []
+    joiner = ''
+    last_operator = ''
+
+    def finish_command(operator: str) -> None:
+        if not words:
+            raise CommandError(f"此时不应有 {operator}。")
+        pipeline.append(SimpleCommand(
+            words[0].value,
+            tuple(w.value for w in words[1:]),
+            tuple(w.raw for w in words[1:]),
+            tuple(redirects),
+        ))
+        words.clear()
+        redirects.clear()
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if not token.operator:
+            words.append(token)
+        elif token.value in REDIRECT_OPERATORS:
+            if i + 1 >= len(tokens) or tokens[i + 1].operator:
+                raise CommandError("命令语法不正确。")
+            redirects.append(Redirect(token.value, tokens[i + 1].value))
+            i += 1
+        elif token.value == '|':
+            finish_command('|')
+            last_operator = '|'
+        else:
+            finish_command(token.value)
+            result.append((joiner, tuple(pipeline)))
+            pipeline.clear()
+            joiner = last_operator = token.value
+        i += 1
+
+    if words:
+        finish_command('')
+    elif redirects:
+        raise CommandError("命令语法不正确。")
+    elif last_operator and last_operator != '&':
+        # 结尾是 |、&& 或 ||：后面缺少命令（结尾的 & 是允许的）
+        raise CommandError(f"此时不应有 {last_operator}。")
+    if pipeline:
+        result.append((joiner, tuple(pipeline)))
+    return tuple(result)
+
+def split_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """把任意切分的文本块流转换为行流，只缓存未结束的一行
+
+    Args:
+        chunks: 文本块，例如 FileBody 的内容块
+
+    Yields:
+        不含换行符的行
+    """
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
@@ -1,34 +1,33 @@
-from colorama import init, Fore, Back, Style
-
-# 初始化 colorama
-init()
-
 class Colors:
-    """颜色工具类，用于管理游戏中的颜色显示"""
+    """颜色工具类，用于管理游戏中的颜色显示
+
+    颜色是标准的 ANSI 转义序列，本模块不依赖 colorama；是否真正输出颜色
+    由 core.output.OutputSink 根据终端类型决定。
+    """
     
     # 标题颜色
-    TITLE = Fore.CYAN + Style.BRIGHT
+    TITLE = '\x1b[36m\x1b[1m'
     
     # 描述文本颜色
-    DESCRIPTION = Fore.WHITE
+    DESCRIPTION = '\x1b[37m'
     
     # 提示信息颜色
-    HINT = Fore.YELLOW
+    HINT = '\x1b[33m'
     
     # 成功信息颜色
-    SUCCESS = Fore.GREEN
+    SUCCESS = '\x1b[32m'
     
     # 错误信息颜色
-    ERROR = Fore.RED
+    ERROR = '\x1b[31m'
     
     # 命令提示符颜色
-    PROMPT = Fore.BLUE
+    PROMPT = '\x1b[34m'
     
     # 命令输出颜色
-    OUTPUT = Fore.WHITE
+    OUTPUT = '\x1b[37m'
     
     # 重置颜色
-    RESET = Style.RESET_ALL
+    RESET = '\x1b[0m'
     
     @classmethod
     def colorize(cls, text: str, color: str) -> str:
@@ -41,4 +40,4 @@ class Colors:
         Returns:
             添加了颜色的文本
         """
-        return f"{color}{text}{cls.RESET}" 
\ No newline at end of file
+        return f"{color}{text}{cls.RESET}"
@@ -0,0 +1,169 @@
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class CommandError(Exception):
+    """命令参数不合法时抛出，消息即为要显示给用户的错误提示。"""
+
+
+class Failure(str):
+    """表示命令执行失败的输出。
+
+    与普通字符串完全相同，只是带有失败标记，&& 和 || 据此决定是否执行后续命令。
+    """
+
+
+# 处理函数的输出：完整文本，或者按行产出的可迭代对象（用于管道流式传递）
+Output = Union[str, Iterable[str]]
+
+def join_output(parts: Iterable[str], sep: str = '\n') -> str:
+    """拼接输出片段；第一段是 Failure 时，整个结果也标记为失败
+
+    Args:
+        parts: 输出片段，例如按行产出的生成器
+        sep: 片段之间的分隔符
+
+    Returns:
+        拼接后的文本
+    """
+    parts = iter(parts)
+    first = next(parts, None)
+    if first is None:
+        return ""
+    text = sep.join(chain((first,), parts))
+    return Failure(text) if isinstance(first, Failure) else text
+
+
+@dataclass
+class CommandCall:
+    """一次命令调用解析后的参数
+
+    stdin 为管道或输入重定向提供的行流；piped 表示输出会交给下一条命令或写入文件，
+    此时处理函数可以返回按行产出的迭代器而不是完整字符串。
+    raw_args 为保留引号的原始参数，echo 用它原样输出。
+    """
+    name: str
+    args: List[str]
+    switches: List[str] = field(default_factory=list)
+    raw_args: List[str] = field(default_factory=list)
+    stdin: Optional[Iterator[str]] = None
+    piped: bool = False
+
+
+@dataclass
+class CommandSpec:
+    """命令定义：名称、别名、处理函数以及参数和开关的声明"""
+    name: str
+    handler: Callable[[Any, CommandCall], Output]
+    aliases: Tuple[str, ...] = ()
+    min_args: int = 0
+    switches: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        # 开关不区分大小写，统一映射为声明时的写法；以冒号结尾的开关带有值（例如 /C:字符串）
+        self._switch_map: Dict[str, str] = {s.lower(): s for s in self.switches}
+        self._value_switches = tuple(s.lower() for s in self.switches if s.endswith(':'))
+
+    def parse(self, args: List[str]) -> CommandCall:
+        """按声明一次性拆分出普通参数和开关
+
+        Args:
+            args: 命令名之后的单词列表（重定向已由命令行解析器取出）
+
+        Returns:
+            解析后的调用
+
+        Raises:
+            CommandError: 开关无效或参数不足
+        """
+        plain: List[str] = []
+        switches: List[str] = []
+        switch_map = self._switch_map
+        for arg in args:
+            if switch_map and arg.startswith('/'):
+                switch = switch_map.get(arg.lower())
+                if switch is None:
+                    prefix = next((p for p in self._value_switches if arg.lower().startswith(p)), None)
+                    if prefix is None:
+                        raise CommandError(f"无效开关 - {arg}")
+                    switch = switch_map[prefix] + arg[len(prefix):]
+                switches.append(switch)
+            else:
+                plain.append(arg)
+
+        if len(plain) < self.min_args:
+            raise CommandError("语法错误。")
+        return CommandCall(self.name, plain, switches, list(args))
+
+
+class CommandRegistry:
+    """命令注册表，按名称或别名 O(1) 查找命令。"""
+
+    def __init__(self) -> None:
+        """初始化空注册表"""
+        self._commands: Dict[str, CommandSpec] = {}
+
+    def register(self, spec: CommandSpec) -> CommandSpec:
+        """注册命令及其别名
+
+        Args:
+            spec: 命令定义
+
+        Returns:
+            注册的命令定义
+        """
+        for name in (spec.name,) + spec.aliases:
+            self._commands[name.lower()] = spec
+        return spec
+
+    def command(self, name: str, **options: Any) -> Callable[[Callable[[Any, CommandCall], Output]], Callable[[Any, CommandCall], Output]]:
+        """以装饰器形式注册处理函数
+
+        Args:
+            name: 命令名称
+            **options: 传给 CommandSpec 的其余声明
+
+        Returns:
+            装饰器，返回原处理函数
+        """
+        def decorator(handler: Callable[[Any, CommandCall], Output]) -> Callable[[Any, CommandCall], Output]:
+            self.register(CommandSpec(name, handler, **options))
+            return handler
+        return decorator
+
+    def get(self, name: str) -> Optional[CommandSpec]:
+        """按名称或别名查找命令，大小写不敏感"""
+        return self._commands.get(name.lower())
+
+    def names(self) -> List[str]:
+        """返回所有已注册的主命令名称"""
+        return sorted({spec.name for spec in self._commands.values()})
+
+    def dispatch(self, context: Any, name: str, args: List[str], raw_args: Optional[List[str]] = None,
+                 stdin: Optional[Iterator[str]] = None, piped: bool = False) -> Optional[Output]:
+        """解析参数并调用处理函数
+
+        Args:
+            context: 传给处理函数的上下文（通常是 GameManager）
+            name: 命令名称
+            args: 命令参数列表
+            raw_args: 保留引号的原始参数，默认与 args 相同
+            stdin: 管道或输入重定向提供的行流
+            piped: 输出是否交给下一条命令或写入文件
+
+        Returns:
+            处理函数的输出；命令不存在时为 None
+
+        Raises:
+            CommandError: 参数不合法
+        """
+        spec = self._commands.get(name.lower())
+        if spec is None:
+            return None
+        call = spec.parse(args)
+        if raw_args is not None:
+            call.raw_args = raw_args
+        call.stdin = stdin
+        call.piped = piped
+        return spec.handler(context, call)
@@ -0,0 +1,10 @@
+from typing import Callable
+
+# 模拟器发布的变更事件类型
+CREATED = 'created'
+DELETED = 'deleted'
+MODIFIED = 'modified'
+CWD_CHANGED = 'cwd'
+
+# 事件监听函数：(事件类型, 受影响的完整路径)
+Listener = Callable[[str, str], None]
@@ -0,0 +1,512 @@
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Set, Union
+import time
+
+from .events import CREATED, DELETED, MODIFIED
+
+# 子树模板：文件为内容字符串，目录为 名称 -> 模板 的只读映射；
+# 内容尚未读取的文件（例如挂载的宿主文件）为 FileBody，使用时复制
+Template = Union[str, 'FileBody', Mapping[str, 'Template']]
+
+
+class FileBody:
+    """分块存储的文件内容。
+
+    追加只是在块列表末尾添加一个块，均摊 O(1)；长度单独维护。
+    复制时两个文件共享同一个块列表，各自记录自己拥有的块数：
+    先追加的一方直接在共享列表末尾追加，另一方追加时才复制块列表的引用。
+    """
+
+    __slots__ = ('_chunks', '_count', '_length')
+
+    # 内容是否尚未读入内存，只有按需读取的子类会为 True
+    lazy = False
+
+    def __init__(self, text: str = '') -> None:
+        """初始化文件内容
+
+        Args:
+            text: 初始文本
+        """
+        self._chunks: List[str] = [text] if text else []
+        self._count = len(self._chunks)
+        self._length = len(text)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[str]:
+        """按块流式读取内容"""
+        chunks = self._chunks
+        for i in range(self._count):
+            yield chunks[i]
+
+    def __str__(self) -> str:
+        """拼接全部内容，并把结果合并为单个块以便下次直接返回"""
+        if self._count == 1:
+            return self._chunks[0]
+        text = ''.join(self)
+        # 不修改可能被共享的列表，只替换自己的引用
+        self._chunks = [text] if text else []
+        self._count = len(self._chunks)
+        return text
+
+    def append(self, text: str) -> None:
+        """在末尾追加文本
+
+        Args:
+            text: 追加的文本
+        """
+        if not text:
+            return
+        if len(self._chunks) != self._count:
+            # 共享列表已被其他副本延长，复制属于自己的前缀
+            self._chunks = self._chunks[:self._count]
+        self._chunks.append(text)
+        self._count += 1
+        self._length += len(text)
+
+    def copy(self) -> 'FileBody':
+        """返回共享块列表的副本，耗时与内容大小无关"""
+        other = FileBody.__new__(FileBody)
+        other._chunks = self._chunks
+        other._count = self._count
+        other._length = self._length
+        return other
+
+
+class NameIndex(dict):
+    """目录的子节点表：保留原始大小写的名称，按不区分大小写的方式查找。
+
+    字典本身以原始名称为键，因此遍历时得到的是原始名称，顺序为插入顺序；
+    另有一个 折叠后的名称 -> 原始名称 的索引，使 get、in、[] 和 del 都是 O(1)
+    的不区分大小写操作。按名称排序的结果会被缓存，直到目录内容变化。
+    """
+
+    __slots__ = ('_folded', '_sorted')
+
+    def __init__(self, entries: Optional[Mapping[str, 'Node']] = None) -> None:
+        """初始化子节点表
+
+        Args:
+            entries: 初始的 名称 -> 节点 映射
+        """
+        super().__init__()
+        self._folded: Dict[str, str] = {}
+        self._sorted: Optional[List[str]] = None
+        if entries:
+            for name, node in entries.items():
+                self[name] = node
+
+    def original(self, name: str) -> Optional[str]:
+        """返回与 name 仅大小写不同的已有名称，不存在时返回 None"""
+        return self._folded.get(name.casefold())
+
+    def __getitem__(self, name: str) -> 'Node':
+        return dict.__getitem__(self, self._folded.get(name.casefold(), name))
+
+    def get(self, name: str, default: Optional['Node'] = None) -> Optional['Node']:
+        key = self._folded.get(name.casefold())
+        return default if key is None else dict.__getitem__(self, key)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name.casefold() in self._folded
+
+    def __setitem__(self, name: str, node: 'Node') -> None:
+        folded = name.casefold()
+        key = self._folded.get(folded)
+        if key is not None and key != name:
+            # 只有大小写不同的同名条目：换成新的写法
+            dict.__delitem__(self, key)
+        self._folded[folded] = name
+        dict.__setitem__(self, name, node)
+        self._sorted = None
+
+    def __delitem__(self, name: str) -> None:
+        key = self._folded.pop(name.casefold())
+        dict.__delitem__(self, key)
+        self._sorted = None
+
+    def sorted_names(self) -> List[str]:
+        """按名称排序（不区分大小写）的原始名称列表，目录不变时直接返回缓存"""
+        if self._sorted is None:
+            self._sorted = sorted(self, key=str.casefold)
+        return self._sorted
+
+    def reorder(self, names: List[str]) -> None:
+        """按给出的顺序重新排列条目
+
+        Args:
+            names: 全部条目的原始名称，每个恰好出现一次
+        """
+        items = [(name, dict.__getitem__(self, name)) for name in names]
+        dict.clear(self)
+        dict.update(self, items)
+
+
+class Node:
+    """虚拟文件系统中的一个节点（inode），目录和文件共用。
+
+    由模板嫁接而来的目录在第一次访问 children 时才展开下一层子节点，
+    模板本身只读，因此多个会话可以共享同一份模板。
+
+    目录导出的只读模板缓存在 _snapshot 中，子树有任何修改时沿父链清除，
+    所以对未修改的子树重复导出（例如多次 xcopy）不需要重新遍历。
+    """
+
+    __slots__ = ('ino', 'name', 'parent', '_children', '_template', '_snapshot', 'fs', 'body', 'ctime', 'mtime')
+
+    def __init__(self, ino: int, name: str, parent: Optional['Node'],
+                 children: Optional[Mapping[str, 'Node']] = None, content: Union[str, FileBody] = '',
+                 template: Optional[Mapping[str, Template]] = None,
+                 fs: Optional['FileSystem'] = None) -> None:
+        """初始化节点
+
+        Args:
+            ino: inode 编号
+            name: 节点名称
+            parent: 父目录节点，根节点为 None
+            children: 子节点字典，文件为 None
+            content: 文件内容，目录忽略；也可以直接传入 FileBody
+            template: 尚未展开的目录模板
+            fs: 所属文件系统，用于展开模板时分配 inode
+        """
+        now = time.time()
+        self.ino = ino
+        self.name = name
+        self.parent = parent
+        self._children = children if children is None or isinstance(children, NameIndex) else NameIndex(children)
+        self._template = template
+        self._snapshot: Optional[Mapping[str, Template]] = None
+        self.fs = fs
+        if children is not None or template is not None:
+            self.body: Optional[FileBody] = None
+        else:
+            self.body = content if isinstance(content, FileBody) else FileBody(content)
+        self.ctime = now
+        self.mtime = now
+
+    @property
+    def content(self) -> str:
+        """文件的完整内容，目录为空字符串"""
+        return str(self.body) if self.body is not None else ''
+
+    @content.setter
+    def content(self, text: str) -> None:
+        self.body = FileBody(text)
+        if self.fs is not None:
+            self.fs._touch(self.parent)
+
+    @property
+    def children(self) -> Optional[NameIndex]:
+        """子节点字典，文件为 None；延迟目录在此时展开"""
+        if self._template is not None:
+            self._expand()
+        return self._children
+
+    def _expand(self) -> None:
+        """把模板的第一层展开为真正的子节点"""
+        template, self._template = self._template, None
+        children = NameIndex()
+        for name, entry in template.items():
+            if isinstance(entry, str):
+                children[name] = self.fs._alloc(name, self, None, entry)
+            elif isinstance(entry, FileBody):
+                children[name] = self.fs._alloc(name, self, None, entry.copy())
+            else:
+                children[name] = self.fs._alloc(name, self, None, template=entry)
+        self._children = children
+        # 展开不改变内容，模板本身就是这个目录的导出结果
+        self._snapshot = template
+
+    @property
+    def is_dir(self) -> bool:
+        """是否为目录"""
+        return self._children is not None or self._template is not None
+
+    @property
+    def size(self) -> int:
+        """文件大小（字符数），目录为 0"""
+        return len(self.body) if self.body is not None else 0
+
+    def path(self) -> str:
+        """沿父节点链向上拼出完整路径"""
+        parts = []
+        node: Optional[Node] = self
+        while node is not None:
+            parts.append(node.name)
+            node = node.parent
+        parts.reverse()
+        if len(parts) == 1:
+            return parts[0] + '\\'
+        return '\\'.join(parts)
+
+    def walk(self) -> Iterator['Node']:
+        """先序遍历以该节点为根的子树"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.children:
+                stack.extend(node.children.values())
+
+    def __repr__(self) -> str:
+        kind = 'dir' if self.is_dir else 'file'
+        return f"Node({self.ino}, {self.name!r}, {kind})"
+
+
+def _child_path(parent: Node, name: str) -> str:
+    """父目录下名为 name 的条目的完整路径"""
+    return parent.path().rstrip('\\') + '\\' + name
+
+class FileSystem:
+    """基于 inode 表的虚拟文件系统，带有容量受限的路径解析缓存。
+
+    路径解析结果按规范化后的路径字符串缓存（LRU）。缓存只保存命中的节点，
+    因此新建节点不会使缓存失效；删除或移动节点会整体清空缓存。
+
+    每次修改都会通知 listeners 中的监听函数：(事件类型, 节点, 附加数据)。
+    追加内容时附加数据为追加的文本；移动节点时 DELETED 的附加数据为新路径、
+    随后 CREATED 的附加数据为原路径；从已有节点复制出的子树 CREATED 的附加数据
+    为源路径；其余情况为 None。
+    """
+
+    def __init__(self, cache_size: int = 1024) -> None:
+        """初始化文件系统
+
+        Args:
+            cache_size: 路径解析缓存的最大条目数
+        """
+        self.inodes: Dict[int, Node] = {}
+        self.drives: Dict[str, Node] = {}
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, Node]' = OrderedDict()
+        self._next_ino = 1
+        self.listeners: List[Callable[[str, Node, Optional[str]], None]] = []
+        # 只读驱动器（例如挂载的宿主目录）
+        self.read_only: Set[str] = set()
+
+    def _emit(self, event: str, node: Node, data: Optional[str] = None) -> None:
+        """通知所有监听函数"""
+        for listener in self.listeners:
+            listener(event, node, data)
+
+    def _alloc(self, name: str, parent: Optional[Node],
+               children: Optional[Mapping[str, Node]] = None, content: Union[str, FileBody] = '',
+               template: Optional[Mapping[str, Template]] = None) -> Node:
+        """分配一个新 inode 并登记到 inode 表"""
+        node = Node(self._next_ino, name, parent, children, content, template, self)
+        self.inodes[node.ino] = node
+        self._next_ino += 1
+        return node
+
+    def _touch(self, directory: Optional[Node]) -> None:
+        """目录内容变化后沿父链清除缓存的导出结果
+
+        缓存的目录的所有子目录也都有缓存，因此遇到没有缓存的祖先时可以停止。
+        """
+        while directory is not None and directory._snapshot is not None:
+            directory._snapshot = None
+            directory = directory.parent
+
+    def add_drive(self, letter: str, template: Optional[Mapping[str, Template]] = None,
+                  read_only: bool = False) -> Node:
+        """添加一个驱动器根目录
+
+        Args:
+            letter: 驱动器名，例如 'C:'
+            template: 驱动器内容的模板，给出时替换已有的同名驱动器
+            read_only: 是否为只读驱动器，模拟器拒绝在只读驱动器上做任何修改
+
+        Returns:
+            驱动器根目录节点
+        """
+        if read_only:
+            self.read_only.add(letter)
+        elif template is not None:
+            self.read_only.discard(letter)
+        root = self.drives.get(letter)
+        if template is not None:
+            if root is not None:
+                self.unlink(root)
+            root = self._alloc(letter, None, template=template)
+            self.drives[letter] = root
+        elif root is None:
+            root = self._alloc(letter, None, {})
+            self.drives[letter] = root
+        return root
+
+    def resolve(self, path: str, parts: List[str]) -> Optional[Node]:
+        """解析路径到节点，优先查缓存
+
+        Args:
+            path: 规范化后的路径字符串，作为缓存键
+            parts: 已拆分的路径部分
+
+        Returns:
+            对应节点或 None（如果不存在）
+        """
+        cache = self._cache
+        node = cache.get(path)
+        if node is not None:
+            cache.move_to_end(path)
+            return node
+        if not parts:
+            return None
+        node = self.drives.get(parts[0])
+        for part in parts[1:]:
+            if node is None or node.children is None:
+                return None
+            node = node.children.get(part)
+        if node is not None:
+            cache[path] = node
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return node
+
+    def invalidate(self) -> None:
+        """清空路径解析缓存"""
+        self._cache.clear()
+
+    def mkdir(self, parent: Node, name: str) -> Node:
+        """在父目录下创建子目录"""
+        node = self._alloc(name, parent, {})
+        parent.children[name] = node
+        parent.mtime = node.mtime
+        self._touch(parent)
+        self._emit(CREATED, node)
+        return node
+
+    def write(self, parent: Node, name: str, content: Union[str, FileBody]) -> Node:
+        """在父目录下创建或覆盖文件，content 为 FileBody 时直接使用它"""
+        node = parent.children.get(name)
+        if node is not None and not node.is_dir:
+            node.body = content if isinstance(content, FileBody) else FileBody(content)
+            node.mtime = time.time()
+            self._touch(parent)
+            self._emit(MODIFIED, node)
+            return node
+        if node is not None:
+            self.unlink(node)
+        node = self._alloc(name, parent, None, content)
+        parent.children[name] = node
+        parent.mtime = node.mtime
+        self._touch(parent)
+        self._emit(CREATED, node)
+        return node
+
+    def append(self, node: Node, text: str) -> None:
+        """向文件末尾追加一行"""
+        node.body.append('\n' + text)
+        node.mtime = time.time()
+        self._touch(node.parent)
+        self._emit(MODIFIED, node, text)
+
+    def copy_file(self, source: Node, parent: Node, name: str) -> Node:
+        """把文件复制到父目录下，新文件与源文件共享内容块"""
+        return self.write(parent, name, source.body.copy())
+
+    def unlink(self, node: Node) -> None:
+        """从父目录中删除节点及其子树"""
+        self._emit(DELETED, node)
+        parent = node.parent
+        if parent is not None:
+            del parent.children[node.name]
+            parent.mtime = time.time()
+            self._touch(parent)
+        # 只回收已展开的节点，未展开的模板部分从未分配过 inode
+        stack = [node]
+        while stack:
+            child = stack.pop()
+            self.inodes.pop(child.ino, None)
+            if child._children:
+                stack.extend(child._children.values())
+        node.parent = None
+        self.invalidate()
+
+    def link(self, node: Node, parent: Node, name: str) -> None:
+        """把先前 unlink 的节点（连同其子树）重新挂到父目录下，已存在的同名节点会被替换"""
+        existing = parent.children.get(name)
+        if existing is not None and existing is not node:
+            self.unlink(existing)
+        node.name = name
+        node.parent = parent
+        parent.children[name] = node
+        parent.mtime = time.time()
+        self._touch(parent)
+        stack = [node]
+        while stack:
+            child = stack.pop()
+            self.inodes[child.ino] = child
+            if child._children:
+                stack.extend(child._children.values())
+        self._emit(CREATED, node)
+
+    def rename(self, node: Node, new_parent: Node, new_name: str) -> None:
+        """把节点移动到新的父目录下（可同时改名，也可以只改变名称的大小写）"""
+        existing = new_parent.children.get(new_name)
+        if existing is node and node.name == new_name:
+            return
+        if existing is not None and existing is not node:
+            self.unlink(existing)
+        old_path = node.path()
+        self._emit(DELETED, node, _child_path(new_parent, new_name))
+        old_parent = node.parent
+        if old_parent is not None:
+            del old_parent.children[node.name]
+            old_parent.mtime = time.time()
+            self._touch(old_parent)
+        node.name = new_name
+        node.parent = new_parent
+        new_parent.children[new_name] = node
+        new_parent.mtime = time.time()
+        self._touch(new_parent)
+        self.invalidate()
+        self._emit(CREATED, node, old_path)
+
+    def export(self, node: Node) -> Template:
+        """把节点及其子树导出为只读模板
+
+        Args:
+            node: 要导出的节点
+
+        Returns:
+            文件返回内容字符串（内容尚未读取时返回 FileBody 副本），目录返回只读的嵌套映射
+        """
+        if not node.is_dir:
+            return node.body.copy() if node.body.lazy else node.content
+        if node._template is not None:
+            return node._template
+        if node._snapshot is None:
+            node._snapshot = MappingProxyType({name: self.export(child) for name, child in node._children.items()})
+        return node._snapshot
+
+    def graft(self, parent: Node, name: str, entry: Template, source: Optional[Node] = None) -> Node:
+        """把模板挂到父目录下，已存在的同名节点会被替换
+
+        目录模板不会被复制，只在访问时逐层展开，因此耗时与模板大小无关。
+
+        Args:
+            parent: 父目录节点
+            name: 新节点名称
+            entry: 导出的模板
+            source: 模板正是该节点的导出结果时传入，监听函数据此只记录源路径
+
+        Returns:
+            新节点
+        """
+        existing = parent.children.get(name)
+        if existing is not None:
+            self.unlink(existing)
+        if isinstance(entry, str):
+            node = self._alloc(name, parent, None, entry)
+        elif isinstance(entry, FileBody):
+            node = self._alloc(name, parent, None, entry.copy())
+        else:
+            node = self._alloc(name, parent, None, template=entry)
+        parent.children[name] = node
+        parent.mtime = node.mtime
+        self._touch(parent)
+        self._emit(CREATED, node, source.path() if source is not None else None)
+        return node
@@ -0,0 +1,207 @@
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from .fs import FileSystem, Node
+
+# 一条逆操作，形式为 (类型, 节点, 参数...)：
+#   ('unlink', node)                删除节点
+#   ('link', node, parent, name, position)
+#                                   把已删除的节点挂回原处，position 为删除时在父目录中的位置
+#   ('body', node, body)            恢复文件内容
+#   ('rename', node, parent, name)  把节点移回原处
+Operation = Tuple
+Group = List[Operation]
+
+
+class History:
+    """基于逆操作日志的撤销/重做记录。
+
+    每条命令产生的修改记为一组逆操作。逆操作只引用被修改的节点本身：
+    删除的节点被摘下后原样保留，文件内容通过 FileBody.copy 共享内容块，
+    因此每组记录占用的内存与这次修改的大小成正比，而不是复制整个文件系统。
+
+    撤销时按相反顺序执行一组逆操作，执行每一步又得到它自己的逆操作，
+    这些逆操作组成重做记录，反之亦然。
+    """
+
+    def __init__(self, fs: FileSystem, limit: int = 50) -> None:
+        """初始化撤销记录
+
+        Args:
+            fs: 要操作的文件系统
+            limit: 最多保留多少步撤销记录，超出时丢弃最早的记录
+        """
+        self.fs = fs
+        self.undo_stack: Deque[Group] = deque(maxlen=limit)
+        self.redo_stack: Deque[Group] = deque(maxlen=limit)
+
+    def record(self, group: Group) -> None:
+        """记录一条命令的逆操作，新的修改会清空重做记录
+
+        Args:
+            group: 按修改发生顺序排列的逆操作
+        """
+        if group:
+            self.undo_stack.append(group)
+            self.redo_stack.clear()
+
+    def created(self, node: Node) -> Operation:
+        """新建节点的逆操作"""
+        return ('unlink', node)
+
+    def removed(self, node: Node) -> Operation:
+        """删除节点的逆操作，必须在删除之前调用"""
+        return self.removed_all([node])[0]
+
+    def removed_all(self, nodes: Iterable[Node]) -> List[Operation]:
+        """依次删除一组节点的逆操作，必须在删除第一个节点之前调用
+
+        每个父目录只遍历一次来确定各节点的位置，因此批量删除的开销与条目数成正比。
+        删除之间不能再修改这些父目录。
+
+        Args:
+            nodes: 按删除顺序排列的节点
+
+        Returns:
+            与 nodes 一一对应的逆操作
+        """
+        orders: Dict[int, Dict[str, int]] = {}
+        # 每个父目录中已删除的条目原来的位置（升序）
+        gone: Dict[int, List[int]] = {}
+        ops = []
+        for node in nodes:
+            parent = node.parent
+            position = 0
+            if parent is not None:
+                order = orders.get(parent.ino)
+                if order is None:
+                    order = orders[parent.ino] = {name: i for i, name in enumerate(parent.children)}
+                    gone[parent.ino] = []
+                index = order[node.name]
+                earlier = gone[parent.ino]
+                # 删除时前面已经少了 earlier 中位置更靠前的条目
+                position = index - bisect_left(earlier, index)
+                insort(earlier, index)
+            ops.append(('link', node, parent, node.name, position))
+        return ops
+
+    def modified(self, node: Node) -> Operation:
+        """修改文件内容的逆操作，必须在修改之前调用"""
+        return ('body', node, node.body.copy())
+
+    def moved(self, node: Node) -> Operation:
+        """移动节点的逆操作，必须在移动之前调用"""
+        return ('rename', node, node.parent, node.name)
+
+    def clear(self) -> None:
+        """清空撤销和重做记录"""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def undo(self) -> bool:
+        """撤销最近一条命令
+
+        Returns:
+            有可撤销的记录时返回 True
+        """
+        if not self.undo_stack:
+            return False
+        self.redo_stack.append(self._apply(self.undo_stack.pop()))
+        return True
+
+    def redo(self) -> bool:
+        """重做最近撤销的命令
+
+        Returns:
+            有可重做的记录时返回 True
+        """
+        if not self.redo_stack:
+            return False
+        self.undo_stack.append(self._apply(self.redo_stack.pop()))
+        return True
+
+    def _apply(self, group: Group) -> Group:
+        """按相反顺序执行一组逆操作，返回撤销这些操作所需的逆操作
+
+        连续的删除或挂回操作成批执行，批量删除（例如 del *.txt）的撤销和重做
+        只需遍历一次相关目录。
+        """
+        inverse: Group = []
+        ops = group[::-1]
+        start = 0
+        while start < len(ops):
+            kind = ops[start][0]
+            end = start + 1
+            if kind in ('unlink', 'link'):
+                while end < len(ops) and ops[end][0] == kind:
+                    end += 1
+            if kind == 'unlink':
+                inverse.extend(self._unlink_all([op[1] for op in ops[start:end]]))
+            elif kind == 'link':
+                inverse.extend(self._link_all(ops[start:end]))
+            else:
+                undone = self._apply_one(ops[start])
+                if undone is not None:
+                    inverse.append(undone)
+            start = end
+        return inverse
+
+    def _unlink_all(self, nodes: List[Node]) -> Group:
+        """依次删除节点，跳过已不在文件系统中的节点"""
+        nodes = [node for node in nodes if node.parent is not None]
+        inverse = self.removed_all(nodes)
+        for node in nodes:
+            self.fs.unlink(node)
+        return inverse
+
+    def _link_all(self, ops: Group) -> Group:
+        """依次把节点挂回删除时的位置，每个父目录最后只重新排列一次"""
+        fs = self.fs
+        inverse = []
+        linked: Dict[int, Tuple[Node, List[Tuple[int, str]]]] = {}
+        for _, node, parent, name, position in ops:
+            if node.parent is not None or parent.ino not in fs.inodes:
+                continue
+            fs.link(node, parent, name)
+            entry = linked.get(parent.ino)
+            if entry is None:
+                entry = linked[parent.ino] = (parent, [])
+            entry[1].append((position, name))
+            inverse.append(self.created(node))
+        for parent, inserted in linked.values():
+            # 挂回的节点都排在末尾，先去掉它们，再放回原来的位置
+            names = list(parent.children)[:-len(inserted)]
+            last = len(inserted) - 1
+            if all(inserted[i][0] >= inserted[i + 1][0] for i in range(last)) and inserted[0][0] <= len(names):
+                # 按目录顺序批量删除（例如 del *.txt）的撤销：位置不增，每个节点的最终位置
+                # 等于它的位置加上之后挂回的个数，与其余条目合并一次即可
+                order: List[Optional[str]] = [None] * (len(names) + len(inserted))
+                for i, (position, name) in enumerate(inserted):
+                    order[position + last - i] = name
+                rest = iter(names)
+                names = [name if name is not None else next(rest) for name in order]
+            else:
+                for position, name in inserted:
+                    names.insert(position, name)
+            parent.children.reorder(names)
+        return inverse
+
+    def _apply_one(self, op: Operation) -> Optional[Operation]:
+        """执行一条修改内容或移动的逆操作；节点已不在预期位置时跳过"""
+        fs = self.fs
+        kind, node = op[0], op[1]
+        if kind == 'body':
+            if node.parent is None:
+                return None
+            inverse = ('body', node, node.body)
+            fs.write(node.parent, node.name, op[2])
+            return inverse
+        if kind == 'rename':
+            parent, name = op[2], op[3]
+            if node.parent is None or parent.ino not in fs.inodes:
+                return None
+            inverse = self.moved(node)
+            fs.rename(node, parent, name)
+            return inverse
+        return None
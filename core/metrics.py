@@ -0,0 +1,326 @@
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import atexit
+import os
+import threading
+
+# 默认的延迟分桶（秒）：模拟器操作多在微秒级，完整的命令行在毫秒级
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Prometheus 文本格式的内容类型
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Counter:
+    """只增不减的计数"""
+    __slots__ = ('value',)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        """增加计数"""
+        self.value += amount
+
+
+class Histogram:
+    """延迟直方图：各分桶的计数（不累计）、观测值之和"""
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = bounds
+        # 最后一个分桶是 +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """记录一次观测"""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+def _escape(value: str) -> str:
+    """转义标签值中的反斜杠、双引号和换行"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _number(value: float) -> str:
+    """Prometheus 文本格式中的数值"""
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricFamily:
+    """同名指标按标签值区分的一组计数或直方图"""
+
+    def __init__(self, name: str, help_text: str, kind: str, label_names: Tuple[str, ...],
+                 factory: Callable[[], Any], lock: threading.Lock) -> None:
+        """初始化指标族
+
+        Args:
+            name: 指标名称
+            help_text: 说明，写入 # HELP 行
+            kind: counter 或 histogram
+            label_names: 标签名
+            factory: 为新的标签值创建计数或直方图
+            lock: 注册表的锁，新增标签值和导出时使用
+        """
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.label_names = label_names
+        self._factory = factory
+        self._lock = lock
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def labels(self, *values: str) -> Any:
+        """取得一组标签值对应的计数或直方图，第一次使用时创建
+
+        Args:
+            *values: 与 label_names 一一对应的标签值
+
+        Returns:
+            Counter 或 Histogram
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} 需要标签 {', '.join(self.label_names)}")
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def samples(self) -> Iterator[str]:
+        """按 Prometheus 文本格式逐行产出本指标族"""
+        help_text = self.help_text.replace('\\', '\\\\').replace('\n', '\\n')
+        yield f'# HELP {self.name} {help_text}'
+        yield f'# TYPE {self.name} {self.kind}'
+        for values, child in sorted(self._children.items()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values)]
+            labels = '{' + ','.join(pairs) + '}' if pairs else ''
+            if self.kind == 'counter':
+                yield f'{self.name}{labels} {child.value}'
+                continue
+            # 直方图的分桶计数是累计的，最后一个分桶 +Inf 等于总次数
+            total = 0
+            bounds = [_number(bound) for bound in child.bounds] + ['+Inf']
+            for bound, count in zip(bounds, list(child.counts)):
+                total += count
+                bucket = ','.join(pairs + [f'le="{bound}"'])
+                yield f'{self.name}_bucket{{{bucket}}} {total}'
+            yield f'{self.name}_sum{labels} {_number(child.sum)}'
+            yield f'{self.name}_count{labels} {total}'
+
+
+class MetricsRegistry:
+    """进程内的指标注册表，导出为 Prometheus 文本格式。
+
+    记录只是修改内存中的计数，不加锁也不做 I/O；锁只在第一次出现新的标签值
+    和导出时使用，导出可以在另一个线程（例如 HTTP 端点）中进行。
+    """
+
+    def __init__(self) -> None:
+        """初始化空注册表"""
+        self._lock = threading.Lock()
+        self._families: Dict[str, MetricFamily] = {}
+
+    def _family(self, name: str, help_text: str, kind: str, label_names: Sequence[str],
+                factory: Callable[[], Any]) -> MetricFamily:
+        family = self._families.get(name)
+        if family is None:
+            family = MetricFamily(name, help_text, kind, tuple(label_names), factory, self._lock)
+            with self._lock:
+                self._families[name] = family
+        elif family.kind != kind or family.label_names != tuple(label_names):
+            raise ValueError(f"指标 {name} 已以不同的类型或标签注册")
+        return family
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> MetricFamily:
+        """注册（或取得已注册的）计数指标
+
+        Args:
+            name: 指标名称，按惯例以 _total 结尾
+            help_text: 说明
+            label_names: 标签名
+
+        Returns:
+            指标族
+        """
+        return self._family(name, help_text, 'counter', label_names, Counter)
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily:
+        """注册（或取得已注册的）直方图指标，调用次数即直方图的 _count
+
+        Args:
+            name: 指标名称，按惯例以 _seconds 结尾
+            help_text: 说明
+            label_names: 标签名
+            buckets: 分桶上界，升序
+
+        Returns:
+            指标族
+        """
+        bounds = tuple(sorted(buckets))
+        return self._family(name, help_text, 'histogram', label_names, lambda: Histogram(bounds))
+
+    def render(self) -> str:
+        """导出全部指标
+
+        Returns:
+            Prometheus 文本格式
+        """
+        with self._lock:
+            lines: List[str] = []
+            for name in sorted(self._families):
+                lines.extend(self._families[name].samples())
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> None:
+        """把全部指标原子地写入文件（可供 node_exporter 的 textfile 采集器读取）
+
+        Args:
+            path: 文件路径
+
+        Raises:
+            OSError: 无法写入
+        """
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+    def export(self, path: str, interval: float = 15.0) -> threading.Thread:
+        """立即写出一次指标文件，之后在后台线程中定期写出，退出时再写出一次
+
+        Args:
+            path: 文件路径
+            interval: 写出间隔（秒）
+
+        Returns:
+            后台线程（守护线程）
+
+        Raises:
+            OSError: 第一次写入失败
+        """
+        self.write(path)
+        stop = threading.Event()
+
+        def write_quietly() -> None:
+            try:
+                self.write(path)
+            except OSError:
+                pass
+
+        def loop() -> None:
+            while not stop.wait(interval):
+                write_quietly()
+
+        def final() -> None:
+            stop.set()
+            write_quietly()
+
+        thread = threading.Thread(target=loop, name='metrics-export', daemon=True)
+        thread.start()
+        atexit.register(final)
+        return thread
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> Any:
+        """在后台线程中通过 HTTP 提供指标，GET /metrics 返回 Prometheus 文本格式
+
+        Args:
+            port: 监听端口，0 表示任选空闲端口
+            host: 监听地址，默认只接受本机连接
+
+        Returns:
+            HTTP 服务器，server_address 为实际监听的地址，shutdown() 停止服务
+
+        Raises:
+            OSError: 无法监听
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # 采集请求不写入游戏的终端
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+
+def patch_methods(cls: type, methods: Dict[str, Callable[..., Any]]) -> Callable[[], None]:
+    """替换类上的方法
+
+    Args:
+        cls: 类
+        methods: {方法名: 新的函数}
+
+    Returns:
+        恢复原方法的函数
+    """
+    originals = {name: cls.__dict__[name] for name in methods}
+    for name, method in methods.items():
+        setattr(cls, name, method)
+
+    def restore() -> None:
+        for name, method in originals.items():
+            setattr(cls, name, method)
+    return restore
+
+
+def add_metrics_arguments(parser: Any) -> None:
+    """向命令行解析器添加指标导出参数
+
+    Args:
+        parser: argparse.ArgumentParser
+    """
+    parser.add_argument('--metrics', metavar='文件',
+                        help="开启指标统计，定期以 Prometheus 文本格式写入文件（例如供 node_exporter 采集）")
+    parser.add_argument('--metrics-port', type=int, metavar='端口',
+                        help="开启指标统计，在 127.0.0.1 的该端口以 HTTP 提供 /metrics")
+    parser.add_argument('--metrics-interval', type=float, default=15.0, metavar='秒',
+                        help="写入指标文件的间隔，默认 15 秒")
+    parser.add_argument('--metrics-sample', type=float, default=0.1, metavar='比例',
+                        help="计时的抽样比例（0 到 1），默认 0.1；调用次数总是全部统计")
+
+def start_metrics(parser: Any, args: Any) -> Optional[MetricsRegistry]:
+    """按命令行参数开始导出指标
+
+    Args:
+        parser: 添加过指标参数的 argparse.ArgumentParser，无法导出时用它报告错误
+        args: 解析结果
+
+    Returns:
+        指标注册表；没有要求导出时为 None，此时不应安装任何统计
+    """
+    if args.metrics is None and args.metrics_port is None:
+        return None
+    if not 0 <= args.metrics_sample <= 1:
+        parser.error("--metrics-sample 必须在 0 到 1 之间")
+    registry = MetricsRegistry()
+    if args.metrics is not None:
+        try:
+            registry.export(args.metrics, args.metrics_interval)
+        except OSError as e:
+            parser.error(f"无法写入指标文件 {args.metrics}：{e}")
+    if args.metrics_port is not None:
+        try:
+            registry.serve(args.metrics_port)
+        except OSError as e:
+            parser.error(f"无法在端口 {args.metrics_port} 提供指标：{e}")
+    return registry
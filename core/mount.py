@@ -0,0 +1,162 @@
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+import os
+
+from .fs import FileBody, FileSystem, Node, Template
+
+# 按需读取宿主文件时每次读取的字符数
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class HostFileBody(FileBody):
+    """宿主文件的内容，读取时才打开文件。
+
+    未读取前长度为文件的字节数；type、find 等命令按块流式读取，不在内存中保留内容。
+    复制只复制路径，只有追加内容时才把文件读入内存，此后与普通 FileBody 相同。
+    文件按 UTF-8 解码（可带 BOM），无法解码的字节替换为占位符，换行统一为 \\n。
+    """
+
+    __slots__ = ('_path',)
+
+    def __init__(self, path: str, size: int) -> None:
+        """初始化宿主文件内容
+
+        Args:
+            path: 宿主文件的绝对路径
+            size: 文件大小（字节）
+        """
+        super().__init__()
+        self._path: Optional[str] = path
+        self._length = size
+
+    @property
+    def lazy(self) -> bool:
+        """内容是否尚未读入内存"""
+        return self._path is not None
+
+    def _read(self) -> Iterator[str]:
+        """按块读取宿主文件；文件已不可读时视为空文件"""
+        try:
+            with open(self._path, encoding='utf-8-sig', errors='replace') as f:
+                while True:
+                    chunk = f.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        return
+                    yield chunk
+        except OSError:
+            return
+
+    def __iter__(self) -> Iterator[str]:
+        """按块流式读取内容"""
+        if self._path is None:
+            return super().__iter__()
+        return self._read()
+
+    def __str__(self) -> str:
+        """读取全部内容；不缓存，宿主文件的内容不会常驻内存"""
+        if self._path is None:
+            return super().__str__()
+        return ''.join(self._read())
+
+    def append(self, text: str) -> None:
+        """先把文件读入内存再追加"""
+        if self._path is not None:
+            content = str(self)
+            self._chunks = [content] if content else []
+            self._count = len(self._chunks)
+            self._length = len(content)
+            self._path = None
+        super().append(text)
+
+    def copy(self) -> FileBody:
+        """未读取时返回指向同一宿主文件的副本"""
+        if self._path is None:
+            return super().copy()
+        return HostFileBody(self._path, self._length)
+
+
+class HostDirectory(Mapping):
+    """宿主目录的只读模板，第一次访问时才列出条目。
+
+    子目录同样是 HostDirectory，文件是 HostFileBody，因此挂载时不遍历目录树，
+    展开一层只调用一次 os.scandir。
+    """
+
+    def __init__(self, path: str) -> None:
+        """初始化宿主目录模板
+
+        Args:
+            path: 宿主目录的绝对路径
+        """
+        self.path = path
+        self._entries: Optional[Dict[str, Template]] = None
+
+    def _load(self) -> Dict[str, Template]:
+        """列出目录条目，无法访问的条目被跳过"""
+        if self._entries is None:
+            entries: Dict[str, Template] = {}
+            try:
+                with os.scandir(self.path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                entries[entry.name] = HostDirectory(entry.path)
+                            else:
+                                entries[entry.name] = HostFileBody(entry.path, entry.stat().st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+            self._entries = entries
+        return self._entries
+
+    def __getitem__(self, name: str) -> Template:
+        return self._load()[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __repr__(self) -> str:
+        return f"HostDirectory({self.path!r})"
+
+
+def parse_mount_spec(spec: str) -> Tuple[str, str]:
+    """解析命令行中的挂载参数
+
+    Args:
+        spec: 格式为 盘符=宿主目录，例如 D:=/srv/course
+
+    Returns:
+        (驱动器名, 宿主目录)
+
+    Raises:
+        ValueError: 格式不正确
+    """
+    letter, sep, path = spec.partition('=')
+    letter = letter.rstrip(':')
+    if not sep or len(letter) != 1 or not letter.isalpha() or not path:
+        raise ValueError(f"挂载参数的格式应为 盘符=目录：{spec}")
+    return letter.upper() + ':', path
+
+def mount(fs: FileSystem, letter: str, host_path: str) -> Node:
+    """把宿主目录以只读方式挂载为驱动器
+
+    挂载本身不读取任何目录或文件，耗时与目录树大小无关。
+
+    Args:
+        fs: 目标文件系统
+        letter: 驱动器名，例如 'D:' 或 'D'
+        host_path: 宿主目录路径
+
+    Returns:
+        驱动器根目录节点
+
+    Raises:
+        NotADirectoryError: host_path 不是目录
+    """
+    if not os.path.isdir(host_path):
+        raise NotADirectoryError(host_path)
+    letter = letter.rstrip(':').upper() + ':'
+    return fs.add_drive(letter, HostDirectory(os.path.abspath(host_path)), read_only=True)
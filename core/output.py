@@ -0,0 +1,104 @@
+from typing import Any, Callable, Iterable, List, Optional
+import os
+import re
+import sys
+
+# ANSI 颜色转义序列
+_ANSI = re.compile(r'\x1b\[[0-9;]*m')
+
+
+def supports_color(stream: Any) -> bool:
+    """输出流是否连接到终端；管道、文件和测试捕获的输出都不使用颜色"""
+    isatty = getattr(stream, 'isatty', None)
+    try:
+        return bool(isatty and isatty())
+    except ValueError:
+        # 已关闭的流
+        return False
+
+def strip_ansi(text: str) -> str:
+    """去掉文本中的颜色转义序列；没有转义序列时原样返回同一个对象"""
+    if '\x1b' not in text:
+        return text
+    return _ANSI.sub('', text)
+
+
+class OutputSink:
+    """缓冲的终端输出。
+
+    写入的文本先放入缓冲区，调用 flush 时一次性写出（交互模式下每条命令一次），
+    缓冲超过 buffer_size 个字符时也会自动写出，避免批量输出占用过多内存。
+
+    不输出颜色时写入前去掉 ANSI 转义序列；不含转义序列的文本直接放入缓冲区，
+    不产生任何新字符串。colorama 只在 Windows 终端上需要颜色时才导入。
+    """
+
+    def __init__(self, stream: Any = None, color: Optional[bool] = None, newline: str = '\n',
+                 encoding: Optional[str] = None, buffer_size: int = 64 * 1024) -> None:
+        """初始化输出
+
+        Args:
+            stream: 目标流，默认为 sys.stdout；只需要 write 方法，有 flush 方法时会调用
+            color: 是否输出颜色，None 表示仅当 stream 是终端时输出
+            newline: 写出时使用的换行符，网络终端使用 '\\r\\n'
+            encoding: 给出时把文本编码为字节再写出（例如 asyncio 的 StreamWriter）
+            buffer_size: 缓冲区达到多少个字符时自动写出
+        """
+        if stream is None:
+            stream = sys.stdout
+        if color is None:
+            color = supports_color(stream)
+        if color and os.name == 'nt' and stream in (sys.stdout, sys.stderr):
+            # 旧版 Windows 控制台需要 colorama 才能解释 ANSI 转义序列
+            import colorama
+            colorama.just_fix_windows_console()
+        self.stream = stream
+        self.color = color
+        self.newline = newline
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._size = 0
+        self._flush: Optional[Callable[[], Any]] = getattr(stream, 'flush', None)
+
+    def write(self, text: str) -> None:
+        """写入文本（不追加换行）
+
+        Args:
+            text: 可能带有颜色的文本
+        """
+        if not self.color:
+            text = strip_ansi(text)
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def writelines(self, lines: Iterable[str]) -> None:
+        """写入多行，每行之后追加换行
+
+        Args:
+            lines: 输出行，例如 GameManager.step 的返回值
+        """
+        buffer = self._buffer
+        color = self.color
+        for line in lines:
+            if not color:
+                line = strip_ansi(line)
+            buffer.append(line)
+            buffer.append('\n')
+            self._size += len(line) + 1
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """把缓冲区一次性写出"""
+        if self._buffer:
+            text = ''.join(self._buffer)
+            self._buffer.clear()
+            self._size = 0
+            if self.newline != '\n':
+                text = text.replace('\n', self.newline)
+            self.stream.write(text.encode(self.encoding) if self.encoding else text)
+        if self._flush is not None:
+            self._flush()
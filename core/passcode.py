@@ -0,0 +1,121 @@
+from typing import Iterable, Iterator, List
+import base64
+import binascii
+
+# 通关码使用的异或密钥，按字节循环使用
+KEY = b'OOP'
+
+_key_stream = KEY * 64
+
+def _key_for(length: int) -> bytes:
+    """返回长度为 length 的循环密钥，按需扩展缓存的密钥流"""
+    global _key_stream
+    if length > len(_key_stream):
+        _key_stream = KEY * (length // len(KEY) + 1)
+    return _key_stream[:length]
+
+def xor_key(data: bytes) -> bytes:
+    """把整个缓冲区与循环密钥异或（按大整数一次完成，不逐字节循环）
+
+    Args:
+        data: 输入字节
+
+    Returns:
+        异或后的字节，长度与输入相同
+    """
+    n = len(data)
+    if not n:
+        return b''
+    value = int.from_bytes(data, 'big') ^ int.from_bytes(_key_for(n), 'big')
+    return value.to_bytes(n, 'big')
+
+def _xor_batch(chunks: List[bytes]) -> List[bytes]:
+    """把多段数据拼成一个缓冲区统一异或，每段的密钥都从头开始"""
+    data = b''.join(chunks)
+    key = b''.join(_key_for(len(chunk)) for chunk in chunks)
+    if not data:
+        return [b''] * len(chunks)
+    mixed = (int.from_bytes(data, 'big') ^ int.from_bytes(key, 'big')).to_bytes(len(data), 'big')
+    result = []
+    offset = 0
+    for chunk in chunks:
+        result.append(mixed[offset:offset + len(chunk)])
+        offset += len(chunk)
+    return result
+
+def encode(student_info: str) -> str:
+    """把学号+姓名编码为通关码
+
+    Args:
+        student_info: 学号+姓名
+
+    Returns:
+        通关码
+    """
+    return base64.b64encode(xor_key(student_info.encode('utf-8'))).decode('utf-8')
+
+def decode(code: str) -> str:
+    """把通关码还原为学号+姓名
+
+    Args:
+        code: 通关码
+
+    Returns:
+        学号+姓名，通关码无效时返回空字符串
+    """
+    try:
+        return xor_key(base64.b64decode(code)).decode('utf-8')
+    except (binascii.Error, ValueError):
+        return ""
+
+def encode_many(infos: Iterable[str], batch_size: int = 4096) -> Iterator[str]:
+    """批量生成通关码，每 batch_size 条拼成一个缓冲区异或一次
+
+    Args:
+        infos: 学号+姓名序列
+        batch_size: 每批条数
+
+    Yields:
+        与输入一一对应的通关码
+    """
+    b64encode = base64.b64encode
+    for batch in _batches(infos, batch_size):
+        for mixed in _xor_batch([info.encode('utf-8') for info in batch]):
+            yield b64encode(mixed).decode('ascii')
+
+def decode_many(codes: Iterable[str], batch_size: int = 4096) -> Iterator[str]:
+    """批量验证通关码
+
+    Args:
+        codes: 通关码序列
+        batch_size: 每批条数
+
+    Yields:
+        与输入一一对应的学号+姓名，无效的通关码对应空字符串
+    """
+    for batch in _batches(codes, batch_size):
+        raw = []
+        valid = []
+        for code in batch:
+            try:
+                raw.append(base64.b64decode(code))
+                valid.append(True)
+            except (binascii.Error, ValueError):
+                raw.append(b'')
+                valid.append(False)
+        for ok, mixed in zip(valid, _xor_batch(raw)):
+            try:
+                yield mixed.decode('utf-8') if ok else ""
+            except UnicodeDecodeError:
+                yield ""
+
+def _batches(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    """把输入按固定大小分批"""
+    batch: List[str] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,84 @@
+from functools import lru_cache
+from typing import Tuple
+import sys
+
+# 规范化后的路径：(驱动器, 各级名称...)，例如 ('C:', 'Users', 'Player')
+PathParts = Tuple[str, ...]
+
+_SEPARATORS = str.maketrans('/', '\\')
+
+@lru_cache(maxsize=4096)
+def parse(path: str, cwd: PathParts) -> PathParts:
+    """按 Windows 规则把路径解析为规范化的路径元组，与宿主系统无关
+
+    支持驱动器号（C:\\foo、C:foo）、以反斜杠开头的当前驱动器根路径、
+    . 和 ..、重复的分隔符以及末尾的反斜杠；/ 与 \\ 等价。
+    结果中的每一段都经过 intern，相同的输入返回同一个元组对象。
+
+    Args:
+        path: 用户输入的路径
+        cwd: 当前目录的路径元组，用于解析相对路径
+
+    Returns:
+        规范化的路径元组；至少包含驱动器
+    """
+    path = path.translate(_SEPARATORS)
+    if len(path) >= 2 and path[1] == ':' and path[0].isalpha():
+        drive = path[0].upper() + ':'
+        path = path[2:]
+        if path.startswith('\\') or drive != cwd[0]:
+            # 没有记录其他驱动器的当前目录，C:foo 这类路径按根目录解析
+            parts = [drive]
+        else:
+            parts = list(cwd)
+    elif path.startswith('\\'):
+        parts = [cwd[0]]
+    else:
+        parts = list(cwd)
+
+    for part in path.split('\\'):
+        if not part or part == '.':
+            continue
+        if part == '..':
+            if len(parts) > 1:
+                parts.pop()
+            continue
+        parts.append(part)
+    return tuple(map(sys.intern, parts))
+
+@lru_cache(maxsize=4096)
+def to_string(parts: PathParts) -> str:
+    """把路径元组格式化为字符串，驱动器根目录带末尾反斜杠（C:\\）"""
+    if len(parts) == 1:
+        return parts[0] + '\\'
+    return '\\'.join(parts)
+
+@lru_cache(maxsize=4096)
+def split(path: str) -> PathParts:
+    """把规范化的路径字符串拆回路径元组"""
+    return tuple(sys.intern(part) for part in path.split('\\') if part)
+
+@lru_cache(maxsize=4096)
+def normalize(path: str, cwd: str) -> str:
+    """规范化路径字符串
+
+    Args:
+        path: 用户输入的路径
+        cwd: 规范化的当前目录
+
+    Returns:
+        规范化的绝对路径字符串
+    """
+    return to_string(parse(path, split(cwd)))
+
+def dirname(path: str) -> str:
+    """规范化路径的父目录；驱动器根目录没有父目录，返回空字符串"""
+    parts = split(path)
+    if len(parts) <= 1:
+        return ''
+    return to_string(parts[:-1])
+
+def basename(path: str) -> str:
+    """规范化路径的最后一段；驱动器根目录返回空字符串"""
+    parts = split(path)
+    return parts[-1] if len(parts) > 1 else ''
@@ -0,0 +1,222 @@
+from typing import BinaryIO, List, Mapping, Optional, Tuple
+import marshal
+import os
+import struct
+
+from .events import CREATED, CWD_CHANGED, DELETED, MODIFIED
+from .fs import Node, Template
+from .simulator import WindowsCliSimulator
+
+SNAPSHOT_MAGIC = b'CGS1'
+_LENGTH = struct.Struct('<I')
+
+def _plain(entry: Template) -> Template:
+    """把只读模板转换为 marshal 可以序列化的普通字典"""
+    if isinstance(entry, str):
+        return entry
+    if not isinstance(entry, Mapping):
+        # 尚未读取的文件内容
+        return str(entry)
+    return {name: _plain(child) for name, child in entry.items()}
+
+def _split(path: str) -> Tuple[str, str]:
+    """把完整路径拆成父目录路径和名称，不依赖宿主系统的路径规则"""
+    parent, _, name = path.rpartition('\\')
+    return parent, name
+
+
+class SessionStore:
+    """会话存档：一个紧凑的二进制快照加一个只追加的变更日志。
+
+    快照是用 marshal 序列化的整棵文件树、当前目录和关卡序号。两次快照之间，
+    每次变更只向日志追加一条记录，保存的开销与变更量成正比。日志超过
+    compact_threshold 条记录时重新写一次快照并清空日志。
+
+    恢复时快照中的目录以模板形式挂回文件系统，在访问时才逐层展开，
+    因此即使树很大，载入也只需要反序列化的时间。
+    """
+
+    def __init__(self, path: str, compact_threshold: int = 5000) -> None:
+        """初始化存档
+
+        Args:
+            path: 存档路径前缀，实际文件为 path.snap 和 path.log
+            compact_threshold: 日志达到多少条记录时重写快照
+        """
+        self.snapshot_path = path + '.snap'
+        self.journal_path = path + '.log'
+        self.compact_threshold = compact_threshold
+        self.simulator: Optional[WindowsCliSimulator] = None
+        self.level_index = 0
+        self._pending: List[bytes] = []
+        self._journal_records = 0
+        self._moving: Optional[Node] = None
+
+    def attach(self, simulator: WindowsCliSimulator, level_index: int) -> None:
+        """开始记录模拟器的变更
+
+        Args:
+            simulator: 要记录的模拟器
+            level_index: 当前关卡序号
+        """
+        self.simulator = simulator
+        self.level_index = level_index
+        simulator.fs.listeners.append(self._on_fs_change)
+        simulator.subscribe(self._on_event)
+
+    def _record(self, *op: object) -> None:
+        """把一条变更编码后放入待写缓冲区"""
+        data = marshal.dumps(op)
+        self._pending.append(_LENGTH.pack(len(data)) + data)
+
+    def _on_fs_change(self, event: str, node: Node, data: Optional[str]) -> None:
+        """把文件系统事件转换为日志记录
+
+        移动和从已有节点复制只记录路径，记录的大小与子树大小无关。
+        """
+        if event == DELETED and data is not None:
+            # 移动：随后的 CREATED 事件属于同一次移动，不再记录
+            self._record('move', node.path(), data)
+            self._moving = node
+        elif event == DELETED:
+            self._record('del', node.path())
+        elif event == CREATED and node is self._moving:
+            self._moving = None
+        elif event == CREATED and data is not None and data.partition('\\')[0] not in node.fs.read_only:
+            # 只读驱动器在恢复之后才重新挂载，从那里复制的内容仍按完整内容记录
+            self._record('copy', data, node.path())
+        elif event == MODIFIED and data is not None:
+            self._record('append', node.path(), data)
+        elif event in (CREATED, MODIFIED):
+            self._record('put', node.path(), _plain(node.fs.export(node)))
+
+    def _on_event(self, event: str, path: str) -> None:
+        """记录当前目录的变化"""
+        if event == CWD_CHANGED:
+            self._record('cwd', path)
+
+    def set_level(self, level_index: int) -> None:
+        """记录关卡序号的变化"""
+        if level_index != self.level_index:
+            self.level_index = level_index
+            self._record('level', level_index)
+
+    def save(self) -> None:
+        """把缓冲的变更追加到日志并落盘；日志过长时改写快照"""
+        if not self._pending:
+            return
+        if self._journal_records + len(self._pending) >= self.compact_threshold:
+            self.snapshot()
+            return
+        with open(self.journal_path, 'ab') as f:
+            f.write(b''.join(self._pending))
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_records += len(self._pending)
+        self._pending.clear()
+
+    def snapshot(self) -> None:
+        """写入完整快照并清空日志"""
+        simulator = self.simulator
+        state = {
+            'level': self.level_index,
+            'cwd': simulator.cwd,
+            # 只读驱动器（挂载的宿主目录）不保存，恢复后重新挂载
+            'drives': {letter: _plain(simulator.fs.export(root)) for letter, root in simulator.fs.drives.items()
+                       if letter not in simulator.fs.read_only},
+        }
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            marshal.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # 快照已包含全部变更，日志从头开始
+        open(self.journal_path, 'wb').close()
+        self._journal_records = 0
+        self._pending.clear()
+
+    def load(self) -> Optional[Tuple[WindowsCliSimulator, int]]:
+        """从快照和日志恢复会话
+
+        Returns:
+            (模拟器, 关卡序号)；没有存档或快照损坏时返回 None
+        """
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                    return None
+                state = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        simulator = WindowsCliSimulator()
+        for letter, template in state['drives'].items():
+            simulator.fs.add_drive(letter, template)
+        simulator.fs.invalidate()
+        simulator.cwd = state['cwd']
+        level_index = state['level']
+
+        self._journal_records = 0
+        try:
+            with open(self.journal_path, 'rb') as f:
+                level_index = self._replay(f, simulator, level_index)
+        except OSError:
+            pass
+        return simulator, level_index
+
+    def _replay(self, f: BinaryIO, simulator: WindowsCliSimulator, level_index: int) -> int:
+        """按顺序重放日志记录，遇到不完整的尾部记录时停止
+
+        Returns:
+            重放后的关卡序号
+        """
+        fs = simulator.fs
+        data = f.read()
+        offset = 0
+        while offset + _LENGTH.size <= len(data):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            start = offset + _LENGTH.size
+            if start + length > len(data):
+                break
+            op = marshal.loads(data[start:start + length])
+            offset = start + length
+            self._journal_records += 1
+
+            kind = op[0]
+            if kind == 'cwd':
+                simulator.cwd = op[1]
+            elif kind == 'level':
+                level_index = op[1]
+            else:
+                node = simulator._get_directory(op[1])
+                if kind == 'del' and node is not None:
+                    fs.unlink(node)
+                elif kind == 'append' and node is not None:
+                    fs.append(node, op[2])
+                elif kind == 'put':
+                    parent_path, name = _split(op[1])
+                    parent = simulator._get_directory(parent_path)
+                    if parent is not None and parent.is_dir:
+                        fs.graft(parent, name, op[2])
+                elif kind in ('move', 'copy') and node is not None:
+                    parent_path, name = _split(op[2])
+                    parent = simulator._get_directory(parent_path)
+                    if parent is None or not parent.is_dir:
+                        continue
+                    if kind == 'move':
+                        fs.rename(node, parent, name)
+                    else:
+                        fs.graft(parent, name, fs.export(node), node)
+        return level_index
+
+    def clear(self) -> None:
+        """删除存档文件"""
+        for path in (self.snapshot_path, self.journal_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._pending.clear()
+        self._journal_records = 0
@@ -0,0 +1,350 @@
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import re
+
+from .events import CREATED, DELETED, MODIFIED
+from .fs import FileSystem, Node
+
+# 索引中的词：连续的字母、数字或下划线，统一转换为 casefold 形式
+_WORD = re.compile(r'\w+')
+
+# findstr 正则表达式中的元字符
+_FINDSTR_META = set('.*^$[]\\')
+
+LineMatcher = Callable[[str], bool]
+
+def _translate(pattern: str) -> str:
+    """把 findstr 的正则表达式转换为 Python 正则表达式
+
+    findstr 只支持 . * ^ $ [类] [^类] \\< \\> 和 \\x 转义，其余字符（例如 + ? ( ) |）都是普通字符。
+    """
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '\\' and i + 1 < n:
+            nxt = pattern[i + 1]
+            if nxt == '<':
+                out.append(r'\b(?=\w)')
+            elif nxt == '>':
+                out.append(r'\b(?<=\w)')
+            else:
+                out.append(re.escape(nxt))
+            i += 2
+            continue
+        if c == '[':
+            end = pattern.find(']', i + 2)
+            if end > i:
+                cls = pattern[i + 1:end]
+                negate = cls.startswith('^')
+                if negate:
+                    cls = cls[1:]
+                body = ''.join(ch if ch == '-' else re.escape(ch) for ch in cls)
+                out.append(('[^' if negate else '[') + body + ']')
+                i = end + 1
+                continue
+        if c == '.' or (c == '*' and out):
+            out.append(c)
+        elif c == '^' and i == 0:
+            out.append('^')
+        elif c == '$' and i == n - 1:
+            out.append('$')
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+@lru_cache(maxsize=256)
+def compile_search(strings: Tuple[str, ...], literal: bool = True, ignore_case: bool = False,
+                   begin: bool = False, end: bool = False, whole_line: bool = False) -> LineMatcher:
+    """把一组搜索串编译为一个匹配函数，结果会被缓存
+
+    多个搜索串之间是“或”的关系，合并为一个正则表达式，每行只匹配一次。
+
+    Args:
+        strings: 搜索串
+        literal: 按字面匹配（find、findstr /L）；否则按 findstr 正则表达式匹配
+        ignore_case: 不区分大小写
+        begin: 只匹配行首（/B）
+        end: 只匹配行尾（/E）
+        whole_line: 整行完全匹配（/X）
+
+    Returns:
+        参数为一行文本、返回是否匹配的函数
+    """
+    if literal and len(strings) == 1 and not (ignore_case or begin or end or whole_line):
+        needle = strings[0]
+        return lambda line: needle in line
+    alternatives = '|'.join(re.escape(s) if literal else _translate(s) for s in strings)
+    regex = re.compile(f'(?:{alternatives})', re.IGNORECASE if ignore_case else 0)
+    if whole_line:
+        fullmatch = regex.fullmatch
+        return lambda line: fullmatch(line) is not None
+    if begin and end:
+        regex = re.compile(f'^(?:{alternatives})$', regex.flags)
+    elif begin:
+        regex = re.compile(f'^(?:{alternatives})', regex.flags)
+    elif end:
+        regex = re.compile(f'(?:{alternatives})$', regex.flags)
+    search = regex.search
+    return lambda line: search(line) is not None
+
+def _terms(text: str) -> Set[str]:
+    """文本中出现的所有词"""
+    return set(_WORD.findall(text.casefold()))
+
+def _trigrams(term: str) -> Set[str]:
+    """词中所有长度为 3 的子串；短于 3 个字符的词没有三字母组"""
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+def _literal_part(string: str, literal: bool) -> Optional[str]:
+    """搜索串中必须原样出现的部分；正则表达式只处理首尾的 ^ 和 $，其余情况返回 None"""
+    if literal:
+        return string
+    if string.startswith('^'):
+        string = string[1:]
+    if string.endswith('$') and not string.endswith('\\$'):
+        string = string[:-1]
+    if any(c in _FINDSTR_META for c in string):
+        return None
+    return string
+
+
+class ContentIndex:
+    """文件内容的倒排索引：词 -> 含有该词的文件 inode 编号集合。
+
+    索引监听文件系统事件增量维护：新建或修改文件时只重新切分这一个文件，
+    追加内容时只切分追加的文本。删除和移动只记下节点，查询前才检查它是否
+    仍挂在某个驱动器下，所以移动目录不需要重新索引其中的文件。
+    新出现的目录（包括每关嫁接的模板和整个驱动器）先记为待索引，
+    查询涉及到它们时才展开并索引，不查询的子树保持未展开。
+    只读驱动器（挂载的宿主目录）不建索引，搜索时直接按需读取。
+
+    findstr 按子串匹配，搜索串首尾的词可能只是某个词的一部分，因此另有一个
+    三字母组 -> 词 的映射，查这类词时只需检查含有最少见三字母组的那些词。
+
+    索引只用于缩小候选范围：词统一转换为 casefold 形式，候选文件仍需逐行匹配确认。
+    """
+
+    def __init__(self, fs: FileSystem) -> None:
+        """创建索引并开始监听文件系统
+
+        Args:
+            fs: 要索引的文件系统
+        """
+        self.fs = fs
+        self.postings: Dict[str, Set[int]] = {}
+        self.terms: Dict[int, Set[str]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._pending: Dict[int, Node] = {}
+        self._complete: Set[int] = set()
+        self._detached: List[Node] = []
+        self._roots: Dict[str, Node] = {}
+        fs.listeners.append(self._on_fs_change)
+
+    def _on_fs_change(self, event: str, node: Node, data: Optional[str]) -> None:
+        """按文件系统事件增量更新索引"""
+        if event == DELETED:
+            self._detached.append(node)
+        elif node.is_dir:
+            if event == CREATED:
+                self._pending[node.ino] = node
+        elif event == MODIFIED and data is not None and node.ino in self.terms:
+            self._add(node.ino, _terms(data))
+        elif event == MODIFIED or node.ino not in self.terms:
+            self._discard(node.ino)
+            self._add(node.ino, _terms(str(node.body)))
+
+    def _add(self, ino: int, terms: Set[str]) -> None:
+        """把词登记到文件名下"""
+        postings = self.postings
+        for term in terms:
+            inos = postings.get(term)
+            if inos is None:
+                postings[term] = {ino}
+                for gram in _trigrams(term):
+                    self._grams.setdefault(gram, set()).add(term)
+            else:
+                inos.add(ino)
+        known = self.terms.get(ino)
+        if known is None:
+            self.terms[ino] = terms
+        else:
+            known |= terms
+
+    def _discard(self, ino: int) -> None:
+        """移除一个文件的全部词"""
+        postings = self.postings
+        for term in self.terms.pop(ino, ()):
+            inos = postings[term]
+            inos.discard(ino)
+            if not inos:
+                del postings[term]
+                for gram in _trigrams(term):
+                    terms = self._grams[gram]
+                    terms.discard(term)
+                    if not terms:
+                        del self._grams[gram]
+
+    def _attached(self, node: Node) -> bool:
+        """节点是否仍挂在某个驱动器下"""
+        while node.parent is not None:
+            node = node.parent
+        return self.fs.drives.get(node.name) is node
+
+    def _index_tree(self, directory: Node) -> None:
+        """索引目录子树中尚未索引的文件，必要时展开模板"""
+        terms = self.terms
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            self._complete.add(current.ino)
+            for child in current.children.values():
+                if child.is_dir:
+                    self._pending.pop(child.ino, None)
+                    stack.append(child)
+                elif child.ino not in terms:
+                    self._add(child.ino, _terms(str(child.body)))
+
+    def _purge(self, node: Node) -> None:
+        """移除已删除子树中的文件；只遍历已展开的部分，未展开的模板从未被索引"""
+        stack = [node]
+        while stack:
+            child = stack.pop()
+            if child._children is not None:
+                self._complete.discard(child.ino)
+                stack.extend(child._children.values())
+            else:
+                self._discard(child.ino)
+
+    def sync(self, scope: Node) -> None:
+        """查询前处理积压的删除，并索引 scope 子树中待索引的目录
+
+        Args:
+            scope: 将要搜索的目录
+        """
+        for letter, root in self.fs.drives.items():
+            old = self._roots.get(letter)
+            if old is not root:
+                if old is not None:
+                    self._detached.append(old)
+                self._roots[letter] = root
+                if letter not in self.fs.read_only:
+                    self._pending[root.ino] = root
+
+        if self._detached:
+            for node in self._detached:
+                if not self._attached(node):
+                    self._pending.pop(node.ino, None)
+                    self._purge(node)
+            self._detached.clear()
+
+        scope_done = False
+        for ino, directory in list(self._pending.items()):
+            if ino not in self._pending:
+                continue
+            if not self._attached(directory):
+                del self._pending[ino]
+            elif _within(directory, scope):
+                del self._pending[ino]
+                self._index_tree(directory)
+            elif not scope_done and scope.ino not in self._complete and _within(scope, directory):
+                # 待索引的是 scope 的祖先：只索引 scope 这一部分，祖先保持待索引
+                self._index_tree(scope)
+                scope_done = True
+
+    def candidates(self, strings: Iterable[str], literal: bool = True) -> Optional[Set[int]]:
+        """可能含有任一搜索串的文件 inode 编号
+
+        搜索串中完整的词必须作为词出现；首尾不完整的词只能是某个词的后缀或前缀，
+        这时在词表中查找，词表远小于文件内容。
+
+        Args:
+            strings: 搜索串
+            literal: 搜索串是否按字面匹配
+
+        Returns:
+            候选 inode 编号集合；无法用索引缩小范围时返回 None
+        """
+        result: Set[int] = set()
+        for string in strings:
+            part = _literal_part(string, literal)
+            if part is None:
+                return None
+            folded = part.casefold()
+            words = list(_WORD.finditer(folded))
+            if not words:
+                return None
+            matched: Optional[Set[int]] = None
+            for word in words:
+                inos = self._lookup(word.group(), word.start() == 0, word.end() == len(folded))
+                matched = inos if matched is None else matched & inos
+                if not matched:
+                    break
+            result |= matched
+        return result
+
+    def _lookup(self, word: str, open_start: bool, open_end: bool) -> Set[int]:
+        """查找一个词的文件；open_start/open_end 表示这一端可能只是某个词的一部分"""
+        postings = self.postings
+        if not open_start and not open_end:
+            return postings.get(word, set())
+        if open_start and open_end:
+            test = lambda term: word in term
+        elif open_start:
+            test = lambda term: term.endswith(word)
+        else:
+            test = lambda term: term.startswith(word)
+        grams = _trigrams(word)
+        if grams:
+            terms = min((self._grams.get(gram, set()) for gram in grams), key=len)
+        else:
+            terms = postings.keys()
+        inos: Set[int] = set()
+        for term in terms:
+            if test(term):
+                inos |= postings[term]
+        return inos
+
+    def files_under(self, scope: Node, inos: Iterable[int]) -> Iterator[Node]:
+        """按 findstr /S 的遍历顺序列出 scope 子树中的候选文件
+
+        Args:
+            scope: 搜索的目录
+            inos: 候选 inode 编号
+
+        Yields:
+            文件节点，同一目录中文件在子目录之前，各自按名称排序
+        """
+        keyed = []
+        for ino in inos:
+            node = self.fs.inodes.get(ino)
+            if node is None:
+                continue
+            key = _walk_key(node, scope)
+            if key is not None:
+                keyed.append((key, node))
+        keyed.sort(key=lambda item: item[0])
+        for _, node in keyed:
+            yield node
+
+
+def _within(node: Node, ancestor: Node) -> bool:
+    """node 是否为 ancestor 或其后代"""
+    while node is not None:
+        if node is ancestor:
+            return True
+        node = node.parent
+    return False
+
+def _walk_key(node: Node, scope: Node) -> Optional[Tuple[Tuple[int, str], ...]]:
+    """文件相对 scope 的排序键，不在 scope 中时返回 None"""
+    key = [(0, node.name.casefold())]
+    parent = node.parent
+    while parent is not scope:
+        if parent is None:
+            return None
+        key.append((1, parent.name.casefold()))
+        parent = parent.parent
+    key.reverse()
+    return tuple(key)
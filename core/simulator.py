@@ -1,25 +1,146 @@
-from typing import Dict, List, Optional, Union, Tuple
-from pathlib import Path
-from datetime import datetime
-import os
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from itertools import islice
+import time
+from types import MappingProxyType
+
+from .events import CWD_CHANGED, Listener
+from .fs import FileBody, FileSystem, Node, Template
+from .cmdline import split_lines
+from .commands import Failure, join_output
+from .history import History, Operation
+from . import paths
+from .mount import mount as mount_drive
+from .search import ContentIndex, compile_search
+from .wildcard import compile_pattern, has_wildcards, match_names
+
+# dir /p 每页显示的条目数
+DIR_PAGE_SIZE = 20
+
+# tree 使用的连线字符：(中间项, 最后一项, 竖线延续, 空白延续)
+TREE_GLYPHS = ('├─', '└─', '│  ', '    ')
+TREE_GLYPHS_ASCII = ('+---', '\\---', '|   ', '    ')
+
+def _count_files(entry: Template) -> int:
+    """统计模板中的文件数，只遍历只读映射，不展开任何节点"""
+    if not isinstance(entry, Mapping):
+        return 1
+    count = 0
+    stack = [entry]
+    while stack:
+        for child in stack.pop().values():
+            if isinstance(child, Mapping):
+                stack.append(child)
+            else:
+                count += 1
+    return count
+
+# 新会话的当前目录
+DEFAULT_CWD = 'C:\\Users\\Player'
 
 class WindowsCliSimulator:
     """Windows 命令行模拟器类，用于模拟 Windows 命令行的行为。"""
     
-    def __init__(self) -> None:
-        """初始化模拟器，设置虚拟文件系统和当前工作目录。"""
-        self.file_system: Dict[str, Union[str, Dict]] = {
-            'C:': {
-                'Users': {
-                    'Player': {
-                        'Documents': {},
-                        'Desktop': {}
-                    }
-                }
-            }
-        }
-        self.cwd: str = 'C:\\Users\\Player'
+    def __init__(self, history_limit: int = 50, content_index: bool = True) -> None:
+        """初始化模拟器，设置虚拟文件系统和当前工作目录。
+        
+        Args:
+            history_limit: 最多可以撤销的命令步数
+            content_index: findstr /S 是否使用文件内容索引，为 False 时每次遍历目录树
+        """
+        self.fs = FileSystem()
+        root = self.fs.add_drive('C:')
+        player = self.fs.mkdir(self.fs.mkdir(root, 'Users'), 'Player')
+        self.fs.mkdir(player, 'Documents')
+        self.fs.mkdir(player, 'Desktop')
+        self._cwd: str = DEFAULT_CWD
+        # 挂载的驱动器 -> 宿主目录；挂载不进入存档，恢复存档时据此重新挂载
+        self.mounts: Dict[str, str] = {}
         self.last_command_with_args: Optional[Tuple[str, List[str]]] = None
+        self.listeners: List[Listener] = []
+        self.pager: Optional[Iterator[Tuple[List[str], bool]]] = None
+        self._time_cache: Dict[int, str] = {}
+        self.fs.listeners.append(self._on_fs_change)
+        # 初始目录不进入撤销记录
+        self.history = History(self.fs, history_limit)
+        self.use_content_index = content_index
+        self._content_index: Optional[ContentIndex] = None
+        
+    @property
+    def content_index(self) -> Optional[ContentIndex]:
+        """文件内容索引，第一次使用时才建立并开始跟踪修改；禁用时为 None"""
+        if self._content_index is None and self.use_content_index:
+            self._content_index = ContentIndex(self.fs)
+        return self._content_index
+        
+    def mount(self, letter: str, host_path: str) -> Node:
+        """把宿主目录以只读方式挂载为驱动器（例如课程资料挂载为 D:）
+        
+        目录在第一次访问时才列出，文件内容在读取时才打开，挂载本身不读取任何数据。
+        
+        Args:
+            letter: 驱动器名，例如 'D:'
+            host_path: 宿主目录路径
+            
+        Returns:
+            驱动器根目录节点
+            
+        Raises:
+            NotADirectoryError: host_path 不是目录
+        """
+        root = mount_drive(self.fs, letter, host_path)
+        self.fs.invalidate()
+        self.mounts[root.name] = host_path
+        return root
+        
+    def _read_only_file(self, node: Optional[Node]) -> bool:
+        """节点是否为关卡中的只读文件（名为 readonly.txt）：只能用 del /F 删除，不能移动或覆盖"""
+        return node is not None and not node.is_dir and node.name.casefold() == 'readonly.txt'
+        
+    def _overwrites_read_only(self, parent: Node, name: str, entry: Template) -> bool:
+        """按 _merge 的方式合并模板时是否会替换只读文件，只检查与已有目录重叠的部分"""
+        existing = parent.children.get(name)
+        if existing is not None and existing.is_dir and isinstance(entry, Mapping):
+            return any(self._overwrites_read_only(existing, child_name, child) for child_name, child in entry.items())
+        return self._read_only_file(existing)
+        
+    def _read_only(self, node: Node) -> bool:
+        """节点是否位于只读驱动器上"""
+        if not self.fs.read_only:
+            return False
+        while node.parent is not None:
+            node = node.parent
+        return node.name in self.fs.read_only
+        
+    @property
+    def cwd(self) -> str:
+        """当前工作目录"""
+        return self._cwd
+        
+    @cwd.setter
+    def cwd(self, path: str) -> None:
+        if path != self._cwd:
+            self._cwd = path
+            self._publish(CWD_CHANGED, path)
+            
+    def subscribe(self, listener: Listener) -> None:
+        """订阅变更事件（创建、删除、修改、切换目录）
+        
+        Args:
+            listener: 监听函数，参数为事件类型和完整路径
+        """
+        self.listeners.append(listener)
+        
+    def _publish(self, event: str, path: str) -> None:
+        """把事件发送给所有订阅者"""
+        for listener in self.listeners:
+            listener(event, path)
+            
+    def _on_fs_change(self, event: str, node: Node, data: Optional[str]) -> None:
+        """把文件系统事件转换为带路径的模拟器事件，没有订阅者时不计算路径"""
+        # 目录内容变化后未显示完的分页已经过时
+        self.pager = None
+        if self.listeners:
+            self._publish(event, node.path())
         
     def _normalize_path(self, path: str) -> str:
         """规范化路径，处理相对路径和绝对路径。
@@ -32,17 +153,7 @@ class WindowsCliSimulator:
         """
         if not path:
             return self.cwd
-            
-        # 处理驱动器切换
-        if path.endswith(':'):
-            return path + '\\'
-            
-        # 处理绝对路径
-        if path.startswith('C:\\'):
-            return path
-            
-        # 处理相对路径
-        return os.path.join(self.cwd, path)
+        return paths.normalize(path, self.cwd)
         
     def _get_path_parts(self, path: str) -> List[str]:
         """将路径分解为部分。
@@ -53,41 +164,140 @@ class WindowsCliSimulator:
         Returns:
             路径部分列表
         """
-        return [p for p in path.split('\\') if p]
+        return list(paths.split(path))
         
-    def _get_directory(self, path: str) -> Optional[Union[str, Dict]]:
-        """获取指定路径的目录内容或文件内容。
+    def _get_directory(self, path: str) -> Optional[Node]:
+        """获取指定路径对应的节点。
         
         Args:
             path: 目标路径
             
         Returns:
-            目录内容字典、文件内容字符串或 None（如果不存在）
+            目录或文件节点，或 None（如果不存在）
         """
-        current = self.file_system
-        for part in self._get_path_parts(path):
-            if part not in current:
-                return None
-            current = current[part]
-        return current
+        return self.fs.resolve(path, self._get_path_parts(path))
         
-    def _get_parent_directory(self, path: str) -> Optional[Dict]:
+    def _get_parent_directory(self, path: str) -> Optional[Node]:
         """获取指定路径的父目录。
         
         Args:
             path: 目标路径
             
         Returns:
-            父目录字典或 None（如果不存在）
+            父目录节点或 None（如果不存在或不是目录）
         """
-        parent_path = os.path.dirname(path)
+        parent_path = paths.dirname(path)
         if not parent_path:
             return None
-        return self._get_directory(parent_path)
+        parent = self._get_directory(parent_path)
+        if parent is None or not parent.is_dir:
+            return None
+        return parent
+        
+    def _format_time(self, timestamp: float) -> str:
+        """把时间戳格式化为 dir 使用的日期时间，同一分钟内的结果会被缓存
+        
+        Args:
+            timestamp: 时间戳（秒）
+            
+        Returns:
+            形如 2024-01-01  12:00 的字符串
+        """
+        minute = int(timestamp // 60)
+        text = self._time_cache.get(minute)
+        if text is None:
+            if len(self._time_cache) >= 1024:
+                self._time_cache.clear()
+            text = time.strftime('%Y-%m-%d  %H:%M', time.localtime(minute * 60))
+            self._time_cache[minute] = text
+        return text
+        
+    def _iter_dir_entries(self, directory: Node, wide: bool, pattern: Optional[str] = None,
+                          by_name: bool = False) -> Iterator[str]:
+        """逐行生成目录条目，不包含标题行
+        
+        Args:
+            directory: 目录节点
+            wide: 是否使用宽格式
+            pattern: 通配符模式，给出时只列出匹配的条目
+            by_name: 是否按名称排序（使用目录缓存的排序结果），否则按创建顺序
+            
+        Yields:
+            输出行
+        """
+        children = directory.children
+        names = children.sorted_names() if by_name else children
+        if pattern is None:
+            entries = [(name, children[name]) for name in names] if by_name else children.items()
+        else:
+            entries = [(name, children[name]) for name in match_names(names, pattern)]
+            if not entries:
+                yield Failure("找不到文件")
+                return
+                
+        if wide:
+            # 宽格式显示：只显示文件名，每行5个
+            row = []
+            for name, node in entries:
+                row.append(f"[{name}]" if node.is_dir else name)
+                if len(row) == 5:
+                    yield ' '.join(row)
+                    row = []
+            if row:
+                yield ' '.join(row)
+            return
+            
+        fmt = self._format_time
+        # 驱动器根目录（包括挂载的驱动器）没有上级目录
+        if directory.parent is not None and pattern is None:
+            yield f"{fmt(directory.parent.mtime)}    <DIR>          .."
+        for name, node in entries:
+            if node.is_dir:
+                yield f"{fmt(node.mtime)}    <DIR>          {name}"
+            else:
+                yield f"{fmt(node.mtime)}                 {node.size} {name}"
+                
+    def iter_dir(self, path: Optional[str] = None, options: Optional[List[str]] = None) -> Iterator[str]:
+        """逐行生成 dir 命令的输出，调用方可以只取需要的部分
+        
+        Args:
+            path: 目标路径
+            options: 命令选项列表
+            
+        Yields:
+            输出行
+        """
+        target_path = self._normalize_path(path) if path else self.cwd
+        pattern = paths.basename(target_path)
+        if has_wildcards(pattern):
+            target_path = paths.dirname(target_path)
+        else:
+            pattern = None
+        directory = self._get_directory(target_path)
+        
+        if directory is None or not directory.is_dir:
+            yield Failure(f"系统找不到指定的路径。\n{target_path}")
+            return
+            
+        header = f" {target_path} 的目录\n"
+        options = options or []
+        by_name = '/o' in options or '/on' in options or '/o:n' in options
+        entries = self._iter_dir_entries(directory, '/w' in options, pattern, by_name)
+        # 先取出第一条：通配符没有匹配时整个输出以 Failure 开头，&& 和 || 才能据此判断
+        first = next(entries, None)
+        if isinstance(first, Failure):
+            yield Failure(f"{header}\n{first}")
+            return
+        yield header
+        if first is not None:
+            yield first
+        yield from entries
         
     def simulate_dir(self, path: Optional[str] = None, options: Optional[List[str]] = None) -> str:
         """模拟 dir 命令的输出。
         
+        带 /p 选项时只返回第一页，其余页面由 simulate_more 按需生成。
+        
         Args:
             path: 目标路径
             options: 命令选项列表
@@ -96,59 +306,47 @@ class WindowsCliSimulator:
             模拟的 dir 命令输出
         """
         self.last_command_with_args = ('dir', [path] if path else [] + (options or []))
+        self.pager = None
         
-        target_path = self._normalize_path(path) if path else self.cwd
-        directory = self._get_directory(target_path)
+        if options and '/p' in options and '/w' not in options:
+            self.pager = self._paginate(self.iter_dir(path, options), DIR_PAGE_SIZE)
+            return self.simulate_more()
+            
+        return join_output(self.iter_dir(path, options))
         
-        if directory is None or isinstance(directory, str):
-            return f"系统找不到指定的路径。\n{target_path}"
+    @staticmethod
+    def _paginate(lines: Iterator[str], page_size: int) -> Iterator[Tuple[List[str], bool]]:
+        """把输出行按页切分，每次只多读一页用来判断是否还有后续
+        
+        第一页额外包含标题行。
+        
+        Yields:
+            (本页的行, 是否还有下一页)
+        """
+        page = list(islice(lines, page_size + 1))
+        while page:
+            following = list(islice(lines, page_size))
+            yield page, bool(following)
+            page = following
             
-        output = []
-        output.append(f" {target_path} 的目录\n")
-        
-        # 处理 /w 选项（宽格式显示）
-        if options and '/w' in options:
-            # 宽格式显示：只显示文件名，每行多个
-            names = []
-            for name, content in directory.items():
-                if isinstance(content, dict):
-                    names.append(f"[{name}]")
-                else:
-                    names.append(name)
-            # 每行显示5个文件名
-            for i in range(0, len(names), 5):
-                output.append(' '.join(names[i:i+5]))
-            return '\n'.join(output)
-            
-        # 处理 /p 选项（分页显示）
-        if options and '/p' in options:
-            # 分页显示：每页显示20个项目
-            items = []
-            if target_path != 'C:\\':
-                items.append(f"{datetime.now().strftime('%Y-%m-%d  %H:%M')}    <DIR>          ..")
-            for name, content in directory.items():
-                if isinstance(content, dict):
-                    items.append(f"{datetime.now().strftime('%Y-%m-%d  %H:%M')}    <DIR>          {name}")
-                else:
-                    items.append(f"{datetime.now().strftime('%Y-%m-%d  %H:%M')}                 {len(content)} {name}")
-            # 每页显示20个项目
-            for i in range(0, len(items), 20):
-                output.extend(items[i:i+20])
-                if i + 20 < len(items):
-                    output.append("\n按任意键继续...")
-            return '\n'.join(output)
-            
-        # 默认显示格式
-        if target_path != 'C:\\':
-            output.append(f"{datetime.now().strftime('%Y-%m-%d  %H:%M')}    <DIR>          ..")
-            
-        for name, content in directory.items():
-            if isinstance(content, dict):
-                output.append(f"{datetime.now().strftime('%Y-%m-%d  %H:%M')}    <DIR>          {name}")
-            else:
-                output.append(f"{datetime.now().strftime('%Y-%m-%d  %H:%M')}                 {len(content)} {name}")
-                
-        return '\n'.join(output)
+    def simulate_more(self, lines: Optional[Iterator[str]] = None) -> str:
+        """输出分页显示的下一页
+        
+        Args:
+            lines: 给出时从这些行开始新的分页（more 命令），否则继续当前分页
+            
+        Returns:
+            下一页内容，没有待显示的页面时返回空字符串
+        """
+        if lines is not None:
+            self.pager = self._paginate(lines, DIR_PAGE_SIZE)
+        if self.pager is None:
+            return ""
+        page, has_more = next(self.pager, ([], False))
+        if not has_more:
+            self.pager = None
+            return join_output(page)
+        return '\n'.join(page) + "\n\n按任意键继续..."
         
     def simulate_cd(self, target_path: str) -> str:
         """模拟 cd 命令。
@@ -162,31 +360,21 @@ class WindowsCliSimulator:
         if not target_path:
             return self.cwd
             
-        # 处理特殊路径
-        if target_path == '..':
-            new_path = os.path.dirname(self.cwd)
-            if new_path:
-                self.cwd = new_path
-                return self.cwd
-            return "系统找不到指定的路径。"
-            
-        if target_path == '\\':
-            self.cwd = 'C:\\'
-            return self.cwd
-            
         # 处理驱动器切换
-        if target_path.endswith(':'):
-            if target_path in self.file_system:
-                self.cwd = target_path + '\\'
+        if len(target_path) == 2 and target_path.endswith(':'):
+            if target_path.upper() in self.fs.drives:
+                self.cwd = target_path.upper() + '\\'
                 return self.cwd
-            return "系统找不到指定的驱动器。"
+            return Failure("系统找不到指定的驱动器。")
             
-        # 处理普通路径
+        # .. \ 等特殊路径都由路径解析统一处理
         new_path = self._normalize_path(target_path)
-        if self._get_directory(new_path) is not None and isinstance(self._get_directory(new_path), dict):
-            self.cwd = new_path
+        node = self._get_directory(new_path)
+        if node is not None and node.is_dir:
+            # 名称查找不区分大小写，提示符显示目录的真实名称
+            self.cwd = node.path()
             return self.cwd
-        return "系统找不到指定的路径。"
+        return Failure("系统找不到指定的路径。")
         
     def simulate_mkdir(self, dir_name: str) -> str:
         """模拟 mkdir 命令。
@@ -198,20 +386,24 @@ class WindowsCliSimulator:
             命令执行结果消息
         """
         if not dir_name:
-            return "语法错误。"
+            return Failure("语法错误。")
             
         target_path = self._normalize_path(dir_name)
-        parent_path = os.path.dirname(target_path)
-        new_dir_name = os.path.basename(target_path)
+        parent_path = paths.dirname(target_path)
+        new_dir_name = paths.basename(target_path)
         
         parent_dir = self._get_directory(parent_path)
-        if parent_dir is None or isinstance(parent_dir, str):
-            return "系统找不到指定的路径。"
+        if parent_dir is None or not parent_dir.is_dir:
+            return Failure("系统找不到指定的路径。")
+            
+        if self._read_only(parent_dir):
+            return Failure("拒绝访问。")
             
-        if new_dir_name in parent_dir:
-            return f"子目录或文件 {new_dir_name} 已经存在。"
+        if new_dir_name in parent_dir.children:
+            return Failure(f"子目录或文件 {new_dir_name} 已经存在。")
             
-        parent_dir[new_dir_name] = {}
+        node = self.fs.mkdir(parent_dir, new_dir_name)
+        self.history.record([self.history.created(node)])
         return f"已创建目录 {target_path}"
         
     def simulate_copy(self, source: str, destination: str) -> str:
@@ -225,25 +417,52 @@ class WindowsCliSimulator:
             命令执行结果消息
         """
         if not source or not destination:
-            return "语法错误。"
+            return Failure("语法错误。")
             
         source_path = self._normalize_path(source)
         dest_path = self._normalize_path(destination)
         
-        source_content = self._get_directory(source_path)
-        if source_content is None:
-            return f"系统找不到指定的文件。\n{source_path}"
+        sources = self._expand_files(source_path)
+        if not sources:
+            return Failure(f"系统找不到指定的文件。\n{source_path}")
             
-        if isinstance(source_content, dict):
-            return "无法复制目录。"
+        listed = has_wildcards(paths.basename(source_path))
+        if sources[0].is_dir:
+            # 与 cmd 一样，复制目录只复制其中的文件；递归复制使用 xcopy
+            sources = [node for node in sources[0].children.values() if not node.is_dir]
+            listed = True
+            if not sources:
+                return Failure(f"系统找不到指定的文件。\n{source_path}\\*")
             
-        dest_parent = self._get_parent_directory(dest_path)
-        if dest_parent is None:
-            return "系统找不到指定的路径。"
-            
-        dest_name = os.path.basename(dest_path)
-        dest_parent[dest_name] = source_content
-        return f"已复制         1 个文件。"
+        dest_node = self._get_directory(dest_path)
+        group: List[Operation] = []
+        if dest_node is not None and dest_node.is_dir:
+            # 目标是目录：逐个复制到该目录下，保留原文件名
+            if dest_node is sources[0].parent:
+                return Failure("文件无法复制到自身。\n已复制         0 个文件。")
+            if self._read_only(dest_node) or any(self._read_only_file(dest_node.children.get(node.name))
+                                                 for node in sources):
+                return Failure("拒绝访问。\n已复制         0 个文件。")
+            for node in sources:
+                group += self._write_file(dest_node, node.name, node.body.copy())
+            count = len(sources)
+        else:
+            dest_parent = self._get_parent_directory(dest_path)
+            if dest_parent is None:
+                return Failure("系统找不到指定的路径。")
+            if self._read_only(dest_parent) or self._read_only_file(dest_parent.children.get(paths.basename(dest_path))):
+                return Failure("拒绝访问。\n已复制         0 个文件。")
+            # 多个源文件复制到同一个文件时按顺序合并
+            body = sources[0].body.copy()
+            for node in sources[1:]:
+                body.append('\n')
+                for chunk in node.body:
+                    body.append(chunk)
+            group = self._write_file(dest_parent, paths.basename(dest_path), body)
+            count = 1
+        self.history.record(group)
+        listing = ''.join(f"{node.name}\n" for node in sources) if listed else ""
+        return f"{listing}已复制{count:>10} 个文件。"
         
     def simulate_del(self, target: str, options: Optional[List[str]] = None) -> str:
         """模拟 del 命令。
@@ -258,55 +477,291 @@ class WindowsCliSimulator:
         self.last_command_with_args = ('del', [target] + (options or []))
         
         if not target:
-            return "语法错误。"
+            return Failure("语法错误。")
             
         target_path = self._normalize_path(target)
         parent_dir = self._get_parent_directory(target_path)
         
         if parent_dir is None:
-            return "系统找不到指定的路径。"
+            return Failure("系统找不到指定的路径。")
+            
+        if self._read_only(parent_dir):
+            return Failure("拒绝访问。")
+            
+        target_name = paths.basename(target_path)
+        if has_wildcards(target_name):
+            return self._delete_matches(target_path, options)
             
-        target_name = os.path.basename(target_path)
-        if target_name not in parent_dir:
-            return f"系统找不到指定的文件。\n{target_path}"
+        target_node = parent_dir.children.get(target_name)
+        if target_node is None:
+            return Failure(f"系统找不到指定的文件。\n{target_path}")
             
-        if isinstance(parent_dir[target_name], dict):
-            return "无法删除目录。"
+        if target_node.is_dir:
+            return Failure("无法删除目录。")
             
         # 模拟只读文件
-        if target_name == 'readonly.txt':
+        if self._read_only_file(target_node):
             if not options or ('/F' not in options):
-                return "拒绝访问。"
+                return Failure("拒绝访问。")
                 
         # 模拟确认提示
         if not options or ('/Q' not in options):
-            return "是否确认(Y/N)?"
+            return Failure("是否确认(Y/N)?")
             
-        del parent_dir[target_name]
+        self.history.record([self.history.removed(target_node)])
+        self.fs.unlink(target_node)
         return "文件已删除。"
         
-    def simulate_type(self, filename: str) -> str:
-        """模拟 type 命令。
+    def _delete_matches(self, target_path: str, options: Optional[List[str]]) -> str:
+        """删除与通配符匹配的所有文件，整批只记一步撤销
         
         Args:
-            filename: 要显示内容的文件名
+            target_path: 最后一部分含通配符的完整路径
+            options: 命令选项列表
             
         Returns:
-            文件内容或错误消息
+            命令执行结果消息
+        """
+        targets = self._expand_files(target_path)
+        if not targets:
+            return Failure(f"系统找不到指定的文件。\n{target_path}")
+            
+        if not options or ('/Q' not in options):
+            return Failure("是否确认(Y/N)?")
+            
+        force = '/F' in options
+        output = []
+        nodes = []
+        for node in targets:
+            if self._read_only_file(node) and not force:
+                output.append(f"{node.path()}\n拒绝访问。")
+            else:
+                nodes.append(node)
+        group = self.history.removed_all(nodes)
+        for node in nodes:
+            self.fs.unlink(node)
+        self.history.record(group)
+        output.append(f"已删除 {len(group)} 个文件。")
+        return '\n'.join(output)
+        
+    def iter_type(self, filename: str) -> Iterator[str]:
+        """按块流式生成 type 命令的输出，不拼接整个文件
+        
+        Args:
+            filename: 要显示内容的文件名
+            
+        Yields:
+            文件内容块或错误消息
         """
         if not filename:
-            return "语法错误。"
+            yield Failure("语法错误。")
+            return
             
         file_path = self._normalize_path(filename)
-        file_content = self._get_directory(file_path)
+        file_node = self._get_directory(file_path)
         
-        if file_content is None:
-            return f"系统找不到指定的文件。\n{file_path}"
+        if file_node is None:
+            yield Failure(f"系统找不到指定的文件。\n{file_path}")
+        elif file_node.is_dir:
+            yield Failure("无法显示目录内容。")
+        else:
+            yield from file_node.body
             
-        if isinstance(file_content, dict):
-            return "无法显示目录内容。"
+    def read_lines(self, filename: str) -> Optional[Iterator[str]]:
+        """按行流式读取文件内容，用于管道和输入重定向
+        
+        Args:
+            filename: 文件名
             
-        return file_content
+        Returns:
+            行迭代器；文件不存在或是目录时返回 None
+        """
+        node = self._get_directory(self._normalize_path(filename)) if filename else None
+        if node is None or node.is_dir:
+            return None
+        return split_lines(node.body)
+        
+    def iter_find(self, needle: str, files: List[str], options: Optional[List[str]] = None,
+                  stdin: Optional[Iterator[str]] = None) -> Iterator[str]:
+        """逐行生成 find 命令的输出
+        
+        Args:
+            needle: 要查找的字符串
+            files: 要搜索的文件，可以使用通配符；为空时搜索 stdin
+            options: 命令选项列表（/V 反向、/C 只计数、/N 显示行号、/I 忽略大小写）
+            stdin: 管道或输入重定向提供的行流
+            
+        Yields:
+            输出行
+        """
+        options = options or []
+        invert = '/V' in options
+        contains = compile_search((needle,), True, '/I' in options)
+        match = lambda line: contains(line) != invert
+        count_only = '/C' in options
+        numbered = '/N' in options
+        
+        def scan(lines: Iterable[str]) -> Iterator[str]:
+            if count_only:
+                yield str(sum(1 for line in lines if match(line)))
+                return
+            for number, line in enumerate(lines, 1):
+                if match(line):
+                    yield f"[{number}]{line}" if numbered else line
+                    
+        if not files:
+            if stdin is None:
+                yield Failure("FIND: 参数格式不正确")
+                return
+            yield from scan(stdin)
+            return
+            
+        for name in files:
+            path = self._normalize_path(name)
+            nodes = self._expand_files(path)
+            if not nodes or nodes[0].is_dir:
+                yield Failure(f"找不到文件 - {name.upper()}")
+                continue
+            wildcard = has_wildcards(paths.basename(path))
+            for node in nodes:
+                label = node.name.upper() if wildcard else name.upper()
+                lines = scan(split_lines(node.body))
+                if count_only:
+                    yield ""
+                    yield f"---------- {label}: {next(lines)}"
+                else:
+                    yield ""
+                    yield f"---------- {label}"
+                    yield from lines
+                    
+    def iter_findstr(self, args: List[str], options: Optional[List[str]] = None,
+                     stdin: Optional[Iterator[str]] = None) -> Iterator[str]:
+        """逐行生成 findstr 命令的输出
+        
+        第一个参数是以空格分隔的多个搜索串（任一匹配即可），默认按 findstr 正则表达式匹配；
+        给出 /C:字符串 时所有参数都是文件，搜索串按字面匹配。/S 在目录树中搜索，
+        此时优先用文件内容索引筛选候选文件，只有候选文件会被逐行扫描。
+        
+        Args:
+            args: 搜索串和文件（可以使用通配符）；没有文件时搜索 stdin
+            options: 命令选项列表（/S /I /L /R /N /V /M /B /E /X 和 /C:字符串）
+            stdin: 管道或输入重定向提供的行流
+            
+        Yields:
+            输出行
+        """
+        options = options or []
+        args = list(args)
+        literals = [option[3:] for option in options if option.upper().startswith('/C:')]
+        if literals:
+            strings = literals
+        elif args:
+            strings = args.pop(0).split()
+        else:
+            strings = []
+        if not strings:
+            yield Failure("FINDSTR: 错误的命令行")
+            return
+            
+        literal = '/L' in options or (bool(literals) and '/R' not in options)
+        contains = compile_search(tuple(strings), literal, '/I' in options,
+                                  '/B' in options, '/E' in options, '/X' in options)
+        invert = '/V' in options
+        numbered = '/N' in options
+        names_only = '/M' in options
+        
+        def scan(lines: Iterable[str], label: str) -> Iterator[str]:
+            for number, line in enumerate(lines, 1):
+                if contains(line) == invert:
+                    continue
+                if names_only:
+                    yield label
+                    return
+                prefix = f"{label}:" if label else ""
+                yield f"{prefix}{number}:{line}" if numbered else prefix + line
+                
+        if not args:
+            if stdin is None:
+                yield Failure("FINDSTR: 错误的命令行")
+                return
+            yield from scan(stdin, "")
+            return
+            
+        recursive = '/S' in options
+        labelled = recursive or len(args) > 1
+        for name in args:
+            path = self._normalize_path(name)
+            head, sep, _ = name.replace('/', '\\').rpartition('\\')
+            prefix = head + sep
+            if recursive:
+                base = self._get_parent_directory(path)
+                if base is None:
+                    yield Failure(f"FINDSTR: 无法打开 {name}")
+                    continue
+                candidates = None if invert else self._search_tree(base, paths.basename(path), strings, literal)
+                if candidates is None:
+                    candidates = self._walk_files(base, paths.basename(path))
+                for node in candidates:
+                    yield from scan(split_lines(node.body), prefix + self._relative_path(node, base))
+                continue
+                
+            nodes = self._expand_files(path)
+            if not nodes or nodes[0].is_dir:
+                yield Failure(f"FINDSTR: 无法打开 {name}")
+                continue
+            wildcard = has_wildcards(paths.basename(path))
+            for node in nodes:
+                label = prefix + node.name if wildcard else name
+                yield from scan(split_lines(node.body), label if labelled or wildcard else "")
+                
+    def _search_tree(self, base: Node, pattern: str, strings: List[str], literal: bool) -> Optional[Iterator[Node]]:
+        """用内容索引列出目录树中可能匹配的文件，无法使用索引时返回 None"""
+        index = self.content_index
+        if index is None or self._read_only(base):
+            return None
+        index.sync(base)
+        inos = index.candidates(strings, literal)
+        if inos is None:
+            return None
+        match = compile_pattern(pattern)
+        return (node for node in index.files_under(base, inos) if match(node.name))
+        
+    @staticmethod
+    def _walk_files(base: Node, pattern: str) -> Iterator[Node]:
+        """按 findstr /S 的顺序遍历目录树中与模式匹配的文件：先列出本目录的文件，再依次进入子目录"""
+        match = compile_pattern(pattern)
+        stack = [base]
+        while stack:
+            children = stack.pop().children
+            subdirs = []
+            for name in children.sorted_names():
+                node = children[name]
+                if node.is_dir:
+                    subdirs.append(node)
+                elif match(name):
+                    yield node
+            stack.extend(reversed(subdirs))
+            
+    @staticmethod
+    def _relative_path(node: Node, base: Node) -> str:
+        """节点相对于祖先目录的路径"""
+        parts = []
+        while node is not base:
+            parts.append(node.name)
+            node = node.parent
+        parts.reverse()
+        return '\\'.join(parts)
+        
+    def simulate_type(self, filename: str) -> str:
+        """模拟 type 命令。
+        
+        Args:
+            filename: 要显示内容的文件名
+            
+        Returns:
+            文件内容或错误消息
+        """
+        return join_output(self.iter_type(filename), '')
         
     def simulate_echo(self, text: str, operator: Optional[str] = None, filename: Optional[str] = None) -> str:
         """模拟 echo 命令。
@@ -325,25 +780,39 @@ class WindowsCliSimulator:
         if not operator or not filename:
             return text
             
+        return self.redirect_output(text, operator, filename)
+        
+    def redirect_output(self, text: str, operator: str, filename: str) -> str:
+        """把命令输出写入文件（> 覆盖，>> 追加为新的一行），任何命令的输出重定向都经过这里
+        
+        Args:
+            text: 命令输出
+            operator: 操作符（> 或 >>）
+            filename: 目标文件名
+            
+        Returns:
+            成功时为空字符串，否则为错误消息
+        """
         file_path = self._normalize_path(filename)
         parent_dir = self._get_parent_directory(file_path)
         
         if parent_dir is None:
-            return "系统找不到指定的路径。"
+            return Failure("系统找不到指定的路径。")
             
-        file_name = os.path.basename(file_path)
-        
-        if operator == '>':
-            parent_dir[file_name] = text
-            return ""
-        elif operator == '>>':
-            if file_name in parent_dir and isinstance(parent_dir[file_name], str):
-                parent_dir[file_name] += '\n' + text
-            else:
-                parent_dir[file_name] = text
-            return ""
+        if self._read_only(parent_dir):
+            return Failure("拒绝访问。")
+            
+        file_name = paths.basename(file_path)
+        file_node = parent_dir.children.get(file_name)
+        if (file_node is not None and file_node.is_dir) or self._read_only_file(file_node):
+            return Failure("拒绝访问。")
+            
+        if operator == '>>' and file_node is not None:
+            self.history.record([self.history.modified(file_node)])
+            self.fs.append(file_node, text)
         else:
-            return text
+            self.history.record(self._write_file(parent_dir, file_name, text))
+        return ""
             
     def simulate_move(self, source: str, destination: str) -> str:
         """模拟 move 命令。
@@ -356,30 +825,330 @@ class WindowsCliSimulator:
             命令执行结果消息
         """
         if not source or not destination:
-            return "语法错误。"
+            return Failure("语法错误。")
             
         source_path = self._normalize_path(source)
         dest_path = self._normalize_path(destination)
         
-        source_content = self._get_directory(source_path)
-        if source_content is None:
-            return f"系统找不到指定的文件。\n{source_path}"
+        sources = self._expand_files(source_path)
+        if not sources:
+            return Failure(f"系统找不到指定的文件。\n{source_path}")
+            
+        dest_node = self._get_directory(dest_path)
+        if dest_node is not None and dest_node.is_dir:
+            targets = [(node, dest_node, node.name) for node in sources]
+        else:
+            if len(sources) > 1:
+                return Failure("无法将多个文件合并到单个文件。")
+            dest_parent = self._get_parent_directory(dest_path)
+            if dest_parent is None:
+                return Failure("系统找不到指定的路径。")
+            targets = [(sources[0], dest_parent, paths.basename(dest_path))]
+            
+        if self._read_only(sources[0]) or self._read_only(targets[0][1]):
+            return Failure("拒绝访问。")
+        for node, parent, name in targets:
+            existing = parent.children.get(name)
+            if self._read_only_file(node) or (existing is not node and self._read_only_file(existing)):
+                return Failure("拒绝访问。")
             
-        if isinstance(source_content, dict):
-            return "无法移动目录。"
+        if sources[0].is_dir:
+            node, parent, _ = targets[0]
+            if self._in_use(node):
+                return Failure("另一个程序正在使用此文件，进程无法访问。")
+            # 目录不能移动到它自己的子树中
+            ancestor: Optional[Node] = parent
+            while ancestor is not None and ancestor is not node:
+                ancestor = ancestor.parent
+            if ancestor is node:
+                return Failure("拒绝访问。")
+                
+        # 直接把源节点挂到目标目录下，源目录中的条目随之移除；移动目录的开销与其大小无关
+        group: List[Operation] = []
+        for node, parent, name in targets:
+            existing = parent.children.get(name)
+            if existing is node and node.name == name:
+                continue
+            if existing is not None:
+                group.append(self.history.removed(existing))
+            group.append(self.history.moved(node))
+            self.fs.rename(node, parent, name)
+        self.history.record(group)
+        kind = "目录" if sources[0].is_dir else "文件"
+        listing = ''.join(f"{node.name}\n" for node in sources) if has_wildcards(paths.basename(source_path)) else ""
+        return f"{listing}已移动{len(sources):>10} 个{kind}。"
+        
+    def simulate_xcopy(self, source: str, destination: str, options: Optional[List[str]] = None) -> str:
+        """模拟 xcopy 命令。
+        
+        目录以导出的只读模板嫁接到目标位置，新子树在访问时才逐层展开，
+        两边各自修改互不影响（写时复制），因此复制大目录的开销与其大小无关。
+        目标不存在时视为目录（相当于 /I）。
+        
+        Args:
+            source: 源文件或目录路径
+            destination: 目标路径
+            options: 命令选项列表，/S 或 /E 表示包含子目录
             
-        dest_parent = self._get_parent_directory(dest_path)
-        if dest_parent is None:
-            return "系统找不到指定的路径。"
+        Returns:
+            命令执行结果消息
+        """
+        if not source or not destination:
+            return Failure("参数数目无效")
             
-        dest_name = os.path.basename(dest_path)
-        dest_parent[dest_name] = source_content
+        source_path = self._normalize_path(source)
+        dest_path = self._normalize_path(destination)
+        recursive = bool(options) and ('/S' in options or '/E' in options)
+        fs = self.fs
         
-        # 删除源文件
-        source_parent = self._get_parent_directory(source_path)
-        if source_parent is not None:
-            source_name = os.path.basename(source_path)
-            if source_name in source_parent:
-                del source_parent[source_name]
+        sources = self._expand_files(source_path)
+        if not sources:
+            return Failure(f"找不到文件 - {paths.basename(source_path)}\n复制了 0 个文件")
+            
+        source_node = sources[0]
+        if source_node.is_dir:
+            members: Mapping[str, Node] = source_node.children
+            if recursive:
+                tree = fs.export(source_node)
+            else:
+                tree = MappingProxyType({node.name: fs.export(node)
+                                         for node in source_node.children.values() if not node.is_dir})
+        else:
+            members = {node.name: node for node in sources}
+            tree = MappingProxyType({node.name: fs.export(node) for node in sources})
+            
+        # origins 与 entries 一一对应：条目正是某个节点的完整导出时为该节点，否则为 None
+        dest_node = self._get_directory(dest_path)
+        if dest_node is None:
+            dest_parent = self._get_parent_directory(dest_path)
+            if dest_parent is None:
+                return Failure("无效的路径\n复制了 0 个文件")
+            entries = [(dest_parent, paths.basename(dest_path), tree)]
+            origins = [source_node if source_node.is_dir and recursive else None]
+        elif dest_node.is_dir:
+            entries = [(dest_node, name, entry) for name, entry in tree.items()]
+            origins = [members.get(name) for name in tree]
+        elif source_node.is_dir or len(sources) > 1:
+            return Failure("无法将多个文件复制到单个文件。\n复制了 0 个文件")
+        else:
+            entries = [(dest_node.parent, dest_node.name, tree[source_node.name])]
+            origins = [source_node]
+            
+        # 源目录中没有要复制的文件（空目录，或不带 /S 时只有子目录）
+        if not entries:
+            return "复制了 0 个文件"
+            
+        if self._read_only(entries[0][0]) or any(self._overwrites_read_only(*entry) for entry in entries):
+            return Failure("拒绝访问。\n复制了 0 个文件")
+            
+        # 目标位于源目录之内时拒绝，避免循环复制
+        if source_node.is_dir:
+            ancestor: Optional[Node] = entries[0][0]
+            while ancestor is not None and ancestor is not source_node:
+                ancestor = ancestor.parent
+            if ancestor is source_node:
+                return Failure("无法执行循环复制\n复制了 0 个文件")
+                
+        group: List[Operation] = []
+        for (parent, name, entry), origin in zip(entries, origins):
+            self._merge(parent, name, entry, group, origin)
+        self.history.record(group)
+        return f"复制了 {sum(_count_files(entry) for _, _, entry in entries)} 个文件"
+        
+    def _merge(self, parent: Node, name: str, entry: Template, group: List[Operation],
+               origin: Optional[Node] = None) -> None:
+        """把模板合并到父目录下：同名目录逐层合并，其余情况直接嫁接（替换同名节点）
+        
+        origin 是导出出 entry 的源节点（未知时为 None），随嫁接一并通知存档只记录源路径。
+        """
+        existing = parent.children.get(name)
+        if existing is not None and existing.is_dir and isinstance(entry, Mapping):
+            for child_name, child in entry.items():
+                child_origin = origin.children.get(child_name) if origin is not None else None
+                self._merge(existing, child_name, child, group, child_origin)
+            return
+        if existing is not None:
+            group.append(self.history.removed(existing))
+        group.append(self.history.created(self.fs.graft(parent, name, entry, origin)))
+        
+    def simulate_rmdir(self, target: str, options: Optional[List[str]] = None) -> str:
+        """模拟 rmdir 命令。
+        
+        Args:
+            target: 目标目录路径
+            options: 命令选项列表，/S 删除整个目录树，/Q 不再确认
+            
+        Returns:
+            命令执行结果消息
+        """
+        if not target:
+            return Failure("命令语法不正确。")
+            
+        target_path = self._normalize_path(target)
+        node = self._get_directory(target_path)
+        if node is None:
+            return Failure("系统找不到指定的文件。")
+            
+        if not node.is_dir:
+            return Failure("目录名称无效。")
+            
+        if node.parent is None or self._read_only(node):
+            return Failure("拒绝访问。")
+            
+        if self._in_use(node):
+            return Failure("另一个程序正在使用此文件，进程无法访问。")
+            
+        if not options or '/S' not in options:
+            if node.children:
+                return Failure("目录不是空的。")
+        elif '/Q' not in options:
+            return Failure(f"{target}, 是否确认(Y/N)?")
+            
+        # 摘下整个子树只需 O(1)，撤销时原样挂回
+        self.history.record([self.history.removed(node)])
+        self.fs.unlink(node)
+        return "目录已删除。"
+        
+    def iter_tree(self, path: Optional[str] = None, show_files: bool = False,
+                  ascii_only: bool = False) -> Iterator[str]:
+        """逐行生成 tree 命令的输出，不把整棵树拼成一个字符串
+        
+        Args:
+            path: 目标目录路径
+            show_files: 是否同时列出文件（/F）
+            ascii_only: 是否使用 ASCII 连线字符（/A）
+            
+        Yields:
+            输出行
+        """
+        target_path = self._normalize_path(path) if path else self.cwd
+        directory = self._get_directory(target_path)
+        if directory is None or not directory.is_dir:
+            yield Failure(f"无效的路径 - {target_path}")
+            return
+            
+        yield "文件夹 PATH 列表"
+        yield "卷序列号为 0000-0000"
+        yield target_path.upper()
+        
+        # 用显式栈代替递归，目录再深也不会超出递归深度
+        glyphs = TREE_GLYPHS_ASCII if ascii_only else TREE_GLYPHS
+        stack = [self._iter_tree_level(directory, '', show_files, glyphs)]
+        produced = False
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop()
+                continue
+            line, prefix, child = entry
+            produced = True
+            yield line
+            if child is not None:
+                stack.append(self._iter_tree_level(child, prefix, show_files, glyphs))
+        if not produced:
+            yield "没有子文件夹"
+            
+    @staticmethod
+    def _iter_tree_level(directory: Node, prefix: str, show_files: bool,
+                         glyphs: Tuple[str, str, str, str]) -> Iterator[Tuple[str, str, Optional[Node]]]:
+        """生成一个目录下的 tree 行
+        
+        Yields:
+            (输出行, 子目录使用的前缀, 需要继续展开的子目录或 None)
+        """
+        branch, last_branch, bar, blank = glyphs
+        children = directory.children.values()
+        dirs = [node for node in children if node.is_dir]
+        if show_files:
+            # 文件列在子目录之前，与后面的子目录连线对齐
+            file_prefix = prefix + (bar.rstrip().ljust(4) if dirs else '    ')
+            for node in children:
+                if not node.is_dir:
+                    yield f"{file_prefix}{node.name}", '', None
+        last = len(dirs) - 1
+        for i, node in enumerate(dirs):
+            if i == last:
+                yield f"{prefix}{last_branch}{node.name}", prefix + blank, node
+            else:
+                yield f"{prefix}{branch}{node.name}", prefix + bar, node
                 
-        return f"已移动         1 个文件。" 
\ No newline at end of file
+    def simulate_tree(self, path: Optional[str] = None, options: Optional[List[str]] = None) -> str:
+        """模拟 tree 命令的输出。
+        
+        Args:
+            path: 目标目录路径
+            options: 命令选项列表
+            
+        Returns:
+            模拟的 tree 命令输出
+        """
+        options = options or []
+        return join_output(self.iter_tree(path, '/F' in options, '/A' in options))
+        
+    def _expand_files(self, path: str) -> Optional[List[Node]]:
+        """展开源路径
+        
+        最后一部分含通配符时，用编译好的模式一次遍历父目录的条目，返回匹配的文件
+        （不含目录）；否则返回该路径对应的单个节点。
+        
+        Args:
+            path: 规范化后的完整路径
+            
+        Returns:
+            节点列表，路径不存在时返回 None
+        """
+        name = paths.basename(path)
+        if not has_wildcards(name):
+            node = self._get_directory(path)
+            return None if node is None else [node]
+        parent = self._get_parent_directory(path)
+        if parent is None:
+            return None
+        children = parent.children
+        return [node for node in map(children.__getitem__, match_names(children, name)) if not node.is_dir]
+        
+    def _in_use(self, directory: Node) -> bool:
+        """当前目录是否位于该目录之内（此时不能移动或删除它）"""
+        path = directory.path().casefold()
+        cwd = self.cwd.casefold()
+        return cwd == path or cwd.startswith(path.rstrip('\\') + '\\')
+        
+    def _removes_cwd(self, group: List[Operation]) -> bool:
+        """执行这组逆操作是否会删除或移走当前所在的目录（与 rmdir、move 一样拒绝）"""
+        return any(op[0] in ('unlink', 'rename') and op[1].is_dir and op[1].parent is not None and self._in_use(op[1])
+                   for op in group)
+        
+    def _write_file(self, parent_dir: Node, name: str, content: Union[str, FileBody]) -> List[Operation]:
+        """创建或覆盖文件，返回撤销所需的逆操作"""
+        existing = parent_dir.children.get(name)
+        group = []
+        if existing is not None:
+            group.append(self.history.removed(existing) if existing.is_dir else self.history.modified(existing))
+        node = self.fs.write(parent_dir, name, content)
+        if node is not existing:
+            group.append(self.history.created(node))
+        return group
+        
+    def simulate_undo(self) -> str:
+        """撤销上一条修改文件系统的命令
+        
+        Returns:
+            命令执行结果消息
+        """
+        if self.history.undo_stack and self._removes_cwd(self.history.undo_stack[-1]):
+            return Failure("另一个程序正在使用此文件，进程无法访问。")
+        if self.history.undo():
+            return "已撤销上一步操作。"
+        return Failure("没有可以撤销的操作。")
+        
+    def simulate_redo(self) -> str:
+        """重做上一次撤销的命令
+        
+        Returns:
+            命令执行结果消息
+        """
+        if self.history.redo_stack and self._removes_cwd(self.history.redo_stack[-1]):
+            return Failure("另一个程序正在使用此文件，进程无法访问。")
+        if self.history.redo():
+            return "已重做上一步操作。"
+        return Failure("没有可以重做的操作。")
@@ -0,0 +1,40 @@
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional
+import re
+
+Matcher = Callable[[str], Optional['re.Match[str]']]
+
+def has_wildcards(name: str) -> bool:
+    """名称中是否含有通配符 * 或 ?"""
+    return '*' in name or '?' in name
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> Matcher:
+    """把 cmd 风格的通配符模式编译为匹配函数，结果会被缓存
+
+    * 匹配任意个字符，? 匹配一个字符，匹配不区分大小写。
+    与 cmd 一致，*.* 匹配所有名称（包括没有扩展名的名称）。
+
+    Args:
+        pattern: 通配符模式，例如 *.txt 或 file?.log
+
+    Returns:
+        对名称做完整匹配的函数，匹配失败时返回 None
+    """
+    if pattern in ('*', '*.*'):
+        pattern = '*'
+    regex = ''.join('.*' if c == '*' else '.' if c == '?' else re.escape(c) for c in pattern)
+    return re.compile(regex, re.IGNORECASE | re.DOTALL).fullmatch
+
+def match_names(names: Iterable[str], pattern: str) -> List[str]:
+    """一次遍历筛选出与模式匹配的名称，保持原有顺序
+
+    Args:
+        names: 候选名称，通常是某个目录的条目名
+        pattern: 通配符模式
+
+    Returns:
+        匹配的名称列表
+    """
+    match = compile_pattern(pattern)
+    return [name for name in names if match(name)]
@@ -1,30 +1,32 @@
+from typing import Any
+import os
+
 from .base import Level
-from .navigation import NAVIGATION_LEVEL
-from .file_ops import (
-    DIRECTORY_CREATION_LEVEL,
-    FILE_COPY_LEVEL,
-    FILE_DELETION_LEVEL,
-    FILE_APPEND_LEVEL
+from .catalog import LevelCatalog
+
+# 关卡定义文件所在目录
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# 内置关卡按顺序排列，每一关是 DATA_DIR 下的一个 JSON 文件，关卡标识即文件名；
+# 对应的常量名为标识的大写加 _LEVEL，例如 file_copy -> FILE_COPY_LEVEL
+LEVEL_FILES = (
+    'navigation',
+    'directory_creation',
+    'file_copy',
+    'file_deletion',
+    'file_append',
+    'file_move',
+    'command_args',
 )
-from .advanced import FILE_MOVE_LEVEL, COMMAND_ARGS_LEVEL
 
-__all__ = [
-    'Level',
-    'NAVIGATION_LEVEL',
-    'DIRECTORY_CREATION_LEVEL',
-    'FILE_COPY_LEVEL',
-    'FILE_DELETION_LEVEL',
-    'FILE_APPEND_LEVEL',
-    'FILE_MOVE_LEVEL',
-    'COMMAND_ARGS_LEVEL'
-]
+__all__ = ['Level', 'LevelCatalog', 'ALL_LEVELS'] + [f'{name.upper()}_LEVEL' for name in LEVEL_FILES]
+
+# 内置关卡目录；导入时不读取任何关卡文件
+ALL_LEVELS = LevelCatalog([os.path.join(DATA_DIR, name + '.json') for name in LEVEL_FILES])
 
-ALL_LEVELS = [
-    NAVIGATION_LEVEL,
-    DIRECTORY_CREATION_LEVEL,
-    FILE_COPY_LEVEL,
-    FILE_DELETION_LEVEL,
-    FILE_APPEND_LEVEL,
-    FILE_MOVE_LEVEL,
-    COMMAND_ARGS_LEVEL
-] 
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    """按名称访问关卡常量（例如 levels.FILE_COPY_LEVEL）时才加载对应关卡"""
+    level_id = name[:-len('_LEVEL')].lower()
+    if name.endswith('_LEVEL') and level_id in LEVEL_FILES:
+        return ALL_LEVELS.get(level_id)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
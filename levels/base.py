@@ -1,6 +1,8 @@
-from dataclasses import dataclass
-from typing import Callable, List
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+from core.events import CWD_CHANGED
 from core.simulator import WindowsCliSimulator
+from .fixture import Fixture, compile_fixture
 
 @dataclass
 class Level:
@@ -10,4 +12,46 @@ class Level:
     description: str
     setup_state: Callable[[WindowsCliSimulator], None]
     check_success: Callable[[WindowsCliSimulator], bool]
-    hints: List[str] 
\ No newline at end of file
+    hints: List[str] 
+    # 关卡依赖的事件类型和路径，全部为空时每条命令后都检查
+    watch_events: Tuple[str, ...] = ()
+    watch_paths: Tuple[str, ...] = ()
+    fixture: Optional[Fixture] = field(default=None, init=False, repr=False, compare=False)
+    # 与文件系统一样不区分大小写比较路径，预先转换好声明的路径
+    _watch_keys: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        self._watch_keys = tuple(path.casefold() for path in self.watch_paths)
+        
+    def setup(self, simulator: WindowsCliSimulator) -> None:
+        """设置关卡初始状态，首次调用时把 setup_state 编译为夹具，之后所有会话共享"""
+        if self.fixture is None:
+            self.fixture = compile_fixture(self.setup_state)
+        self.fixture.apply(simulator)
+        
+    @property
+    def watches_changes(self) -> bool:
+        """是否声明了依赖的事件或路径"""
+        return bool(self.watch_events or self.watch_paths)
+        
+    def is_affected_by(self, event: str, path: str) -> bool:
+        """判断一次变更是否可能影响关卡检查结果
+        
+        路径与声明的路径相同、位于其下或是其上级目录时都算相关，比较时不区分大小写。
+        
+        Args:
+            event: 事件类型
+            path: 受影响的完整路径
+            
+        Returns:
+            是否需要重新检查
+        """
+        if not self.watches_changes or event in self.watch_events:
+            return True
+        if event == CWD_CHANGED:
+            return False
+        path = path.casefold()
+        for watched in self._watch_keys:
+            if path == watched or path.startswith(watched + '\\') or watched.startswith(path + '\\'):
+                return True
+        return False
\ No newline at end of file
@@ -0,0 +1,379 @@
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union, overload
+import os
+
+from .base import Level
+
+if TYPE_CHECKING:
+    import argparse
+
+# 关卡包的扩展名：每行一个关卡定义（JSON Lines）；其他文件按单个关卡定义处理
+PACK_SUFFIX = '.jsonl'
+
+# 关卡包索引缓存的魔数
+INDEX_MAGIC = b'CGI1'
+
+# 一个来源的索引，按列存储：
+# ids: 关卡标识列表；tag_sets: 出现过的标签组合；
+# tags: 每关的标签组合序号；difficulty: 每关的难度；offsets、lengths: 每关在文件中的字节范围，
+# 后四列是 array 的字节串（单个关卡文件的偏移为 -1）
+SourceIndex = Dict[str, Any]
+
+
+def parse_difficulty(spec: str) -> Tuple[int, int]:
+    """解析命令行中的难度范围
+
+    Args:
+        spec: 单个难度（例如 2）或闭区间（例如 1-3）
+
+    Returns:
+        (最低难度, 最高难度)
+
+    Raises:
+        ValueError: 格式不正确
+    """
+    low, sep, high = spec.partition('-')
+    try:
+        low_value = int(low)
+        high_value = int(high) if sep else low_value
+    except ValueError:
+        raise ValueError(f"难度应为整数或范围（例如 1-3）：{spec}") from None
+    if low_value > high_value:
+        raise ValueError(f"难度范围的下限大于上限：{spec}")
+    return low_value, high_value
+
+def _split_list(spec: str) -> List[str]:
+    """解析命令行中以逗号分隔的列表"""
+    return [item.strip() for item in spec.split(',') if item.strip()]
+
+def _source_index(ids: List[str], tags: List[Tuple[str, ...]], difficulty: List[int],
+                  offsets: List[int], lengths: List[int]) -> SourceIndex:
+    """把逐关收集的字段整理为按列存储的来源索引，相同的标签组合只保存一次"""
+    tag_sets: Dict[Tuple[str, ...], int] = {}
+    numbers = array('l', (tag_sets.setdefault(tuple(sorted(t)), len(tag_sets)) for t in tags))
+    return {
+        'ids': ids,
+        'tag_sets': list(tag_sets),
+        'tags': numbers.tobytes(),
+        'difficulty': array('l', difficulty).tobytes(),
+        'offsets': array('q', offsets).tobytes(),
+        'lengths': array('q', lengths).tobytes(),
+    }
+
+def _scan_pack(path: str) -> SourceIndex:
+    """逐行读取关卡包，检查每个关卡定义并记录它在文件中的位置"""
+    import json
+    from .declarative import LevelFormatError, compile_data
+
+    ids: List[str] = []
+    tags: List[Tuple[str, ...]] = []
+    difficulty: List[int] = []
+    offsets: List[int] = []
+    lengths: List[int] = []
+    offset = 0
+    with open(path, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            text = line[3:] if line_number == 1 and line.startswith(b'\xef\xbb\xbf') else line
+            if text.strip():
+                source = f'{path}:{line_number}'
+                try:
+                    data = json.loads(text)
+                except ValueError as e:
+                    raise LevelFormatError(f"{source}: 不是合法的 JSON：{e}") from None
+                compiled = compile_data(data, source)
+                if compiled['id'] is None:
+                    raise LevelFormatError(f"{source}: 关卡包中的关卡必须有 id")
+                ids.append(compiled['id'])
+                tags.append(compiled['tags'])
+                difficulty.append(compiled['difficulty'])
+                offsets.append(offset + len(line) - len(text))
+                lengths.append(len(text))
+            offset += len(line)
+    return _source_index(ids, tags, difficulty, offsets, lengths)
+
+def index_source(path: str) -> SourceIndex:
+    """读取一个来源的索引
+
+    关卡包的索引缓存在同目录的 __pycache__ 中，关卡包未改变时不再逐行解析。
+    单个关卡文件的标识、标签和难度取自它的编译缓存，标识默认为文件名。
+
+    Args:
+        path: 关卡包或单个关卡文件的路径
+
+    Returns:
+        按列存储的索引
+
+    Raises:
+        LevelFormatError: 关卡定义不符合格式
+    """
+    from .declarative import cache_path, compile_file, read_cache, write_cache
+
+    if not path.endswith(PACK_SUFFIX):
+        compiled = compile_file(path)
+        level_id = compiled['id'] or os.path.splitext(os.path.basename(path))[0]
+        return _source_index([level_id], [compiled['tags']], [compiled['difficulty']], [-1], [0])
+    stat = os.stat(path)
+    cached = cache_path(path, 'index')
+    index = read_cache(cached, stat, INDEX_MAGIC)
+    if not isinstance(index, dict):
+        index = _scan_pack(path)
+        write_cache(cached, stat, index, INDEX_MAGIC)
+    return index
+
+
+class _Index:
+    """所有来源合并后的索引，按列存储。
+
+    除关卡标识外每关只占几个数组元素，相同的标签组合共用一个 frozenset，
+    因此即使有上万关，索引也只占很少的内存，读取缓存也只是几次 frombytes。
+    """
+
+    __slots__ = ('sources', 'ids', 'tag_sets', 'tags', 'difficulty', 'source', 'offsets', 'lengths', 'positions')
+
+    def __init__(self, sources: Sequence[str]) -> None:
+        """读取并合并各来源的索引
+
+        Raises:
+            LevelFormatError: 关卡定义不符合格式，或关卡标识重复
+        """
+        self.sources = sources
+        self.ids: List[str] = []
+        self.tags = array('l')
+        self.difficulty = array('l')
+        self.source = array('l')
+        self.offsets = array('q')
+        self.lengths = array('q')
+        tag_numbers: Dict[FrozenSet[str], int] = {}
+        for source_number, path in enumerate(sources):
+            index = index_source(path)
+            remap = [tag_numbers.setdefault(frozenset(tag_set), len(tag_numbers)) for tag_set in index['tag_sets']]
+            tags = array('l')
+            tags.frombytes(index['tags'])
+            self.ids.extend(index['ids'])
+            self.tags.extend(remap[number] for number in tags)
+            self.difficulty.frombytes(index['difficulty'])
+            self.offsets.frombytes(index['offsets'])
+            self.lengths.frombytes(index['lengths'])
+            self.source.extend([source_number] * len(index['ids']))
+        self.tag_sets: List[FrozenSet[str]] = list(tag_numbers)
+
+        self.positions = {level_id: row for row, level_id in enumerate(self.ids)}
+        if len(self.positions) != len(self.ids):
+            from .declarative import LevelFormatError
+            seen = set()
+            duplicates = []
+            for level_id in self.ids:
+                if level_id in seen:
+                    duplicates.append(level_id)
+                seen.add(level_id)
+            raise LevelFormatError(f"关卡标识重复：{', '.join(duplicates)}")
+
+    def load(self, row: int, level_number: int) -> Level:
+        """读取并编译一关"""
+        import json
+        from .declarative import LevelFormatError, build_level, compile_data, compile_file
+
+        path = self.sources[self.source[row]]
+        offset = self.offsets[row]
+        if offset < 0:
+            return build_level(compile_file(path), level_number)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            line = f.read(self.lengths[row])
+        source = f'{path}:{self.ids[row]}'
+        try:
+            data = json.loads(line)
+        except ValueError:
+            # 关卡包在建立索引之后被改写
+            raise LevelFormatError(f"{source}: 关卡包已改变，请重新载入") from None
+        return build_level(compile_data(data, source), level_number)
+
+
+class LevelCatalog(Sequence):
+    """带索引的关卡目录。
+
+    关卡来自若干来源：单个关卡文件（.json）或关卡包（.jsonl，每行一关）。
+    目录只在内存中保存索引（标识、标签、难度和在文件中的字节范围），取某一关时
+    才读取并编译那一行；编译好的关卡放在容量固定的 LRU 缓存中，因此内存占用
+    不随关卡包的大小增长。select 按标识、标签或难度筛选出子目录，子目录与原目录
+    共享索引，只记录选中的行号。关卡序号为在（子）目录中的位置加一。
+
+    索引在第一次使用时才建立，构造目录本身不读取任何文件。
+    """
+
+    def __init__(self, sources: Iterable[str], cache_size: int = 32) -> None:
+        """初始化关卡目录
+
+        Args:
+            sources: 按顺序排列的关卡文件或关卡包路径
+            cache_size: 最多保留多少个已编译的关卡
+        """
+        self.sources = tuple(sources)
+        self.cache_size = cache_size
+        self._column_index: Optional[_Index] = None
+        # 子目录选中的行号；None 表示全部
+        self._rows: Optional[array] = None
+        self._positions: Optional[Dict[str, int]] = None
+        self._loaded: 'OrderedDict[int, Level]' = OrderedDict()
+
+    @property
+    def column_index(self) -> _Index:
+        """合并后的索引，第一次访问时建立
+
+        Raises:
+            LevelFormatError: 关卡定义不符合格式，或关卡标识重复
+        """
+        if self._column_index is None:
+            self._column_index = _Index(self.sources)
+        return self._column_index
+
+    def _row(self, position: int) -> int:
+        """目录中的位置对应的索引行号"""
+        return position if self._rows is None else self._rows[position]
+
+    def info(self, position: int) -> Tuple[str, FrozenSet[str], int]:
+        """只读取索引，返回一关的 (标识, 标签, 难度)"""
+        index = self.column_index
+        row = self._row(range(len(self))[position])
+        return index.ids[row], index.tag_sets[index.tags[row]], index.difficulty[row]
+
+    def ids(self) -> List[str]:
+        """按顺序排列的关卡标识"""
+        ids = self.column_index.ids
+        return list(ids) if self._rows is None else [ids[row] for row in self._rows]
+
+    def key(self) -> str:
+        """标识这组关卡的短字符串，来源和选中的关卡都相同时才相同，用于区分不同选择的会话存档"""
+        import hashlib
+        digest = hashlib.sha1()
+        for source in self.sources:
+            digest.update(os.path.abspath(source).encode('utf-8') + b'\0')
+        digest.update(b'\1' + '\0'.join(self.ids()).encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def position(self, level_id: str) -> int:
+        """关卡在目录中的位置
+
+        Raises:
+            KeyError: 目录中没有该关卡
+        """
+        if self._rows is None:
+            return self.column_index.positions[level_id]
+        if self._positions is None:
+            ids = self.column_index.ids
+            positions: Dict[str, int] = {}
+            for position, row in enumerate(self._rows):
+                positions.setdefault(ids[row], position)
+            self._positions = positions
+        return self._positions[level_id]
+
+    def get(self, level_id: str) -> Level:
+        """按标识取出关卡
+
+        Raises:
+            KeyError: 目录中没有该关卡
+        """
+        return self[self.position(level_id)]
+
+    def select(self, ids: Optional[Iterable[str]] = None, tags: Iterable[str] = (),
+               difficulty: Optional[Tuple[int, int]] = None) -> 'LevelCatalog':
+        """筛选关卡，只读取索引，不加载任何关卡
+
+        Args:
+            ids: 只保留这些关卡，并按给出的顺序排列
+            tags: 必须全部带有的标签
+            difficulty: 难度的闭区间 (最低, 最高)
+
+        Returns:
+            子目录
+
+        Raises:
+            KeyError: ids 中有目录里不存在的关卡
+        """
+        index = self.column_index
+        if ids is not None:
+            rows: Iterable[int] = [self._row(self.position(level_id)) for level_id in ids]
+        else:
+            rows = range(len(index.ids)) if self._rows is None else self._rows
+        required = frozenset(tags)
+        if required:
+            # 标签组合通常只有几十种，先算出满足条件的组合再按序号过滤
+            matching = {number for number, tag_set in enumerate(index.tag_sets) if required <= tag_set}
+            rows = [row for row in rows if index.tags[row] in matching]
+        if difficulty is not None:
+            low, high = difficulty
+            rows = [row for row in rows if low <= index.difficulty[row] <= high]
+        view = LevelCatalog(self.sources, self.cache_size)
+        view._column_index = index
+        view._rows = array('l', rows)
+        return view
+
+    def __len__(self) -> int:
+        return len(self.column_index.ids) if self._rows is None else len(self._rows)
+
+    @overload
+    def __getitem__(self, index: int) -> Level: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Level]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Level, List[Level]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        position = range(len(self))[index]
+        loaded = self._loaded
+        level = loaded.get(position)
+        if level is not None:
+            loaded.move_to_end(position)
+            return level
+        level = self.column_index.load(self._row(position), position + 1)
+        loaded[position] = level
+        if len(loaded) > self.cache_size:
+            loaded.popitem(last=False)
+        return level
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """传给其他进程时只带上来源和索引，已编译的关卡含有闭包，不能也不必序列化"""
+        state = self.__dict__.copy()
+        state['_loaded'] = OrderedDict()
+        return state
+
+
+def add_level_arguments(parser: 'argparse.ArgumentParser') -> None:
+    """给命令行添加选择关卡的参数：--pack、--levels、--tags 和 --difficulty
+
+    Args:
+        parser: 命令行解析器
+    """
+    parser.add_argument('--pack', action='append', default=[], metavar='路径',
+                        help="使用关卡包（.jsonl，每行一关）或关卡文件（.json）代替内置关卡，可重复使用")
+    parser.add_argument('--levels', type=_split_list, metavar='标识,...', help="只进行这些关卡，按给出的顺序")
+    parser.add_argument('--tags', type=_split_list, default=[], metavar='标签,...', help="只进行带有全部这些标签的关卡")
+    parser.add_argument('--difficulty', type=parse_difficulty, metavar='难度', help="只进行此难度范围内的关卡，例如 2 或 1-3")
+
+def select_levels(parser: 'argparse.ArgumentParser', args: 'argparse.Namespace') -> LevelCatalog:
+    """按 add_level_arguments 添加的参数选出关卡，出错时通过 parser.error 退出
+
+    Args:
+        parser: 命令行解析器
+        args: 解析结果
+
+    Returns:
+        选出的关卡目录
+    """
+    from . import ALL_LEVELS
+    from .declarative import LevelFormatError
+
+    catalog = LevelCatalog(args.pack) if args.pack else ALL_LEVELS
+    try:
+        if args.levels is not None or args.tags or args.difficulty is not None:
+            catalog = catalog.select(args.levels, args.tags, args.difficulty)
+        empty = not catalog
+    except KeyError as e:
+        parser.error(f"找不到关卡：{e.args[0]}")
+    except (LevelFormatError, OSError) as e:
+        parser.error(str(e))
+    if empty:
+        parser.error("没有符合条件的关卡")
+    return catalog
@@ -0,0 +1,330 @@
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import json
+import marshal
+import os
+import struct
+import sys
+
+from core import paths
+from core.events import CWD_CHANGED
+from core.fs import Template
+from core.simulator import WindowsCliSimulator
+from .base import Level
+from .fixture import Fixture, Graft
+
+# 夹具和目标中相对路径的默认基准目录
+DEFAULT_BASE = 'C:\\Users\\Player\\Documents'
+
+# 编译缓存的文件头：魔数、源文件的修改时间（纳秒）和大小
+CACHE_MAGIC = b'CGL2'
+_CACHE_HEADER = struct.Struct('<4sqQ')
+
+# 目标的种类；file 目标可以再带 content（内容完全相同）或 contains（包含文本）
+GOAL_KINDS = ('cwd', 'exists', 'missing', 'dir', 'file')
+
+# 编译后的目标：(种类, 规范化的绝对路径, 比较方式, 比较文本)
+Goal = Tuple[str, str, Optional[str], Optional[str]]
+
+Predicate = Callable[[WindowsCliSimulator], bool]
+
+
+class LevelFormatError(ValueError):
+    """关卡文件的内容不符合格式"""
+
+
+def _fail(source: str, message: str) -> LevelFormatError:
+    return LevelFormatError(f"{source}: {message}")
+
+def _text(value: Any, source: str, field: str) -> str:
+    """读取文本字段；也可以写成字符串列表，按行拼接"""
+    if isinstance(value, list) and all(isinstance(line, str) for line in value):
+        return '\n'.join(value)
+    if not isinstance(value, str):
+        raise _fail(source, f"{field} 应为字符串或字符串列表")
+    return value
+
+def _tree(entry: Any, source: str, path: str) -> Template:
+    """检查夹具中的一个条目：对象为目录，字符串（或字符串列表）为文件内容"""
+    if isinstance(entry, dict):
+        return {name: _tree(child, source, f'{path}\\{name}') for name, child in entry.items()}
+    return _text(entry, source, path)
+
+def compile_data(data: Any, source: str = '<level>') -> Dict[str, Any]:
+    """检查并编译一个关卡定义
+
+    关卡定义的字段：
+        id: 关卡标识；单个关卡文件可以省略，默认为文件名
+        tags, difficulty: 标签列表和难度（整数，默认为 1），用于在关卡目录中筛选
+        title, description, hints: 标题、说明和提示；说明可以写成行列表
+        base: 相对路径的基准目录，默认为 DEFAULT_BASE
+        files: 初始文件树，对象为目录，字符串为文件内容
+        remove: 初始状态中要删除的路径
+        goals: 全部满足才算通关的目标，例如 {"cwd": "."}、{"exists": "my_folder"}、
+               {"missing": "delete_me.txt"}、{"dir": "a"}、
+               {"file": "a.txt", "content": "..."}、{"file": "a.txt", "contains": "..."}
+
+    结果只包含字符串、列表、元组和字典，可以直接用 marshal 缓存。
+    需要关注的事件和路径由目标推导：cwd 目标关注目录切换，其余目标关注各自的路径。
+
+    Args:
+        data: json.load 得到的对象
+        source: 用于错误消息的来源名称
+
+    Returns:
+        编译后的关卡数据
+
+    Raises:
+        LevelFormatError: 定义不符合格式
+    """
+    if not isinstance(data, dict):
+        raise _fail(source, "关卡定义应为对象")
+    for field in ('title', 'description', 'goals'):
+        if field not in data:
+            raise _fail(source, f"缺少字段 {field}")
+    level_id = data.get('id')
+    if level_id is not None and (not isinstance(level_id, str) or not level_id):
+        raise _fail(source, "id 应为非空字符串")
+    tags = data.get('tags', [])
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise _fail(source, "tags 应为字符串列表")
+    difficulty = data.get('difficulty', 1)
+    if not isinstance(difficulty, int) or isinstance(difficulty, bool):
+        raise _fail(source, "difficulty 应为整数")
+    hints = data.get('hints', [])
+    if not isinstance(hints, list) or not all(isinstance(hint, str) for hint in hints):
+        raise _fail(source, "hints 应为字符串列表")
+    base = data.get('base', DEFAULT_BASE)
+    if not isinstance(base, str):
+        raise _fail(source, "base 应为路径")
+    base = paths.normalize(base, DEFAULT_BASE)
+
+    # 夹具：每个顶层条目是一条嫁接记录，删除记录排在前面
+    grafts: List[Graft] = []
+    for path in data.get('remove', []):
+        if not isinstance(path, str):
+            raise _fail(source, "remove 应为路径列表")
+        target = paths.normalize(path, base)
+        grafts.append((paths.dirname(target), paths.basename(target), None))
+    files = data.get('files', {})
+    if not isinstance(files, dict):
+        raise _fail(source, "files 应为对象")
+    for name, entry in files.items():
+        target = paths.normalize(name, base)
+        if not paths.basename(target):
+            raise _fail(source, f"不能替换驱动器根目录：{name}")
+        grafts.append((paths.dirname(target), paths.basename(target), _tree(entry, source, target)))
+
+    goals: List[Goal] = []
+    watch_events: List[str] = []
+    watch_paths: List[str] = []
+    if not isinstance(data['goals'], list) or not data['goals']:
+        raise _fail(source, "goals 应为非空列表")
+    for goal in data['goals']:
+        kinds = [kind for kind in GOAL_KINDS if kind in goal] if isinstance(goal, dict) else []
+        if len(kinds) != 1:
+            raise _fail(source, f"目标应恰好包含 {'、'.join(GOAL_KINDS)} 之一：{goal!r}")
+        kind = kinds[0]
+        if not isinstance(goal[kind], str):
+            raise _fail(source, f"{kind} 目标的值应为路径")
+        path = paths.normalize(goal[kind], base)
+        compare = None
+        expected = None
+        for key in ('content', 'contains'):
+            if key in goal:
+                if kind != 'file' or compare is not None:
+                    raise _fail(source, f"只有 file 目标可以带一个 content 或 contains：{goal!r}")
+                compare = key
+                expected = _text(goal[key], source, key)
+        goals.append((kind, path, compare, expected))
+        if kind == 'cwd':
+            if CWD_CHANGED not in watch_events:
+                watch_events.append(CWD_CHANGED)
+        elif path not in watch_paths:
+            watch_paths.append(path)
+
+    return {
+        'id': level_id,
+        'tags': tuple(tags),
+        'difficulty': difficulty,
+        'title': _text(data['title'], source, 'title'),
+        'description': _text(data['description'], source, 'description'),
+        'hints': hints,
+        'grafts': grafts,
+        'goals': goals,
+        'watch_events': tuple(watch_events),
+        'watch_paths': tuple(watch_paths),
+    }
+
+def _goal_predicate(goal: Goal) -> Predicate:
+    """把一个目标编译为判断函数，路径在编译时就已拆分好"""
+    kind, path, compare, expected = goal
+    if kind == 'cwd':
+        return lambda simulator: simulator.cwd == path
+    parts = list(paths.split(path))
+    if kind == 'exists':
+        return lambda simulator: simulator.fs.resolve(path, parts) is not None
+    if kind == 'missing':
+        return lambda simulator: simulator.fs.resolve(path, parts) is None
+
+    def check(simulator: WindowsCliSimulator) -> bool:
+        node = simulator.fs.resolve(path, parts)
+        if node is None:
+            return False
+        if kind == 'dir':
+            return node.is_dir
+        if node.is_dir:
+            return False
+        if compare == 'content':
+            return node.content == expected
+        if compare == 'contains':
+            return expected in node.content
+        return True
+    return check
+
+def _predicate(goals: List[Goal]) -> Predicate:
+    """把全部目标合并为一个判断函数"""
+    checks = tuple(_goal_predicate(tuple(goal)) for goal in goals)
+    if len(checks) == 1:
+        return checks[0]
+    return lambda simulator: all(check(simulator) for check in checks)
+
+def _setup_state(grafts: List[Graft]) -> Callable[[WindowsCliSimulator], None]:
+    """夹具无法直接嫁接时使用的设置函数：先补齐缺少的父目录再嫁接"""
+    def setup(simulator: WindowsCliSimulator) -> None:
+        fs = simulator.fs
+        for parent_path, name, entry in grafts:
+            if entry is None:
+                parent = simulator._get_directory(parent_path)
+                if parent is not None and parent.is_dir and name in parent.children:
+                    fs.unlink(parent.children[name])
+                continue
+            drive, *names = paths.split(parent_path)
+            parent = fs.drives.get(drive)
+            if parent is None:
+                parent = fs.add_drive(drive)
+            for part in names:
+                child = parent.children.get(part)
+                if child is None or not child.is_dir:
+                    if child is not None:
+                        fs.unlink(child)
+                    child = fs.mkdir(parent, part)
+                parent = child
+            fs.graft(parent, name, entry)
+    return setup
+
+def build_level(compiled: Mapping[str, Any], level_number: int) -> Level:
+    """由编译后的关卡数据创建关卡，夹具直接使用其中的模板，不再回放设置命令
+
+    Args:
+        compiled: compile_data 或缓存得到的关卡数据
+        level_number: 关卡序号
+
+    Returns:
+        关卡
+    """
+    grafts = [tuple(graft) for graft in compiled['grafts']]
+    setup_state = _setup_state(grafts)
+    level = Level(
+        level_number=level_number,
+        title=compiled['title'],
+        description=compiled['description'],
+        setup_state=setup_state,
+        check_success=_predicate(compiled['goals']),
+        hints=list(compiled['hints']),
+        watch_events=tuple(compiled['watch_events']),
+        watch_paths=tuple(compiled['watch_paths']),
+    )
+    level.fixture = Fixture(setup_state, grafts)
+    return level
+
+
+def cache_path(path: str, kind: str = 'marshal') -> str:
+    """源文件的缓存位置：与源文件同目录的 __pycache__ 下
+
+    Args:
+        path: 源文件路径
+        kind: 缓存种类，作为缓存文件的扩展名
+
+    Returns:
+        缓存文件路径
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, '__pycache__', f'{name}.{kind}')
+
+def read_cache(path: str, stat: os.stat_result, magic: bytes = CACHE_MAGIC) -> Any:
+    """读取与源文件匹配的缓存
+
+    Args:
+        path: 缓存文件路径
+        stat: 源文件的 os.stat 结果
+        magic: 缓存格式的魔数
+
+    Returns:
+        缓存的对象；缺失、过期或损坏时为 None
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_CACHE_HEADER.size)
+            if header != _CACHE_HEADER.pack(magic, stat.st_mtime_ns, stat.st_size):
+                return None
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+def write_cache(path: str, stat: os.stat_result, value: Any, magic: bytes = CACHE_MAGIC) -> None:
+    """写出缓存；与字节码缓存一样遵从 PYTHONDONTWRITEBYTECODE，写入失败时忽略
+
+    Args:
+        path: 缓存文件路径
+        stat: 源文件的 os.stat 结果
+        value: marshal 可以序列化的对象
+        magic: 缓存格式的魔数
+    """
+    if sys.dont_write_bytecode:
+        return
+    temp_path = path + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            f.write(_CACHE_HEADER.pack(magic, stat.st_mtime_ns, stat.st_size))
+            marshal.dump(value, f)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+def compile_file(path: str) -> Dict[str, Any]:
+    """编译关卡文件，源文件未改变时直接读取磁盘上的编译缓存
+
+    Args:
+        path: 关卡文件路径
+
+    Returns:
+        编译后的关卡数据
+
+    Raises:
+        LevelFormatError: 文件不是合法的关卡定义
+    """
+    stat = os.stat(path)
+    cached = cache_path(path)
+    compiled = read_cache(cached, stat)
+    if not isinstance(compiled, dict):
+        with open(path, encoding='utf-8') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise _fail(path, f"不是合法的 JSON：{e}") from None
+        compiled = compile_data(data, path)
+        write_cache(cached, stat, compiled)
+    return compiled
+
+def load_level(path: str, level_number: int) -> Level:
+    """加载一个关卡文件
+
+    Args:
+        path: 关卡文件路径
+        level_number: 关卡序号
+
+    Returns:
+        关卡
+    """
+    return build_level(compile_file(path), level_number)
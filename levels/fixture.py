@@ -0,0 +1,88 @@
+from typing import Callable, List, Optional, Tuple
+from core.fs import FileSystem, Node, Template
+from core.simulator import WindowsCliSimulator
+
+# 一条嫁接记录：(父目录路径, 名称, 模板)，模板为 None 表示删除该节点
+Graft = Tuple[str, str, Optional[Template]]
+
+class Fixture:
+    """预编译的关卡初始状态。
+
+    编译时在一个全新的模拟器上执行一次 setup_state，与执行前的文件系统比较，
+    只记录新增或改变的最上层节点。应用时把这些只读模板直接嫁接到会话的
+    文件系统中，耗时只与嫁接点数量有关，与夹具大小无关。
+    """
+
+    def __init__(self, setup_state: Callable[[WindowsCliSimulator], None], grafts: Optional[List[Graft]]) -> None:
+        """初始化夹具
+
+        Args:
+            setup_state: 原始的关卡设置函数，无法嫁接时回退使用
+            grafts: 嫁接记录列表，None 表示只能回放 setup_state
+        """
+        self.setup_state = setup_state
+        self.grafts = grafts
+
+    def apply(self, simulator: WindowsCliSimulator) -> None:
+        """把夹具应用到模拟器上
+
+        已存在的同名节点会被替换为夹具中的版本，因此重新开始关卡会得到干净的初始状态。
+
+        Args:
+            simulator: 目标模拟器
+        """
+        if self.grafts is None:
+            self.setup_state(simulator)
+            return
+            
+        parents = []
+        for parent_path, _, _ in self.grafts:
+            parent = simulator._get_directory(parent_path)
+            if parent is None or not parent.is_dir:
+                # 会话的目录结构与编译时不同，退回逐条执行设置命令
+                self.setup_state(simulator)
+                return
+            parents.append(parent)
+
+        fs = simulator.fs
+        for parent, (_, name, entry) in zip(parents, self.grafts):
+            if entry is not None:
+                fs.graft(parent, name, entry)
+            elif name in parent.children:
+                fs.unlink(parent.children[name])
+
+
+def _diff(fs: FileSystem, before: Node, after: Node, grafts: List[Graft]) -> None:
+    """比较同一路径下的两个目录，把差异写入嫁接记录"""
+    parent_path = after.path()
+    for name, node in after.children.items():
+        old = before.children.get(name)
+        if old is not None and old.is_dir and node.is_dir:
+            _diff(fs, old, node, grafts)
+        elif old is None or old.is_dir != node.is_dir or old.content != node.content:
+            grafts.append((parent_path, name, fs.export(node)))
+    for name in before.children:
+        if name not in after.children:
+            grafts.append((parent_path, name, None))
+
+def compile_fixture(setup_state: Callable[[WindowsCliSimulator], None]) -> Fixture:
+    """把关卡设置函数编译为夹具
+
+    Args:
+        setup_state: 关卡设置函数
+
+    Returns:
+        编译后的夹具
+    """
+    before = WindowsCliSimulator()
+    after = WindowsCliSimulator()
+    setup_state(after)
+
+    grafts: List[Graft] = []
+    for letter, root in after.fs.drives.items():
+        old_root = before.fs.drives.get(letter)
+        if old_root is None:
+            # setup_state 新增了驱动器，无法嫁接，只能回放
+            return Fixture(setup_state, None)
+        _diff(after.fs, old_root, root, grafts)
+    return Fixture(setup_state, grafts)
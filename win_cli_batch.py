@@ -0,0 +1,137 @@
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from core import cmdline
+from core.commands import CommandError
+from core.mount import parse_mount_spec
+from core.output import OutputSink
+from core.simulator import WindowsCliSimulator
+from win_cli_game import GameManager
+
+@dataclass
+class BatchResult:
+    """批处理中一条命令的执行结果"""
+    line_number: int
+    cwd: str
+    command: str
+    output: str
+    echo: bool = True
+
+
+class BatchRunner:
+    """批处理脚本执行器，通过 GameManager 的命令层逐行执行 .bat 风格脚本。
+
+    支持的批处理语法：
+    - 空行、rem 和 :: 注释会被跳过
+    - 行首的 @ 关闭该行命令的回显
+    - echo off / echo on 切换后续命令的回显
+    - exit 结束脚本
+    - 每行按完整的命令行执行，可以使用引号、管道、重定向以及 &、&& 和 ||
+    """
+
+    def __init__(self, simulator: Optional[WindowsCliSimulator] = None) -> None:
+        """初始化执行器
+
+        Args:
+            simulator: 要操作的模拟器，默认新建一个
+        """
+        self.game = GameManager()
+        if simulator is not None:
+            self.game.simulator = simulator
+        # 脚本不属于任何关卡，help 只返回“没有可用的提示”
+        self.game.current_level_index = len(self.game.levels)
+
+    @property
+    def simulator(self) -> WindowsCliSimulator:
+        """执行器操作的模拟器"""
+        return self.game.simulator
+
+    def run(self, lines: Iterable[str]) -> Iterator[BatchResult]:
+        """逐行执行脚本，每执行一条命令产出一个结果
+
+        Args:
+            lines: 脚本行，可以是打开的文件对象
+
+        Yields:
+            每条命令的执行结果
+        """
+        game = self.game
+        echo = True
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith('::'):
+                continue
+
+            line_echo = echo
+            if line.startswith('@'):
+                line_echo = False
+                line = line[1:].lstrip()
+
+            # 解析结果会被缓存，execute_line 再次解析同一行时直接命中
+            try:
+                script = cmdline.parse(line)
+            except CommandError:
+                script = ()
+            if script:
+                first = script[0][1][0]
+                name, args = first.name.lower(), first.args
+            else:
+                command, args = game.parse_command(line)
+                name = command.lower()
+            if name == 'rem':
+                continue
+            if name == 'echo' and len(args) == 1 and args[0].lower() in ('on', 'off'):
+                echo = args[0].lower() == 'on'
+                continue
+            if name == 'exit':
+                return
+
+            cwd = game.simulator.cwd
+            yield BatchResult(line_number, cwd, line, game.execute_line(line), line_echo)
+            if game.exit_requested:
+                return
+
+    def run_string(self, script: str) -> Iterator[BatchResult]:
+        """执行字符串形式的脚本"""
+        return self.run(script.splitlines())
+
+    def run_file(self, path: str) -> Iterator[BatchResult]:
+        """执行脚本文件，按行流式读取
+
+        Args:
+            path: 脚本文件路径
+
+        Yields:
+            每条命令的执行结果
+        """
+        with open(path, encoding='utf-8') as f:
+            yield from self.run(f)
+
+
+def main() -> None:
+    """批处理入口函数"""
+    parser = argparse.ArgumentParser(description="在模拟器中执行 .bat 风格的批处理脚本")
+    parser.add_argument('script', help="脚本文件路径，- 表示从标准输入读取")
+    parser.add_argument('--mount', action='append', default=[], type=parse_mount_spec, metavar='盘符=目录',
+                        help="把宿主目录只读挂载为驱动器（例如 D:=课程资料），可重复使用")
+    args = parser.parse_args()
+
+    runner = BatchRunner()
+    for letter, path in args.mount:
+        try:
+            runner.simulator.mount(letter, path)
+        except NotADirectoryError:
+            parser.error(f"找不到要挂载的目录：{path}")
+    results = runner.run(sys.stdin) if args.script == '-' else runner.run_file(args.script)
+    sink = OutputSink()
+    for result in results:
+        if result.echo:
+            sink.writelines((f"{result.cwd}>{result.command}",))
+        if result.output:
+            sink.writelines((result.output,))
+    sink.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import csv
+import itertools
+import sys
+
+from core import passcode
+
+def main() -> None:
+    """通关码批量处理入口函数"""
+    parser = argparse.ArgumentParser(description="批量生成或验证通关码，结果作为最后一列追加到每行之后")
+    parser.add_argument('action', choices=['encode', 'decode'], help="encode：由学号+姓名生成通关码；decode：验证通关码")
+    parser.add_argument('input', nargs='?', default='-', help="CSV 文件或每行一条的文本，- 表示标准输入")
+    parser.add_argument('-c', '--column', type=int, default=0, help="要处理的列号（从 0 开始）")
+    parser.add_argument('--header', action='store_true', help="输入第一行为表头")
+    parser.add_argument('--batch-size', type=int, default=4096, help="每批处理的行数")
+    args = parser.parse_args()
+
+    convert = passcode.encode_many if args.action == 'encode' else passcode.decode_many
+    f = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8-sig')
+    reader = csv.reader(f)
+    writer = csv.writer(sys.stdout)
+    if args.header:
+        header = next(reader, None)
+        if header is not None:
+            writer.writerow(header + [args.action])
+
+    # 缺少指定列的行照常输出、结果列留空，保证输出与输入逐行对应；这些行在标准错误中报告
+    short_rows = 0
+
+    def rows():
+        nonlocal short_rows
+        for row in reader:
+            if len(row) <= args.column:
+                short_rows += 1
+                print(f"第 {reader.line_num} 行只有 {len(row)} 列，没有第 {args.column} 列，结果留空", file=sys.stderr)
+            yield row
+
+    source = rows()
+    while True:
+        batch = list(itertools.islice(source, args.batch_size))
+        if not batch:
+            break
+        results = iter(convert((row[args.column].strip() for row in batch if len(row) > args.column), args.batch_size))
+        writer.writerows(row + [next(results) if len(row) > args.column else ''] for row in batch)
+
+    if f is not sys.stdin:
+        f.close()
+    if short_rows:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
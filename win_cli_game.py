@@ -1,17 +1,56 @@
-from typing import List, Optional, Tuple
-from core.simulator import WindowsCliSimulator
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Sequence, Tuple
+import os
+from functools import wraps
+from core.simulator import DEFAULT_CWD, WindowsCliSimulator
 from core.colors import Colors
-from levels import Level, ALL_LEVELS
-import base64
+from core import cmdline
+from core.cmdline import Pipeline, SimpleCommand
+from core.commands import CommandError, Failure, Output, join_output
+from core.builtin_commands import BUILTIN_COMMANDS
+from core.output import OutputSink, strip_ansi
+from levels import ALL_LEVELS
+
+if TYPE_CHECKING:
+    # 只用于类型注解；存档、通关码和命令行参数只在用到时才导入，缩短启动时间
+    from core.metrics import MetricsRegistry
+    from core.persist import SessionStore
+    from levels import Level
 
 class GameManager:
     """游戏管理器类，负责管理游戏状态和流程"""
     
-    def __init__(self) -> None:
-        """初始化游戏管理器"""
+    def __init__(self, levels: Optional[Sequence['Level']] = None) -> None:
+        """初始化游戏管理器
+        
+        Args:
+            levels: 依次进行的关卡，默认为全部内置关卡；可以是 LevelCatalog.select 筛选出的子目录
+        """
+        self.changed = False
         self.simulator = WindowsCliSimulator()
         self.current_level_index = 0
-        self.levels = ALL_LEVELS
+        self.levels = ALL_LEVELS if levels is None else levels
+        self.commands = BUILTIN_COMMANDS
+        self.state = 'play'
+        self.exit_requested = False
+        self.student_info = ""
+        self.store: Optional['SessionStore'] = None
+        self.resumed = False
+        
+    @property
+    def simulator(self) -> WindowsCliSimulator:
+        """当前会话使用的模拟器"""
+        return self._simulator
+        
+    @simulator.setter
+    def simulator(self, simulator: WindowsCliSimulator) -> None:
+        self._simulator = simulator
+        simulator.subscribe(self._on_change)
+        
+    def _on_change(self, event: str, path: str) -> None:
+        """记录与当前关卡相关的变更，决定下一次是否需要检查关卡"""
+        current_level = self.get_current_level()
+        if current_level is not None and current_level.is_affected_by(event, path):
+            self.changed = True
         
     def generate_password(self, student_info: str) -> str:
         """生成密码
@@ -22,14 +61,8 @@ class GameManager:
         Returns:
             生成的密码
         """
-        # 将输入字符串转换为字节数组
-        input_bytes = student_info.encode('utf-8')
-        # 将'OOP'转换为字节数组并重复到与输入长度相同
-        key_bytes = ('OOP' * (len(input_bytes) // 3 + 1))[:len(input_bytes)].encode('utf-8')
-        # 对每个字节进行异或运算
-        result_bytes = bytes(a ^ b for a, b in zip(input_bytes, key_bytes))
-        # 将结果转换为base64字符串
-        return base64.b64encode(result_bytes).decode('utf-8')
+        from core import passcode
+        return passcode.encode(student_info)
         
     def verify_password(self, password: str) -> str:
         """验证密码
@@ -40,43 +73,26 @@ class GameManager:
         Returns:
             原始学号+姓名信息
         """
-        try:
-            # 将密码从base64转换回字节数组
-            result_bytes = base64.b64decode(password)
-            # 将'OOP'转换为字节数组并重复到与密码长度相同
-            key_bytes = ('OOP' * (len(result_bytes) // 3 + 1))[:len(result_bytes)].encode('utf-8')
-            # 对每个字节进行异或运算
-            input_bytes = bytes(a ^ b for a, b in zip(result_bytes, key_bytes))
-            # 将结果转换回字符串
-            return input_bytes.decode('utf-8')
-        except:
-            return ""
-            
-    def collect_student_info(self) -> Optional[str]:
-        """收集学生信息
+        from core import passcode
+        return passcode.decode(password)
         
-        Returns:
-            学号+姓名的组合，如果验证失败则返回None
-        """
-        print(Colors.colorize("\n请输入您的学号和姓名（格式：学号+姓名）", Colors.DESCRIPTION))
-        first_input = input().strip()
-        print(Colors.colorize("请再次输入您的学号和姓名以确认", Colors.DESCRIPTION))
-        second_input = input().strip()
-        
-        if first_input != second_input:
-            print(Colors.colorize("两次输入不一致，请重新开始游戏。", Colors.ERROR))
-            return None
-            
-        return first_input
-        
-    def get_current_level(self) -> Optional[Level]:
+    def get_current_level(self) -> Optional['Level']:
         """获取当前关卡"""
         if self.current_level_index < len(self.levels):
             return self.levels[self.current_level_index]
         return None
         
+    def goto_level(self, index: int) -> None:
+        """跳到指定关卡，下一次 start 时设置它的初始状态
+        
+        Args:
+            index: 关卡在 levels 中的位置
+        """
+        self.current_level_index = index
+        self.resumed = False
+        
     def parse_command(self, command: str) -> Tuple[str, List[str]]:
-        """解析用户输入的命令
+        """解析命令行中的第一条命令（到第一个运算符为止）
         
         Args:
             command: 用户输入的原始命令字符串
@@ -84,13 +100,17 @@ class GameManager:
         Returns:
             命令名称和参数列表的元组
         """
-        parts = command.strip().split()
-        if not parts:
+        words = []
+        for token in cmdline.tokenize(command):
+            if token.operator:
+                break
+            words.append(token.value)
+        if not words:
             return "", []
-        return parts[0], parts[1:]
+        return words[0], words[1:]
         
     def execute_command(self, command: str, args: List[str]) -> str:
-        """执行用户输入的命令
+        """执行单条命令（不处理管道和重定向）
         
         Args:
             command: 命令名称
@@ -99,123 +119,422 @@ class GameManager:
         Returns:
             命令执行结果
         """
-        command = command.lower()
+        result = self._run_command(SimpleCommand(command, tuple(args), tuple(args)), None, False)
+        return result if isinstance(result, str) else join_output(result)
         
-        if command == 'help':
-            current_level = self.get_current_level()
-            if current_level:
-                return "\n".join(Colors.colorize(hint, Colors.HINT) for hint in current_level.hints)
-            return Colors.colorize("没有可用的提示。", Colors.ERROR)
+    def execute_line(self, line: str) -> str:
+        """解析并执行一整行命令，支持引号、管道、重定向以及 &、&& 和 ||
+        
+        Args:
+            line: 用户输入的命令行
             
-        if command == 'exit':
-            return Colors.colorize("游戏结束。", Colors.DESCRIPTION)
+        Returns:
+            全部输出；最后执行的管道失败时为 Failure
+        """
+        try:
+            script = cmdline.parse(line)
+        except CommandError as e:
+            return Failure(Colors.colorize(str(e), Colors.ERROR))
             
-        if command == 'dir':
-            path = args[0] if args else None
-            options = args[1:] if len(args) > 1 else None
-            return self.simulator.simulate_dir(path, options)
+        outputs = []
+        output = ""
+        for joiner, pipeline in script:
+            # && 只在前一条成功时执行，|| 只在前一条失败时执行
+            if (joiner == '&&' and isinstance(output, Failure)) or (joiner == '||' and not isinstance(output, Failure)):
+                continue
+            output = self._run_pipeline(pipeline)
+            if output:
+                outputs.append(output)
+        text = '\n'.join(outputs)
+        return Failure(text) if isinstance(output, Failure) else text
+        
+    def _run_pipeline(self, pipeline: Pipeline) -> str:
+        """执行一条管道
+        
+        各命令以生成器首尾相连，只有最后一条命令的输出被拼接成字符串，
+        中间结果逐行流过而不会整体生成。
+        
+        Returns:
+            管道的输出，前面命令的错误消息排在前面
+        """
+        errors = []
+        stdin: Optional[Iterator[str]] = None
+        last = len(pipeline) - 1
+        for i, command in enumerate(pipeline):
+            source = command.input_redirect
+            if source is not None:
+                stdin = self.simulator.read_lines(source.target)
+                if stdin is None:
+                    return Failure('\n'.join(errors + [Colors.colorize("系统找不到指定的文件。", Colors.ERROR)]))
+                    
+            target = command.output_redirect
+            result = self._run_command(command, stdin, i < last or target is not None)
+            if target is not None:
+                text = result if isinstance(result, str) else join_output(result)
+                if not isinstance(text, Failure):
+                    # 颜色只用于终端显示，写入文件的内容不含转义序列
+                    text = self.simulator.redirect_output(strip_ansi(text), target.operator, target.target)
+                result = text
+                
+            if i == last:
+                output = result if isinstance(result, str) else join_output(result)
+                break
+            # 失败的命令或已重定向到文件的输出不会进入管道
+            if isinstance(result, str):
+                if isinstance(result, Failure) or target is not None:
+                    if result:
+                        errors.append(result)
+                    stdin = iter(())
+                else:
+                    stdin = iter(strip_ansi(result).split('\n')) if result else iter(())
+            else:
+                stdin = iter(result)
+                
+        if not errors:
+            return output
+        text = '\n'.join(errors + [output] if output else errors)
+        return Failure(text) if isinstance(output, Failure) else text
+        
+    def _run_command(self, command: SimpleCommand, stdin: Optional[Iterator[str]], piped: bool) -> Output:
+        """查表执行一条命令，把参数错误和未知命令转换为失败输出"""
+        try:
+            result = self.commands.dispatch(self, command.name, list(command.args), list(command.raw_args), stdin, piped)
+        except CommandError as e:
+            return Failure(Colors.colorize(str(e), Colors.ERROR))
+        if result is None and len(command.name) == 2 and command.name[1] == ':' and command.name[0].isalpha():
+            # 与 cmd 一样，单独输入盘符（例如 D:）切换到该驱动器
+            result = self.simulator.simulate_cd(command.name)
+        if result is None:
+            return Failure(Colors.colorize(f"'{command.name.lower()}' 不是内部或外部命令，也不是可运行的程序或批处理文件。", Colors.ERROR))
+        return result
+        
+    def prompt(self) -> str:
+        """获取当前应显示的输入提示符
+
+        Returns:
+            带颜色的命令提示符；收集学生信息阶段为空字符串
+        """
+        if self.state == 'play' and self.simulator.pager is None:
+            return Colors.colorize(f"\n{self.simulator.cwd}>", Colors.PROMPT) + " "
+        return ""
+        
+    def enable_autosave(self, store: 'SessionStore', level_index: Optional[int] = None) -> None:
+        """开启自动存档，存档存在时从中恢复进度
+        
+        当前模拟器上挂载的驱动器会重新挂载到恢复的模拟器上；存档中的当前目录
+        已不存在时（例如位于这次没有挂载的驱动器上）回到默认目录。
+        
+        Args:
+            store: 会话存档
+            level_index: 指定的起始关卡；与存档中的关卡不同时不恢复，从该关重新开始并覆盖存档
+        """
+        restored = store.load()
+        if restored is not None and level_index is not None and restored[1] != level_index:
+            restored = None
+        if restored is not None:
+            simulator, self.current_level_index = restored
+            for letter, host_path in self.simulator.mounts.items():
+                simulator.mount(letter, host_path)
+            if simulator._get_directory(simulator.cwd) is None:
+                simulator.cwd = DEFAULT_CWD
+            self.simulator = simulator
+            self.resumed = True
+        store.attach(self.simulator, self.current_level_index)
+        if restored is None:
+            store.snapshot()
+        self.store = store
+        
+    def _autosave(self) -> None:
+        """保存本次输入产生的变更，通关后删除存档"""
+        if self.store is None:
+            return
+        if self.finished and self.get_current_level() is None:
+            self.store.clear()
+            return
+        self.store.set_level(self.current_level_index)
+        self.store.save()
+        
+    def start(self) -> List[str]:
+        """开始游戏，进入当前关卡
+        
+        Returns:
+            需要显示的输出行列表
+        """
+        output = [
+            Colors.colorize("欢迎来到 Windows 命令行学习游戏！", Colors.TITLE),
+            Colors.colorize("输入 'help' 获取提示，输入 'exit' 退出游戏。\n", Colors.DESCRIPTION)
+        ]
+        if self.resumed:
+            # 恢复的文件系统已经包含关卡的初始状态，不再重新设置
+            output.append(Colors.colorize("已恢复上次的进度。", Colors.SUCCESS))
+            output.extend(self._enter_level(setup=False))
+        else:
+            output.extend(self._enter_level())
+        self._autosave()
+        return output
+        
+    def _enter_level(self, setup: bool = True) -> List[str]:
+        """进入当前关卡并设置初始状态，全部通关后转入收集学生信息阶段
+        
+        Args:
+            setup: 是否设置关卡初始状态
             
-        if command == 'cd':
-            path = args[0] if args else ""
-            return self.simulator.simulate_cd(path)
+        Returns:
+            需要显示的输出行列表
+        """
+        current_level = self.get_current_level()
+        if not current_level:
+            self.state = 'info_first'
+            return [
+                Colors.colorize("\n恭喜你完成了所有关卡！", Colors.SUCCESS),
+                Colors.colorize("\n请输入您的学号和姓名（格式：学号+姓名）", Colors.DESCRIPTION)
+            ]
             
-        if command == 'mkdir':
-            dir_name = args[0] if args else ""
-            return self.simulator.simulate_mkdir(dir_name)
+        self.state = 'play'
+        if setup:
+            current_level.setup(self.simulator)
+            # 撤销不能越过关卡的初始状态
+            self.simulator.history.clear()
+        self.changed = False
+        return [
+            Colors.colorize(f"\n=== 第 {current_level.level_number} 关：{current_level.title} ===", Colors.TITLE),
+            Colors.colorize(current_level.description, Colors.DESCRIPTION)
+        ]
+        
+    def step(self, user_input: str) -> List[str]:
+        """处理一行用户输入，除自动存档外不做任何阻塞 I/O
+        
+        Args:
+            user_input: 用户输入的一行文本
             
-        if command == 'copy':
-            if len(args) < 2:
-                return Colors.colorize("语法错误。", Colors.ERROR)
-            return self.simulator.simulate_copy(args[0], args[1])
+        Returns:
+            需要显示的输出行列表
+        """
+        output = self._step(user_input)
+        self._autosave()
+        return output
+        
+    def _step(self, user_input: str) -> List[str]:
+        """处理一行用户输入并返回输出行"""
+        user_input = user_input.strip()
+        
+        if self.state == 'info_first':
+            self.student_info = user_input
+            self.state = 'info_second'
+            return [Colors.colorize("请再次输入您的学号和姓名以确认", Colors.DESCRIPTION)]
             
-        if command == 'del':
-            if not args:
-                return Colors.colorize("语法错误。", Colors.ERROR)
-            options = args[1:] if len(args) > 1 else None
-            return self.simulator.simulate_del(args[0], options)
+        if self.state == 'info_second':
+            self.state = 'done'
+            if user_input != self.student_info:
+                return [Colors.colorize("两次输入不一致，请重新开始游戏。", Colors.ERROR)]
+            password = self.generate_password(user_input)
+            return [
+                Colors.colorize(f"\n恭喜您通关，您的通关码为：{password}", Colors.SUCCESS),
+                Colors.colorize("请务必牢记，然后通过钉钉发送给老师", Colors.DESCRIPTION)
+            ]
             
-        if command == 'type':
-            if not args:
-                return Colors.colorize("语法错误。", Colors.ERROR)
-            return self.simulator.simulate_type(args[0])
+        if self.state != 'play':
+            return []
             
-        if command == 'echo':
-            if not args:
-                return ""
-            # 处理重定向操作符
-            if '>' in args or '>>' in args:
-                operator = '>' if '>' in args else '>>'
-                parts = ' '.join(args).split(operator)
-                if len(parts) != 2:
-                    return Colors.colorize("语法错误。", Colors.ERROR)
-                text = parts[0].strip()
-                filename = parts[1].strip()
-                return self.simulator.simulate_echo(text, operator, filename)
-            return self.simulator.simulate_echo(' '.join(args))
+        # 分页显示时任意输入都只是翻到下一页
+        if self.simulator.pager is not None:
+            return [Colors.colorize(self.simulator.simulate_more(), Colors.OUTPUT)]
             
-        if command == 'move':
-            if len(args) < 2:
-                return Colors.colorize("语法错误。", Colors.ERROR)
-            return self.simulator.simulate_move(args[0], args[1])
+        if not user_input:
+            return []
             
-        return Colors.colorize(f"'{command}' 不是内部或外部命令，也不是可运行的程序或批处理文件。", Colors.ERROR)
+        # 解析并执行命令行
+        output = [Colors.colorize(self.execute_line(user_input), Colors.OUTPUT)]
         
-    def run(self) -> None:
-        """运行游戏主循环"""
-        print(Colors.colorize("欢迎来到 Windows 命令行学习游戏！", Colors.TITLE))
-        print(Colors.colorize("输入 'help' 获取提示，输入 'exit' 退出游戏。\n", Colors.DESCRIPTION))
+        current_level = self.get_current_level()
+        if self._level_passed(current_level):
+            output.append(Colors.colorize(f"\n恭喜你完成了第 {current_level.level_number} 关！", Colors.SUCCESS))
+            self.current_level_index += 1
+            output.extend(self._enter_level())
+        elif self.exit_requested:
+            self.state = 'done'
+        return output
         
-        while True:
-            current_level = self.get_current_level()
-            if not current_level:
-                print(Colors.colorize("\n恭喜你完成了所有关卡！", Colors.SUCCESS))
-                
-                # 收集学生信息
-                student_info = self.collect_student_info()
-                if student_info:
-                    # 生成密码
-                    password = self.generate_password(student_info)
-                    print(Colors.colorize(f"\n恭喜您通关，您的通关码为：{password}", Colors.SUCCESS))
-                    print(Colors.colorize("请务必牢记，然后通过钉钉发送给老师", Colors.DESCRIPTION))
-                break
-                
-            # 显示当前关卡信息
-            print(Colors.colorize(f"\n=== 第 {current_level.level_number} 关：{current_level.title} ===", Colors.TITLE))
-            print(Colors.colorize(current_level.description, Colors.DESCRIPTION))
-            
-            # 设置关卡初始状态
-            current_level.setup_state(self.simulator)
-            
-            # 关卡主循环
-            while True:
-                # 显示命令提示符
-                print(Colors.colorize(f"\n{self.simulator.cwd}>", Colors.PROMPT), end=" ")
-                
-                # 获取用户输入
-                user_input = input().strip()
-                if not user_input:
-                    continue
-                    
-                # 解析并执行命令
-                command, args = self.parse_command(user_input)
-                result = self.execute_command(command, args)
-                
-                # 显示命令执行结果
-                print(Colors.colorize(result, Colors.OUTPUT))
-                
-                # 检查是否完成关卡
-                if current_level.check_success(self.simulator):
-                    print(Colors.colorize(f"\n恭喜你完成了第 {current_level.level_number} 关！", Colors.SUCCESS))
-                    self.current_level_index += 1
-                    break
-                    
-                # 处理退出命令
-                if command == 'exit':
-                    return
+    def _level_passed(self, level: 'Level') -> bool:
+        """本次输入后是否完成了关卡；只在相关路径或事件发生变化后才检查"""
+        needs_check = self.changed or not level.watches_changes
+        self.changed = False
+        return needs_check and level.check_success(self.simulator)
+        
+    @property
+    def finished(self) -> bool:
+        """游戏是否已经结束"""
+        return self.state == 'done'
+        
+    def run(self, sink: Optional[OutputSink] = None) -> None:
+        """运行游戏主循环，每条命令的输出连同下一个提示符一次写出
+        
+        Args:
+            sink: 输出目标，默认为标准输出（不是终端时不输出颜色）
+        """
+        if sink is None:
+            sink = OutputSink()
+        sink.writelines(self.start())
+        while not self.finished:
+            sink.write(self.prompt())
+            sink.flush()
+            sink.writelines(self.step(input()))
+        sink.flush()
+
+def enable_metrics(registry: 'MetricsRegistry', sample_rate: float = 0.1) -> Callable[[], None]:
+    """在命令分发和关卡检查处安装统计
+    
+    不调用时游戏中没有任何统计代码；调用后替换 GameManager 上的方法，对进程内的全部
+    会话生效。每次调用只做整数计数，耗时按 sample_rate 随机抽样计入直方图，因此直方图的
+    _count 是抽样的次数，调用次数见对应的计数。记录的指标：
+        wincli_commands_total{command}: 命令执行次数，未知命令记为 unknown
+        wincli_command_errors_total{command}: 命令失败次数
+        wincli_command_duration_seconds{command}: 抽样的命令分发耗时；管道中流式输出的命令
+            （dir、type、find 等）只含创建输出的时间，逐行产出的时间计入读取它的下一条命令
+        wincli_level_attempts_total{level,title}: 在该关输入的命令行数
+        wincli_level_checks_total{level,title}: 关卡检查次数，未发生相关变化而跳过的检查不计
+        wincli_level_check_duration_seconds{level,title}: 抽样的关卡检查耗时
+        wincli_level_completions_total{level,title}: 该关的通关次数
+    
+    Args:
+        registry: 记录指标的注册表
+        sample_rate: 计时的抽样比例，1 表示每次都计时
+        
+    Returns:
+        卸下统计、恢复原方法的函数
+        
+    Raises:
+        RuntimeError: 已经安装过统计
+    """
+    from random import random
+    from time import perf_counter
+    from core.metrics import patch_methods
+    
+    if hasattr(GameManager._run_command, '__wrapped__'):
+        raise RuntimeError("统计已经安装")
+    command_calls = registry.counter('wincli_commands_total', "命令执行次数", ('command',))
+    command_errors = registry.counter('wincli_command_errors_total', "命令失败次数", ('command',))
+    command_seconds = registry.histogram('wincli_command_duration_seconds', "抽样的命令分发耗时（秒）", ('command',))
+    attempts = registry.counter('wincli_level_attempts_total', "在关卡中输入的命令行数", ('level', 'title'))
+    checks = registry.counter('wincli_level_checks_total', "关卡检查次数", ('level', 'title'))
+    check_seconds = registry.histogram('wincli_level_check_duration_seconds', "抽样的关卡检查耗时（秒）", ('level', 'title'))
+    completions = registry.counter('wincli_level_completions_total', "关卡通关次数", ('level', 'title'))
+    
+    run_command = GameManager._run_command
+    level_passed = GameManager._level_passed
+    
+    # 按输入的命令名和关卡缓存对应的计数与直方图，每次调用只查一次字典；
+    # 未知命令不进入缓存，学生输错的名称不会让缓存无限增长
+    unknown = (command_calls.labels('unknown'), command_errors.labels('unknown'), command_seconds.labels('unknown'))
+    command_metrics = {}
+    level_metrics = {}
+    
+    @wraps(run_command)
+    def timed_run_command(self: GameManager, command: SimpleCommand, stdin: Optional[Iterator[str]], piped: bool) -> Output:
+        metrics = command_metrics.get(command.name)
+        if metrics is None:
+            spec = self.commands.get(command.name)
+            if spec is not None:
+                name = spec.name
+            elif len(command.name) == 2 and command.name[1] == ':':
+                # 单独输入盘符等同于 cd
+                name = 'cd'
+            else:
+                name = None
+            if name is None:
+                metrics = unknown
+            else:
+                metrics = command_metrics[command.name] = (command_calls.labels(name), command_errors.labels(name),
+                                                           command_seconds.labels(name))
+        calls, errors, seconds = metrics
+        calls.value += 1
+        try:
+            if random() < sample_rate:
+                start = perf_counter()
+                try:
+                    result = run_command(self, command, stdin, piped)
+                finally:
+                    seconds.observe(perf_counter() - start)
+            else:
+                result = run_command(self, command, stdin, piped)
+        except Exception:
+            errors.value += 1
+            raise
+        if isinstance(result, Failure):
+            errors.value += 1
+        return result
+        
+    @wraps(level_passed)
+    def timed_level_passed(self: GameManager, level: 'Level') -> bool:
+        key = (level.level_number, level.title)
+        metrics = level_metrics.get(key)
+        if metrics is None:
+            labels = (str(level.level_number), level.title)
+            metrics = level_metrics[key] = (attempts.labels(*labels), checks.labels(*labels),
+                                            check_seconds.labels(*labels), completions.labels(*labels))
+        level_attempts, level_checks, seconds, level_completions = metrics
+        level_attempts.value += 1
+        if not self.changed and level.watches_changes:
+            return level_passed(self, level)
+        level_checks.value += 1
+        if random() < sample_rate:
+            start = perf_counter()
+            passed = level_passed(self, level)
+            seconds.observe(perf_counter() - start)
+        else:
+            passed = level_passed(self, level)
+        if passed:
+            level_completions.value += 1
+        return passed
+        
+    return patch_methods(GameManager, {
+        '_run_command': timed_run_command,
+        '_level_passed': timed_level_passed,
+    })
 
 def main() -> None:
     """游戏入口函数"""
-    game = GameManager()
+    import argparse
+    from core.mount import parse_mount_spec
+    from core.persist import SessionStore
+    from core.metrics import add_metrics_arguments, start_metrics
+    from levels.catalog import add_level_arguments, select_levels
+    
+    parser = argparse.ArgumentParser(description="Windows 命令行学习游戏")
+    parser.add_argument('--mount', action='append', default=[], type=parse_mount_spec, metavar='盘符=目录',
+                        help="把宿主目录只读挂载为驱动器（例如 D:=课程资料），可重复使用")
+    add_level_arguments(parser)
+    parser.add_argument('--start', metavar='关卡标识', help="从指定关卡开始")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    
+    registry = start_metrics(parser, args)
+    if registry is not None:
+        enable_metrics(registry, args.metrics_sample)
+    levels = select_levels(parser, args)
+    start = None
+    if args.start is not None:
+        try:
+            start = levels.position(args.start)
+        except KeyError:
+            parser.error(f"所选关卡中没有 {args.start}")
+    game = GameManager(levels)
+    if start is not None:
+        game.goto_level(start)
+    # 挂载的驱动器不进入存档，每次启动时重新挂载；恢复存档时会转到恢复的模拟器上
+    for letter, path in args.mount:
+        try:
+            game.simulator.mount(letter, path)
+        except NotADirectoryError:
+            parser.error(f"找不到要挂载的目录：{path}")
+    # 每种关卡选择各有一份存档，换用其他关卡包或选择时不会恢复到不相干的进度
+    save_dir = os.path.join(os.path.expanduser('~'), '.win_cli_game')
+    try:
+        os.makedirs(save_dir, exist_ok=True)
+        game.enable_autosave(SessionStore(os.path.join(save_dir, f'session-{levels.key()}')), start)
+    except OSError:
+        # 无法写入存档目录时照常游戏，只是不保存进度
+        pass
     game.run()
 
 if __name__ == "__main__":
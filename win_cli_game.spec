@@ -5,7 +5,7 @@ a = Analysis(
     ['win_cli_game.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('levels/data/*.json', 'levels/data')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
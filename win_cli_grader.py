@@ -0,0 +1,136 @@
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from levels import Level
+from levels.catalog import add_level_arguments, select_levels
+from win_cli_game import GameManager
+
+# 转录中可能带有的命令提示符前缀，例如 "C:\Users\Player> "
+_PROMPT_RE = re.compile(r'^[A-Za-z]:\\[^>]*>\s?')
+
+@dataclass
+class GradeResult:
+    """一份命令转录的评分结果"""
+    student: str
+    completed_levels: List[int]
+    commands: int
+
+
+# 工作进程中使用的关卡，由 _init_worker 设置；None 表示内置关卡
+_worker_levels: Optional[Sequence[Level]] = None
+
+
+def grade_transcript(student: str, lines: Iterable[str], levels: Optional[Sequence[Level]] = None) -> GradeResult:
+    """在全新的游戏会话中重放一份转录并评分
+
+    关卡按顺序进行，只有在该关卡进行期间 check_success 返回真才算完成。
+
+    Args:
+        student: 学生标识
+        lines: 转录中的命令行
+        levels: 学生进行的关卡，默认为全部内置关卡
+
+    Returns:
+        评分结果
+    """
+    game = GameManager(levels)
+    game.start()
+    commands = 0
+    for line in lines:
+        if game.state != 'play':
+            break
+        line = _PROMPT_RE.sub('', line.strip())
+        # 空行也要交给会话处理，dir /p 分页时它代表翻页
+        game.step(line)
+        if line:
+            commands += 1
+    completed = [level.level_number for level in game.levels[:game.current_level_index]]
+    return GradeResult(student, completed, commands)
+
+def grade_file(path: str, levels: Optional[Sequence[Level]] = None) -> GradeResult:
+    """读取转录文件并评分，学生标识取文件名（不含扩展名）
+
+    Args:
+        path: 转录文件路径
+        levels: 学生进行的关卡，默认为工作进程的关卡
+
+    Returns:
+        评分结果
+    """
+    student = os.path.splitext(os.path.basename(path))[0]
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return grade_transcript(student, f, _worker_levels if levels is None else levels)
+
+def _init_worker(levels: Optional[Sequence[Level]]) -> None:
+    """工作进程启动时设置关卡，关卡目录只传递一次而不是随每个任务传递"""
+    global _worker_levels
+    _worker_levels = levels
+
+def iter_transcripts(paths: Iterable[str]) -> Iterator[str]:
+    """展开目录，产出所有转录文件路径"""
+    for path in paths:
+        if os.path.isdir(path):
+            for entry in sorted(os.scandir(path), key=lambda e: e.name):
+                if entry.is_file() and entry.name.endswith('.txt'):
+                    yield entry.path
+        else:
+            yield path
+
+def grade_all(paths: Iterable[str], jobs: Optional[int] = None,
+              levels: Optional[Sequence[Level]] = None) -> Iterator[GradeResult]:
+    """用进程池并行评分，结果按输入顺序产出
+
+    Args:
+        paths: 转录文件或目录路径
+        jobs: 工作进程数，默认为 CPU 核数；为 1 时在当前进程中执行
+        levels: 学生进行的关卡，默认为全部内置关卡
+
+    Yields:
+        每份转录的评分结果
+    """
+    files = list(iter_transcripts(paths))
+    if jobs == 1:
+        yield from (grade_file(path, levels) for path in files)
+        return
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(levels,)) as pool:
+        # 每个任务只有几毫秒，成批提交以摊薄进程间通信开销
+        chunksize = max(1, len(files) // (jobs * 8))
+        yield from pool.map(grade_file, files, chunksize=chunksize)
+
+
+def main() -> None:
+    """评分入口函数"""
+    parser = argparse.ArgumentParser(description="批量重放学生的命令转录并评分")
+    parser.add_argument('paths', nargs='+', help="转录文件或包含 .txt 转录的目录")
+    parser.add_argument('-o', '--output', help="CSV 输出文件，默认输出到标准输出")
+    parser.add_argument('-j', '--jobs', type=int, help="工作进程数，默认为 CPU 核数")
+    add_level_arguments(parser)
+    args = parser.parse_args()
+    levels = select_levels(parser, args)
+
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    writer = csv.writer(out)
+    writer.writerow(['student', 'completed', 'levels', 'commands'])
+
+    start = time.perf_counter()
+    count = 0
+    for result in grade_all(args.paths, args.jobs, levels):
+        writer.writerow([result.student, len(result.completed_levels),
+                         ' '.join(map(str, result.completed_levels)), result.commands])
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    if out is not sys.stdout:
+        out.close()
+    print(f"评分 {count} 份转录，耗时 {elapsed:.2f} 秒，{count / elapsed if elapsed else 0:,.0f} 份/秒", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
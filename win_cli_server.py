@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+
+from core.output import OutputSink
+from core.metrics import add_metrics_arguments, start_metrics
+from win_cli_game import GameManager, enable_metrics
+
+
+class GameServer:
+    """多会话游戏服务器，在一个事件循环中托管多个独立的 GameManager 会话。
+
+    协议为按行收发的纯文本（可用 telnet 或 nc 连接），每个连接对应一个会话。
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 2323, max_sessions: int = 5000,
+                 color: bool = True) -> None:
+        """初始化服务器
+
+        Args:
+            host: 监听地址
+            port: 监听端口
+            max_sessions: 同时在线的最大会话数
+            color: 是否向客户端发送颜色转义序列
+        """
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.color = color
+        self.sessions = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """处理单个连接，驱动一个 GameManager 会话直至结束
+
+        Args:
+            reader: 连接的读取流
+            writer: 连接的写入流
+        """
+        if self.sessions >= self.max_sessions:
+            writer.write("服务器会话已满，请稍后再试。\r\n".encode('utf-8'))
+            await writer.drain()
+            writer.close()
+            return
+
+        self.sessions += 1
+        game = GameManager()
+        # telnet 客户端都能显示颜色；每条命令的输出和下一个提示符合并为一次写入
+        sink = OutputSink(writer, color=self.color, newline='\r\n', encoding='utf-8')
+        try:
+            sink.writelines(game.start())
+            while not game.finished:
+                sink.write(game.prompt())
+                sink.flush()
+                await writer.drain()
+                data = await reader.readline()
+                if not data:
+                    break
+                sink.writelines(game.step(data.decode('utf-8', errors='replace')))
+            sink.flush()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def serve(self) -> None:
+        """启动服务器并一直运行"""
+        # 课堂上大量学生会同时连接，监听队列需要比默认值更长
+        server = await asyncio.start_server(self.handle, self.host, self.port, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+
+def main() -> None:
+    """服务器入口函数"""
+    parser = argparse.ArgumentParser(description="Windows 命令行学习游戏多会话服务器")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址")
+    parser.add_argument('--port', type=int, default=2323, help="监听端口")
+    parser.add_argument('--max-sessions', type=int, default=5000, help="同时在线的最大会话数")
+    parser.add_argument('--no-color', action='store_true', help="不发送颜色转义序列（客户端不支持 ANSI 时使用）")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    
+    registry = start_metrics(parser, args)
+    if registry is not None:
+        enable_metrics(registry, args.metrics_sample)
+
+    server = GameServer(args.host, args.port, args.max_sessions, not args.no_color)
+    print(f"服务器已启动：{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()